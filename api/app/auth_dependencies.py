@@ -1,10 +1,11 @@
 import os
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
 from fastapi.security import OAuth2
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 import jwt
 from app.components.auth.jwt_mgmt.jwt_mgmt_service  import extract_user_id_from_token
 from app.logger.logging_setup import logger
+from app.settings.env_settings import ADMIN_AUTH_TOKEN
 
 # Load configuration
 TOKEN_URL = "/auth/token"
@@ -50,6 +51,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=401, detail="Invalid authentication token")
 
 
+def verify_admin_api_key(admin_api_key: str = Header(...)):
+    """
+    Validates the provided admin API key.
+
+    Args:
+    -----
+    admin_api_key : str
+        The API key sent in the request headers.
+
+    Logs:
+    -----
+    - DEBUG: Start of API key verification.
+    - ERROR: Logs invalid API key attempts.
+
+    Raises:
+    -------
+    HTTPException
+        403: If the provided API key is invalid.
+    """
+    logger.debug("Verifying admin API key.")
+    if admin_api_key != ADMIN_AUTH_TOKEN:
+        logger.error("Invalid admin API key provided.")
+        raise HTTPException(status_code=403, detail="Invalid API key")
+    logger.debug("Admin API key verification successful.")
+
+
 def custom_openapi(app):
     """
     Modify the OpenAPI schema to include Bearer token authentication.
@@ -3,9 +3,11 @@ from google.oauth2 import id_token
 from google.auth.exceptions import GoogleAuthError
 import httpx
 
+from app.components.retry_policy.retry_policy_service import RetryPolicy, call_with_retry_async
 from app.logger.logging_setup import logger
 from app.settings.env_settings import GOOGLE_OAUTH_CLIENT_ID, GOOGLE_OAUTH_CLIENT_SECRET, GOOGLE_OAUTH_GRANT_TYPE, GOOGLE_OAUTH_REDIRECT_URI, GOOGLE_OAUTH_TOKEN_URL
 
+TOKEN_REQUEST_RETRY_POLICY = RetryPolicy("google_oauth_token")
 
 def verify_google_token(token: str) -> dict:
     logger.debug("Verifying Google OAuth2 token.")
@@ -42,6 +44,10 @@ async def refresh_google_access_token(refresh_token: str) -> dict:
 
 
 async def _post_token_request(data: dict) -> dict:
+    return await call_with_retry_async(_send_token_request, data, policy=TOKEN_REQUEST_RETRY_POLICY)
+
+
+async def _send_token_request(data: dict) -> dict:
     async with httpx.AsyncClient() as client:
         response = await client.post(GOOGLE_OAUTH_TOKEN_URL, data=data)
         if response.status_code != 200:
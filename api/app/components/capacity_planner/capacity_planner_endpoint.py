@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.auth_dependencies import verify_admin_api_key
+from app.components.capacity_planner.capacity_planner_service import get_capacity_forecast_service
+from app.db.db import get_db_session
+from app.logger.logging_setup import logger
+from app.utils.http_response_util import response_200
+
+capacity_planner_router = APIRouter(dependencies=[Depends(verify_admin_api_key)])
+
+@capacity_planner_router.get("/forecast")
+async def get_capacity_forecast(
+    db: Session = Depends(get_db_session),
+    hours: int = Query(24, ge=1, le=168)
+):
+    """
+    Forecasts the render and upload load of the tunes due within the next `hours`, per
+    hour, and flags the tunes likely to miss their upload date. Read-only; requires the
+    admin API key.
+
+    Args:
+    -----
+    db : Session
+        The database session used for querying.
+    hours : int
+        The forecast horizon in hours, starting now.
+    """
+    try:
+        forecast = await get_capacity_forecast_service(hours, db)
+        return response_200("Success.", "Successfully computed capacity forecast.", forecast)
+    except Exception as e:
+        logger.error(f"Failed to compute capacity forecast: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
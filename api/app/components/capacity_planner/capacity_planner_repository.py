@@ -0,0 +1,74 @@
+"""
+Repository Layer: Capacity Planner
+==================================
+Reads what the capacity forecast is built from.
+
+Functions:
+----------
+- get_pending_tune_plan_rows: Active tunes whose upload date falls before the horizon.
+- get_uploaded_tune_measurements: Media measurements and upload times of the latest uploaded tunes.
+- get_quota_units_used_per_user: Units each user consumed on a quota day.
+"""
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.db.db import QuotaUsage, Tune
+from app.components.capacity_planner.capacity_planner_utils import TuneMeasurement
+from app.components.tune_ops.tune_ops_utils import ACTIVE_TUNE_STATUSES, TUNE_STATUS_UPLOADED
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_pending_tune_plan_rows(horizon_end: datetime, db: Session) -> List[Tuple]:
+    """
+    Returns (ID, user ID, title, upload date, status, next attempt, audio duration, video
+    size, upload session URI) of every active tune due before `horizon_end`, earliest first.
+    """
+    return (
+        db.query(
+            Tune.id,
+            Tune.user_id,
+            Tune.video_title,
+            Tune.upload_date,
+            Tune.status,
+            Tune.next_attempt_at,
+            Tune.audio_duration_seconds,
+            Tune.video_size_bytes,
+            Tune.upload_session_uri
+        )
+        .filter(Tune.status.in_(ACTIVE_TUNE_STATUSES), Tune.upload_date < horizon_end)
+        .order_by(Tune.upload_date, Tune.id)
+        .all()
+    )
+
+
+@in_executor(EXECUTOR_DB)
+def get_uploaded_tune_measurements(limit: int, db: Session) -> List[TuneMeasurement]:
+    return (
+        db.query(
+            Tune.audio_duration_seconds,
+            Tune.video_size_bytes,
+            Tune.render_seconds,
+            Tune.upload_started_at,
+            Tune.uploaded_at
+        )
+        .filter(
+            Tune.status == TUNE_STATUS_UPLOADED,
+            or_(Tune.audio_duration_seconds.isnot(None), Tune.video_size_bytes.isnot(None))
+        )
+        .order_by(Tune.uploaded_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+@in_executor(EXECUTOR_DB)
+def get_quota_units_used_per_user(project_id: str, quota_day: date, db: Session) -> Dict[str, int]:
+    rows = (
+        db.query(QuotaUsage.user_id, func.sum(QuotaUsage.units_used))
+        .filter(QuotaUsage.project_id == project_id, QuotaUsage.quota_day == quota_day)
+        .group_by(QuotaUsage.user_id)
+        .all()
+    )
+    return {user_id: int(units or 0) for user_id, units in rows}
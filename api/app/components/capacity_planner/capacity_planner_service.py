@@ -0,0 +1,177 @@
+"""
+Service Layer: Capacity Planner
+===============================
+Forecasts whether the box can render and upload the upcoming schedule on time.
+
+Responsibilities:
+-----------------
+- Learn render time and video size per second of audio, and the throughput of one
+  upload stream, from the latest uploaded tunes (see `save_tune_media_stats`).
+- Simulate the pending tunes of the horizon through the configured render workers,
+  upload concurrency and per-user cap, under the YouTube quota and the upload
+  bandwidth limit in force at each moment.
+- Report the render and upload load of every hour and flag the tunes predicted to
+  finish more than `CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES` after their upload date.
+- Allocate upload dates for a batch of new tunes: spread them over a window, into slots
+  where the scheduled renders and uploads (per user and overall) leave room and the
+  day's quota still covers them, instead of letting them all fall due at once.
+
+The forecast only reads: it changes neither the schedule nor the quota ledger. An
+allocation only sets the upload dates of the tunes it is given.
+
+Metrics:
+--------
+- capacity_planner.tunes_at_risk: tunes flagged by the latest forecast.
+- capacity_planner.slots_allocated: upload dates assigned by allocations.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Tuple
+from sqlalchemy.orm import Session
+from app.components.capacity_planner.capacity_planner_repository import (
+    get_pending_tune_plan_rows,
+    get_quota_units_used_per_user,
+    get_uploaded_tune_measurements
+)
+from app.components.capacity_planner.capacity_planner_utils import (
+    CapacityModel,
+    PipelineCapacity,
+    PlannedTune,
+    QuotaBudget,
+    allocate_upload_slots,
+    get_capacity_model,
+    get_due_at,
+    get_hourly_load,
+    get_stream_rate,
+    simulate_schedule
+)
+from app.components.quota.quota_utils import get_quota_cost, get_quota_day
+from app.components.runtime_config.runtime_config_repository import get_runtime_settings
+from app.components.runtime_config.runtime_config_utils import (
+    RENDER_WORKERS,
+    RUNTIME_SETTING_DEFAULTS,
+    UPLOAD_WORKERS,
+    USER_CONCURRENCY,
+    parse_runtime_settings
+)
+from app.components.upload.bandwidth_shaper.bandwidth_shaper_service import upload_bandwidth_limiter
+from app.components.upload.upload_concurrency.upload_concurrency_service import upload_concurrency_controller
+from app.db.db import Tune
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    CAPACITY_PLANNER_HISTORY_SIZE,
+    CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES,
+    SLOT_ALLOCATION_STEP_MINUTES,
+    YOUTUBE_QUOTA_DAILY_LIMIT,
+    YOUTUBE_QUOTA_PROJECT_ID,
+    YOUTUBE_QUOTA_USER_DAILY_LIMIT
+)
+from app.utils.metrics_util import increment_counter, set_gauge
+
+
+async def get_capacity_forecast_service(hours: int, db: Session) -> dict:
+    """
+    Simulates the tunes due within the next `hours` and returns the model it used, the
+    load per hour and the predicted times of every tune.
+    """
+    now = datetime.now(timezone.utc)
+    tolerance_seconds = CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES * 60
+    tunes, model, capacity, _, _ = await _simulate_pending_tunes(now, now + timedelta(hours=hours), db)
+
+    start_hour = now.replace(minute=0, second=0, microsecond=0)
+    at_risk = [tune for tune in tunes if tune.is_at_risk(tolerance_seconds)]
+    set_gauge("capacity_planner.tunes_at_risk", len(at_risk))
+    if at_risk:
+        logger.info(f"Capacity forecast: {len(at_risk)} of {len(tunes)} tunes due within {hours}h are likely to miss their upload date.")
+
+    return {
+        "generated_at": now,
+        "horizon_hours": hours,
+        "late_tolerance_minutes": CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES,
+        "render_workers": capacity.render_workers,
+        "upload_concurrency": capacity.upload_workers,
+        "user_concurrency": capacity.user_limit,
+        "model": model.to_dict(),
+        "tunes_planned": len(tunes),
+        "tunes_at_risk": len(at_risk),
+        "hours": get_hourly_load(tunes, start_hour, hours + 1, capacity.render_workers),
+        "tunes": [tune.to_dict(tolerance_seconds) for tune in tunes],
+    }
+
+
+async def allocate_upload_slots_service(tunes: List[Tune], user_id: str, window_start: datetime, window_end: datetime, db: Session):
+    """
+    Sets the upload date of each new tune to a free slot inside the window, around the
+    simulated load of the tunes already scheduled.
+
+    The caller must store the tunes before another allocation runs, so it plans around them.
+
+    Raises:
+    -------
+    ValueError
+        If the tunes do not all fit the window.
+    """
+    now = datetime.now(timezone.utc)
+    scheduled, model, capacity, quota, get_stream_rate_at = await _simulate_pending_tunes(now, window_end, db)
+    new_tunes = [
+        PlannedTune(None, user_id, tune.video_title, window_start, tune.status, window_start, tune.audio_duration_seconds, None, False)
+        for tune in tunes
+    ]
+    upload_dates = allocate_upload_slots(
+        new_tunes, scheduled, model, capacity, quota, get_stream_rate_at,
+        window_start, window_end, timedelta(minutes=SLOT_ALLOCATION_STEP_MINUTES)
+    )
+    for tune, upload_date in zip(tunes, upload_dates):
+        tune.upload_date = upload_date
+
+    increment_counter("capacity_planner.slots_allocated", len(tunes))
+    logger.info(
+        f"Allocated {len(tunes)} upload slots for user_id={user_id} between "
+        f"{min(upload_dates).isoformat()} and {max(upload_dates).isoformat()}."
+    )
+
+
+async def _simulate_pending_tunes(
+    now: datetime,
+    until: datetime,
+    db: Session
+) -> Tuple[List[PlannedTune], CapacityModel, PipelineCapacity, QuotaBudget, Callable[[datetime], float]]:
+    # Plays the tunes due before `until` through the configured pipeline. The returned quota
+    # budget holds their reservations and the stream rate follows the bandwidth limit.
+    overrides = parse_runtime_settings(await get_runtime_settings(db))
+    upload_workers = overrides.get(UPLOAD_WORKERS, RUNTIME_SETTING_DEFAULTS[UPLOAD_WORKERS])
+    if upload_concurrency_controller.enabled:
+        # The adaptive limit in force, below the configured ceiling.
+        upload_workers = min(upload_workers, upload_concurrency_controller.limit)
+    capacity = PipelineCapacity(
+        overrides.get(RENDER_WORKERS, RUNTIME_SETTING_DEFAULTS[RENDER_WORKERS]),
+        upload_workers,
+        overrides.get(USER_CONCURRENCY, RUNTIME_SETTING_DEFAULTS[USER_CONCURRENCY])
+    )
+
+    model = get_capacity_model(await get_uploaded_tune_measurements(CAPACITY_PLANNER_HISTORY_SIZE, db))
+    tunes = [
+        PlannedTune(
+            tune_id, user_id, video_title, upload_date, status,
+            get_due_at(upload_date, next_attempt_at, now),
+            audio_duration_seconds, video_size_bytes, upload_session_uri is not None
+        )
+        for (
+            tune_id, user_id, video_title, upload_date, status, next_attempt_at,
+            audio_duration_seconds, video_size_bytes, upload_session_uri
+        ) in await get_pending_tune_plan_rows(until, db)
+    ]
+    tunes = [tune for tune in tunes if tune.due_at < until]
+
+    quota = QuotaBudget(
+        get_quota_cost("videos.insert"),
+        YOUTUBE_QUOTA_DAILY_LIMIT,
+        YOUTUBE_QUOTA_USER_DAILY_LIMIT,
+        now,
+        await get_quota_units_used_per_user(YOUTUBE_QUOTA_PROJECT_ID, get_quota_day(now), db)
+    )
+
+    def get_stream_rate_at(moment: datetime) -> float:
+        return get_stream_rate(model, capacity.upload_workers, upload_bandwidth_limiter.rate_at(moment))
+
+    simulate_schedule(tunes, model, capacity, quota, get_stream_rate_at, now, until)
+    return tunes, model, capacity, quota, get_stream_rate_at
@@ -0,0 +1,470 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from app.components.quota.quota_utils import get_next_quota_reset, get_quota_day
+from app.components.tune_ops.tune_ops_utils import IN_PROGRESS_TUNE_STATUSES, TUNE_STATUS_RENDERED, TUNE_STATUS_UPLOADING
+
+# Rates used until enough uploaded tunes have been measured.
+DEFAULT_RENDER_SECONDS_PER_AUDIO_SECOND = 0.5
+DEFAULT_VIDEO_BYTES_PER_AUDIO_SECOND = 256 * 1024
+DEFAULT_STREAM_BYTES_PER_SECOND = 1024 * 1024
+DEFAULT_AUDIO_DURATION_SECONDS = 180.0
+
+SECONDS_PER_HOUR = 3600
+
+# (audio duration, video size, render seconds, upload started at, uploaded at) of an uploaded tune.
+TuneMeasurement = Tuple[Optional[float], Optional[int], Optional[float], Optional[datetime], Optional[datetime]]
+
+
+class CapacityModel:
+    """
+    Rates the simulation runs on: render time and video size per second of audio, the
+    throughput of one upload stream, and the duration assumed for audio never probed.
+    """
+    def __init__(
+        self,
+        render_seconds_per_audio_second: float,
+        video_bytes_per_audio_second: float,
+        stream_bytes_per_second: float,
+        audio_duration_seconds: float,
+        samples: int
+    ):
+        self.render_seconds_per_audio_second = render_seconds_per_audio_second
+        self.video_bytes_per_audio_second = video_bytes_per_audio_second
+        self.stream_bytes_per_second = stream_bytes_per_second
+        self.audio_duration_seconds = audio_duration_seconds
+        self.samples = samples
+
+    def get_render_seconds(self, tune: "PlannedTune") -> float:
+        return self._get_audio_duration(tune) * self.render_seconds_per_audio_second
+
+    def get_video_bytes(self, tune: "PlannedTune") -> int:
+        return tune.video_size_bytes or round(self._get_audio_duration(tune) * self.video_bytes_per_audio_second)
+
+    def _get_audio_duration(self, tune: "PlannedTune") -> float:
+        return tune.audio_duration_seconds or self.audio_duration_seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "render_seconds_per_audio_second": round(self.render_seconds_per_audio_second, 3),
+            "video_bytes_per_audio_second": round(self.video_bytes_per_audio_second),
+            "stream_bytes_per_second": round(self.stream_bytes_per_second),
+            "default_audio_duration_seconds": round(self.audio_duration_seconds, 1),
+            "samples": self.samples,
+        }
+
+
+class PipelineCapacity:
+    """
+    The configured concurrency of the stages the simulation runs: render workers, upload
+    slots and how many of a user's tunes each of them runs at once.
+    """
+    def __init__(self, render_workers: int, upload_workers: int, user_limit: int):
+        self.render_workers = max(1, render_workers)
+        self.upload_workers = max(1, upload_workers)
+        self.user_limit = max(1, user_limit)
+
+
+class PlannedTune:
+    """
+    A pending tune and, once simulated, when it is predicted to go through the render
+    and upload stages.
+    """
+    def __init__(
+        self,
+        tune_id: int,
+        user_id: str,
+        video_title: str,
+        upload_date: datetime,
+        status: str,
+        due_at: datetime,
+        audio_duration_seconds: Optional[float],
+        video_size_bytes: Optional[int],
+        has_upload_session: bool
+    ):
+        self.tune_id = tune_id
+        self.user_id = user_id
+        self.video_title = video_title
+        self.upload_date = upload_date
+        self.status = status
+        self.due_at = due_at
+        self.audio_duration_seconds = audio_duration_seconds
+        self.video_size_bytes = video_size_bytes
+        self.has_upload_session = has_upload_session
+
+        self.planned_video_bytes: Optional[int] = None
+        self.render_started_at: Optional[datetime] = None
+        self.render_finished_at: Optional[datetime] = None
+        self.upload_started_at: Optional[datetime] = None
+        self.upload_finished_at: Optional[datetime] = None
+        self.deferred_by_quota = False
+
+    @property
+    def needs_render(self) -> bool:
+        # A stored upload session means the rendered video is on the share.
+        return self.status not in (TUNE_STATUS_RENDERED, TUNE_STATUS_UPLOADING) and not self.has_upload_session
+
+    @property
+    def needs_quota(self) -> bool:
+        # In-progress tunes hold their reservation; a resumed session issues no new videos.insert.
+        return self.status not in IN_PROGRESS_TUNE_STATUSES and not self.has_upload_session
+
+    def get_delay_seconds(self) -> Optional[float]:
+        if self.upload_finished_at is None:
+            return None
+        return (self.upload_finished_at - self.upload_date).total_seconds()
+
+    def is_at_risk(self, tolerance_seconds: float) -> bool:
+        """
+        A tune is at risk if its upload is predicted to finish more than `tolerance_seconds`
+        after its upload date, or not within the simulated horizon at all.
+        """
+        delay = self.get_delay_seconds()
+        return delay is None or delay > tolerance_seconds
+
+    def to_dict(self, tolerance_seconds: float) -> dict:
+        delay = self.get_delay_seconds()
+        return {
+            "tune_id": self.tune_id,
+            "user_id": self.user_id,
+            "video_title": self.video_title,
+            "status": self.status,
+            "upload_date": self.upload_date,
+            "audio_duration_seconds": self.audio_duration_seconds,
+            "predicted_render_start": self.render_started_at,
+            "predicted_render_end": self.render_finished_at,
+            "predicted_upload_start": self.upload_started_at,
+            "predicted_upload_end": self.upload_finished_at,
+            "predicted_delay_seconds": None if delay is None else round(delay),
+            "deferred_by_quota": self.deferred_by_quota,
+            "at_risk": self.is_at_risk(tolerance_seconds),
+        }
+
+
+class QuotaBudget:
+    """
+    The videos.insert budget of the project and of each user per quota day, starting
+    from what today's ledger already holds.
+    """
+    def __init__(
+        self,
+        insert_cost: int,
+        daily_limit: int,
+        user_daily_limit: int,
+        today: datetime,
+        units_used_per_user: Dict[str, int]
+    ):
+        self.insert_cost = insert_cost
+        self.daily_limit = daily_limit
+        self.user_daily_limit = user_daily_limit
+        quota_day = get_quota_day(today)
+        self._project_used = {quota_day: sum(units_used_per_user.values())}
+        self._user_used = {(quota_day, user_id): units for user_id, units in units_used_per_user.items()}
+
+    def try_reserve(self, user_id: str, moment: datetime) -> bool:
+        quota_day = get_quota_day(moment)
+        project_used = self._project_used.get(quota_day, 0)
+        user_used = self._user_used.get((quota_day, user_id), 0)
+        if project_used + self.insert_cost > self.daily_limit:
+            return False
+        if self.user_daily_limit > 0 and user_used + self.insert_cost > self.user_daily_limit:
+            return False
+        self._project_used[quota_day] = project_used + self.insert_cost
+        self._user_used[(quota_day, user_id)] = user_used + self.insert_cost
+        return True
+
+
+class IntervalIndex:
+    """
+    Half-open [start, end) intervals, kept as sorted starts and sorted ends so the
+    intervals overlapping a span are counted with two binary searches.
+    """
+    def __init__(self):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+
+    def add(self, start: datetime, end: datetime):
+        insort(self._starts, start)
+        insort(self._ends, end)
+
+    def count_overlapping(self, start: datetime, end: datetime) -> int:
+        # Intervals starting before `end`, less those that ended by `start`.
+        return bisect_left(self._starts, end) - bisect_right(self._ends, start)
+
+
+class StageLoad:
+    """
+    The intervals booked on one pipeline stage, overall and per user.
+
+    Every booked interval overlapping a span counts against it, even ones that do not
+    overlap each other, so a span that fits never runs more jobs than the stage allows.
+    """
+    def __init__(self, workers: int, user_limit: int):
+        self.workers = workers
+        self.user_limit = min(user_limit, workers)
+        self._all = IntervalIndex()
+        self._users: Dict[str, IntervalIndex] = {}
+
+    def fits(self, user_id: str, start: datetime, end: datetime) -> bool:
+        if self._all.count_overlapping(start, end) >= self.workers:
+            return False
+        user_index = self._users.get(user_id)
+        return user_index is None or user_index.count_overlapping(start, end) < self.user_limit
+
+    def add(self, user_id: str, start: datetime, end: datetime):
+        self._all.add(start, end)
+        self._users.setdefault(user_id, IntervalIndex()).add(start, end)
+
+
+class _StageSlots:
+    """
+    When each worker of a stage, and each of a user's slots in it, is next free.
+    """
+    def __init__(self, workers: int, user_limit: int, now: datetime):
+        self.now = now
+        self.user_limit = max(1, min(user_limit, workers))
+        self._free = [now] * max(1, workers)
+        self._user_free: Dict[str, List[datetime]] = {}
+
+    def book(self, user_id: str, ready_at: datetime, get_seconds: Callable[[datetime], float]) -> Tuple[datetime, datetime]:
+        """
+        Runs a job on the first worker and user slot both free from `ready_at` on and
+        returns when it starts and ends.
+        """
+        user_free = self._user_free.setdefault(user_id, [self.now] * self.user_limit)
+        started_at = max(ready_at, self._free[0], user_free[0])
+        finished_at = started_at + timedelta(seconds=get_seconds(started_at))
+        heapq.heapreplace(self._free, finished_at)
+        heapq.heapreplace(user_free, finished_at)
+        return started_at, finished_at
+
+
+def get_due_at(upload_date: datetime, next_attempt_at: Optional[datetime], now: datetime) -> datetime:
+    """
+    Returns when the scheduler picks a tune up: its upload date, or its retry time once it
+    failed, and right away if that has passed.
+    """
+    return max(now, upload_date, next_attempt_at or upload_date)
+
+
+def get_capacity_model(measurements: Iterable[TuneMeasurement]) -> CapacityModel:
+    """
+    Learns the rates from uploaded tunes, as medians so a few outliers (a retried upload,
+    a render that queued behind others) do not skew them. A rate without measurements
+    keeps its default.
+    """
+    render_rates, size_rates, stream_rates, durations = [], [], [], []
+    samples = 0
+    for duration, size, render_seconds, upload_started_at, uploaded_at in measurements:
+        samples += 1
+        if duration and duration > 0:
+            durations.append(duration)
+            if render_seconds and render_seconds > 0:
+                render_rates.append(render_seconds / duration)
+            if size and size > 0:
+                size_rates.append(size / duration)
+        if size and size > 0 and upload_started_at and uploaded_at:
+            upload_seconds = (uploaded_at - upload_started_at).total_seconds()
+            if upload_seconds > 0:
+                stream_rates.append(size / upload_seconds)
+
+    return CapacityModel(
+        median(render_rates) if render_rates else DEFAULT_RENDER_SECONDS_PER_AUDIO_SECOND,
+        median(size_rates) if size_rates else DEFAULT_VIDEO_BYTES_PER_AUDIO_SECOND,
+        median(stream_rates) if stream_rates else DEFAULT_STREAM_BYTES_PER_SECOND,
+        median(durations) if durations else DEFAULT_AUDIO_DURATION_SECONDS,
+        samples
+    )
+
+
+def get_stream_rate(model: CapacityModel, upload_workers: int, bandwidth_limit: int) -> float:
+    """
+    Returns the throughput of one upload stream while every upload slot is busy: its
+    measured rate, or its share of the bandwidth limit (0 for none) if that is lower.
+    """
+    if bandwidth_limit > 0:
+        return min(model.stream_bytes_per_second, bandwidth_limit / max(1, upload_workers))
+    return model.stream_bytes_per_second
+
+
+def simulate_schedule(
+    tunes: List[PlannedTune],
+    model: CapacityModel,
+    capacity: PipelineCapacity,
+    quota: QuotaBudget,
+    get_stream_rate_at: Callable[[datetime], float],
+    now: datetime,
+    until: datetime
+) -> List[PlannedTune]:
+    """
+    Plays the pending tunes through the render and upload stages and fills in their
+    predicted times.
+
+    Tunes are taken in order of due time. A tune that does not fit its quota day waits for
+    the next one, as the pipeline defers it; one that would only start after `until` is
+    left without a prediction. Uploads are then taken in order of their render's end.
+    Probe and finalize take seconds and are not simulated.
+    """
+    pending = [(tune.due_at, order, tune) for order, tune in enumerate(tunes)]
+    heapq.heapify(pending)
+    renders = _StageSlots(capacity.render_workers, capacity.user_limit, now)
+    rendered = []
+
+    while pending:
+        ready_at, order, tune = heapq.heappop(pending)
+        if ready_at > until:
+            continue
+        if tune.needs_quota and not quota.try_reserve(tune.user_id, ready_at):
+            tune.deferred_by_quota = True
+            heapq.heappush(pending, (get_next_quota_reset(ready_at), order, tune))
+            continue
+
+        tune.planned_video_bytes = model.get_video_bytes(tune)
+        if tune.needs_render:
+            render_seconds = model.get_render_seconds(tune)
+            tune.render_started_at, tune.render_finished_at = renders.book(tune.user_id, ready_at, lambda _: render_seconds)
+            ready_at = tune.render_finished_at
+        rendered.append((ready_at, order, tune))
+
+    uploads = _StageSlots(capacity.upload_workers, capacity.user_limit, now)
+    for ready_at, _, tune in sorted(rendered, key=lambda item: item[:2]):
+        size = tune.planned_video_bytes
+        tune.upload_started_at, tune.upload_finished_at = uploads.book(
+            tune.user_id, ready_at, lambda started_at: size / get_stream_rate_at(started_at)
+        )
+    return tunes
+
+
+def allocate_upload_slots(
+    tunes: List[PlannedTune],
+    scheduled: List[PlannedTune],
+    model: CapacityModel,
+    capacity: PipelineCapacity,
+    quota: QuotaBudget,
+    get_stream_rate_at: Callable[[datetime], float],
+    window_start: datetime,
+    window_end: datetime,
+    step: timedelta
+) -> List[datetime]:
+    """
+    Picks an upload date inside [window_start, window_end) for each new tune, on a grid of
+    `step`, and returns them in the order of `tunes`.
+
+    The renders and uploads of the `scheduled` tunes, as simulated, are indexed per stage,
+    overall and per user. Each new tune aims at its even share of the window and takes the
+    first grid time from there (wrapping around to the window start) at which its render
+    and its upload both fit the stage's workers and the user's cap, and its videos.insert
+    fits the quota day. It is then booked, so the next tune plans around it.
+
+    Raises:
+    -------
+    ValueError
+        If a tune fits nowhere in the window.
+    """
+    renders = StageLoad(capacity.render_workers, capacity.user_limit)
+    uploads = StageLoad(capacity.upload_workers, capacity.user_limit)
+    for tune in scheduled:
+        if tune.render_started_at:
+            renders.add(tune.user_id, tune.render_started_at, tune.render_finished_at)
+        if tune.upload_started_at:
+            uploads.add(tune.user_id, tune.upload_started_at, tune.upload_finished_at)
+
+    share = (window_end - window_start) / max(1, len(tunes))
+    assigned = []
+    for position, tune in enumerate(tunes):
+        render_seconds = model.get_render_seconds(tune)
+        video_bytes = model.get_video_bytes(tune)
+        target = window_start + (share * position // step) * step
+
+        for upload_date in _get_candidate_times(window_start, window_end, target, step):
+            render_end = upload_date + timedelta(seconds=render_seconds)
+            upload_end = render_end + timedelta(seconds=video_bytes / get_stream_rate_at(render_end))
+            if not renders.fits(tune.user_id, upload_date, render_end) or not uploads.fits(tune.user_id, render_end, upload_end):
+                continue
+            if not quota.try_reserve(tune.user_id, upload_date):
+                continue
+            renders.add(tune.user_id, upload_date, render_end)
+            uploads.add(tune.user_id, render_end, upload_end)
+            assigned.append(upload_date)
+            break
+        else:
+            raise ValueError(
+                f"Only {position} of {len(tunes)} tunes fit the window from {window_start.isoformat()} "
+                f"to {window_end.isoformat()} without exceeding encode capacity or the YouTube quota."
+            )
+    return assigned
+
+
+def _get_candidate_times(window_start: datetime, window_end: datetime, target: datetime, step: timedelta) -> Iterable[datetime]:
+    moment = target
+    while moment < window_end:
+        yield moment
+        moment += step
+    moment = window_start
+    while moment < target:
+        yield moment
+        moment += step
+
+
+def get_hourly_load(tunes: List[PlannedTune], start: datetime, hours: int, render_workers: int) -> List[dict]:
+    """
+    Spreads the simulated renders and uploads over the hours from `start` on.
+
+    A render keeps ffmpeg busy on the CPU for its whole run, so the render load of an hour
+    is the render time falling into it, and `render_utilization` its share of what the
+    render workers can do in an hour. Upload bytes are spread evenly over each upload.
+    """
+    buckets = [
+        {
+            "hour": start + timedelta(hours=offset),
+            "render_seconds": 0.0,
+            "upload_bytes": 0.0,
+            "uploads_due": 0,
+            "uploads_finished": 0,
+        }
+        for offset in range(hours)
+    ]
+    end = start + timedelta(hours=hours)
+
+    for tune in tunes:
+        if start <= tune.upload_date < end:
+            buckets[_hour_index(start, tune.upload_date)]["uploads_due"] += 1
+        if tune.upload_finished_at and start <= tune.upload_finished_at < end:
+            buckets[_hour_index(start, tune.upload_finished_at)]["uploads_finished"] += 1
+        if tune.render_started_at:
+            for bucket, seconds in _overlaps(start, hours, tune.render_started_at, tune.render_finished_at):
+                buckets[bucket]["render_seconds"] += seconds
+        if tune.upload_started_at:
+            upload_seconds = (tune.upload_finished_at - tune.upload_started_at).total_seconds()
+            for bucket, seconds in _overlaps(start, hours, tune.upload_started_at, tune.upload_finished_at):
+                buckets[bucket]["upload_bytes"] += tune.planned_video_bytes * seconds / upload_seconds
+
+    return [
+        {
+            "hour": bucket["hour"],
+            "renders_running": round(bucket["render_seconds"] / SECONDS_PER_HOUR, 2),
+            "render_utilization": round(bucket["render_seconds"] / (SECONDS_PER_HOUR * max(1, render_workers)), 3),
+            "upload_bytes": round(bucket["upload_bytes"]),
+            "upload_bandwidth_bps": round(bucket["upload_bytes"] / SECONDS_PER_HOUR),
+            "uploads_due": bucket["uploads_due"],
+            "uploads_finished": bucket["uploads_finished"],
+        }
+        for bucket in buckets
+    ]
+
+
+def _hour_index(start: datetime, moment: datetime) -> int:
+    return int((moment - start).total_seconds() // SECONDS_PER_HOUR)
+
+
+def _overlaps(start: datetime, hours: int, begin: datetime, end: datetime) -> Iterable[Tuple[int, float]]:
+    # Seconds of [begin, end) falling into each hour bucket.
+    first = max(0, _hour_index(start, begin))
+    last = min(hours - 1, _hour_index(start, end))
+    for bucket in range(first, last + 1):
+        bucket_start = start + timedelta(hours=bucket)
+        seconds = (min(end, bucket_start + timedelta(hours=1)) - max(begin, bucket_start)).total_seconds()
+        if seconds > 0:
+            yield bucket, seconds
@@ -0,0 +1,86 @@
+from math import ceil
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.auth_dependencies import verify_admin_api_key
+from app.components.dead_letter.dead_letter_schema import DeadLetterSelection
+from app.components.dead_letter.dead_letter_service import (
+    get_dead_lettered_tunes_service,
+    purge_dead_lettered_tunes_service,
+    requeue_dead_lettered_tunes_service
+)
+from app.components.dead_letter.dead_letter_validator import validate_dead_letter_selection
+from app.db.db import get_db_session
+from app.logger.logging_setup import logger
+from app.utils.http_response_util import response_200
+
+dead_letter_router = APIRouter(dependencies=[Depends(verify_admin_api_key)])
+
+@dead_letter_router.get("")
+async def get_dead_lettered_tunes(
+    db: Session = Depends(get_db_session),
+    user_id: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Lists tunes that were dead-lettered after using up their processing attempts,
+    most recent first, with their last error. Requires the admin API key.
+    """
+    try:
+        tunes, total_count = await get_dead_lettered_tunes_service(db, user_id, page, limit)
+        return response_200(
+            "Success.",
+            "Successfully fetched dead-lettered tunes.",
+            {
+                "data": tunes,
+                "current_page": page,
+                "total_pages": ceil(total_count / limit),
+                "total_count": total_count,
+            }
+        )
+    except Exception as e:
+        logger.error(f"Failed to fetch dead-lettered tunes: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@dead_letter_router.post("/requeue")
+async def requeue_dead_lettered_tunes(selection: DeadLetterSelection, db: Session = Depends(get_db_session)):
+    """
+    Queues the selected dead-lettered tunes again with a fresh attempt count.
+
+    Raises:
+    -------
+    HTTPException
+        400: If no tunes are selected.
+    """
+    try:
+        validate_dead_letter_selection(selection)
+        requeued = await requeue_dead_lettered_tunes_service(selection, db)
+        return response_200("Success.", f"Requeued {len(requeued)} tunes.", {"tune_ids": requeued})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to requeue dead-lettered tunes: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@dead_letter_router.post("/purge")
+async def purge_dead_lettered_tunes(selection: DeadLetterSelection, db: Session = Depends(get_db_session)):
+    """
+    Deletes the selected dead-lettered tunes, their upload attempts and their files.
+
+    Raises:
+    -------
+    HTTPException
+        400: If no tunes are selected.
+    """
+    try:
+        validate_dead_letter_selection(selection)
+        purged = await purge_dead_lettered_tunes_service(selection, db)
+        return response_200("Success.", f"Purged {len(purged)} tunes.", {"tune_ids": purged})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to purge dead-lettered tunes: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,97 @@
+"""
+Repository Layer: Dead Letter
+=============================
+Queries and bulk operations on tunes that were dead-lettered after using up their
+processing attempts.
+
+Functions:
+----------
+- get_dead_lettered_tunes: Paginated dead-lettered tunes, most recent first.
+- requeue_dead_lettered_tunes: Queue the selected tunes again with a fresh attempt count.
+- purge_dead_lettered_tunes: Delete the selected tunes and their upload attempts.
+"""
+from typing import List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy.orm import Query, Session
+from app.db.db import Tune, TuneUploadAttempt
+from app.components.dead_letter.dead_letter_schema import DeadLetterSelection
+from app.components.tune_ops.tune_ops_utils import TUNE_STATUS_DEAD_LETTERED, TUNE_STATUS_QUEUED, get_status_timestamp_values
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_dead_lettered_tunes(db: Session, user_id: Optional[str] = None, page: int = 1, limit: int = 50) -> Tuple[List[Tune], int]:
+    query = db.query(Tune).filter(Tune.status == TUNE_STATUS_DEAD_LETTERED)
+    if user_id:
+        query = query.filter(Tune.user_id == user_id)
+
+    total_count = query.count()
+    tunes = (
+        query
+        .order_by(Tune.status_changed_at.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
+        .all()
+    )
+    return tunes, total_count
+
+
+@in_executor(EXECUTOR_DB)
+def requeue_dead_lettered_tunes(selection: DeadLetterSelection, now: datetime, db: Session) -> List[Tuple[int, datetime]]:
+    """
+    Queue the selected dead-lettered tunes again. Their attempt count restarts at zero;
+    the last error is kept until an attempt succeeds.
+
+    Returns:
+    --------
+    List[Tuple[int, datetime]]
+        (ID, upload date) of every requeued tune.
+    """
+    try:
+        requeued = _select(db.query(Tune.id, Tune.upload_date), selection).all()
+        if requeued:
+            values = {getattr(Tune, column): value for column, value in get_status_timestamp_values(TUNE_STATUS_QUEUED, now).items()}
+            values[Tune.attempt_count] = 0
+            values[Tune.next_attempt_at] = None
+            (
+                db.query(Tune)
+                .filter(Tune.id.in_([tune_id for tune_id, _ in requeued]), Tune.status == TUNE_STATUS_DEAD_LETTERED)
+                .update(values, synchronize_session=False)
+            )
+        db.commit()
+        return [(tune_id, upload_date) for tune_id, upload_date in requeued]
+    except Exception:
+        db.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def purge_dead_lettered_tunes(selection: DeadLetterSelection, db: Session) -> List[Tuple[int, str]]:
+    """
+    Delete the selected dead-lettered tunes and their upload attempts.
+
+    Returns:
+    --------
+    List[Tuple[int, str]]
+        (ID, base destination path) of every deleted tune, so its files can be removed.
+    """
+    try:
+        purged = _select(db.query(Tune.id, Tune.base_dest_path), selection).all()
+        tune_ids = [tune_id for tune_id, _ in purged]
+        if tune_ids:
+            db.query(TuneUploadAttempt).filter(TuneUploadAttempt.tune_id.in_(tune_ids)).delete(synchronize_session=False)
+            db.query(Tune).filter(Tune.id.in_(tune_ids)).delete(synchronize_session=False)
+        db.commit()
+        return [(tune_id, base_dest_path) for tune_id, base_dest_path in purged]
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _select(query: Query, selection: DeadLetterSelection) -> Query:
+    query = query.filter(Tune.status == TUNE_STATUS_DEAD_LETTERED)
+    if selection.tune_ids:
+        query = query.filter(Tune.id.in_(selection.tune_ids))
+    if selection.user_id:
+        query = query.filter(Tune.user_id == selection.user_id)
+    return query
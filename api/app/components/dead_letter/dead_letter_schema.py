@@ -0,0 +1,10 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class DeadLetterSelection(BaseModel):
+    """
+    Selects dead-lettered tunes for a bulk operation: by ID, by user, or all of them.
+    """
+    tune_ids: Optional[List[int]] = None
+    user_id: Optional[str] = None
+    all: bool = False
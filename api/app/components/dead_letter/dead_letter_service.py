@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.components.dead_letter.dead_letter_repository import (
+    get_dead_lettered_tunes,
+    purge_dead_lettered_tunes,
+    requeue_dead_lettered_tunes
+)
+from app.components.dead_letter.dead_letter_schema import DeadLetterSelection
+from app.components.file_processing.file_processing_utils import delete_directory
+from app.components.tune_ops.tune_ops_utils import TUNE_STATUS_QUEUED, parse_tags_from_db
+from app.components.upload.due_tune_queue.due_tune_queue_service import notify_tune_removed, notify_tune_scheduled
+from app.dto import TuneDto
+from app.logger.logging_setup import logger
+from app.utils.executor_util import EXECUTOR_FS, run_blocking
+from app.utils.metrics_util import increment_counter
+
+
+async def get_dead_lettered_tunes_service(db: Session, user_id: Optional[str], page: int, limit: int) -> Tuple[List[TuneDto], int]:
+    tunes, total_count = await get_dead_lettered_tunes(db, user_id, page, limit)
+    tune_dtos = [
+        TuneDto.model_validate({**tune.__dict__, "tags": parse_tags_from_db(tune.tags)})
+        for tune in tunes
+    ]
+    return tune_dtos, total_count
+
+
+async def requeue_dead_lettered_tunes_service(selection: DeadLetterSelection, db: Session) -> List[int]:
+    requeued = await requeue_dead_lettered_tunes(selection, datetime.now(timezone.utc), db)
+    for tune_id, upload_date in requeued:
+        notify_tune_scheduled(tune_id, upload_date, TUNE_STATUS_QUEUED)
+
+    increment_counter("tune.dead_letter.requeued", len(requeued))
+    logger.info(f"Requeued {len(requeued)} dead-lettered tunes.")
+    return [tune_id for tune_id, _ in requeued]
+
+
+async def purge_dead_lettered_tunes_service(selection: DeadLetterSelection, db: Session) -> List[int]:
+    purged = await purge_dead_lettered_tunes(selection, db)
+    for tune_id, base_dest_path in purged:
+        notify_tune_removed(tune_id)
+        if not base_dest_path:
+            continue
+        try:
+            await run_blocking(EXECUTOR_FS, delete_directory, base_dest_path)
+        except Exception as e:
+            # The rows are gone already; leftover files only cost disk space.
+            logger.error(f"Failed to delete files of purged tune {tune_id} at '{base_dest_path}': {e}")
+
+    increment_counter("tune.dead_letter.purged", len(purged))
+    logger.info(f"Purged {len(purged)} dead-lettered tunes.")
+    return [tune_id for tune_id, _ in purged]
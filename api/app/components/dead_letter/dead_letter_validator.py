@@ -0,0 +1,6 @@
+from app.components.dead_letter.dead_letter_schema import DeadLetterSelection
+
+def validate_dead_letter_selection(selection: DeadLetterSelection):
+    # An empty body must never act on every dead-lettered tune by accident.
+    if not selection.tune_ids and not selection.user_id and not selection.all:
+        raise ValueError("Select tunes by 'tune_ids' or 'user_id', or set 'all' to true.")
@@ -1,11 +1,18 @@
 from datetime import timedelta
 import os
 import re
+import signal
 import subprocess
+import threading
+from typing import Dict
 from app.logger.logging_setup import logger
 from app.components.file_processing.file_processing_service import get_mp4_path
 from app.settings.env_settings import FFMPEG_PATH, FFMPEG_PROBE_PATH
 
+# Running ffmpeg processes by output path, so a render can be stopped from outside its thread.
+_renders_lock = threading.Lock()
+_running_renders: Dict[str, subprocess.Popen] = {}
+
 
 def probe_audio_duration(audio_path: str) -> float:
     """
@@ -59,28 +66,73 @@ def build_ffmpeg_command(audio_path: str, image_path: str, mp4_path: str, durati
     ]
 
 
-def generate_video(audio_path: str, image_path: str, output_path: str, video_title: str) -> str:
+def generate_video(audio_path: str, image_path: str, output_path: str, video_title: str, duration_seconds: float = None) -> str:
     """
     Generates a video using FFmpeg by combining an audio file and an image.
+
+    The audio is probed for its duration unless `duration_seconds` is given.
     """
     
     mp4_path = get_mp4_path(output_path, video_title)
     logger.debug(f"Generating video for title: {video_title}.")
 
-    duration_seconds = probe_audio_duration(audio_path)
+    if duration_seconds is None:
+        duration_seconds = probe_audio_duration(audio_path)
     logger.info(f"Audio duration: {duration_seconds} seconds")
 
     ffmpeg_cmd = build_ffmpeg_command(audio_path, image_path, mp4_path, duration_seconds)
     logger.debug(f"FFmpeg command: {' '.join(ffmpeg_cmd)}")
 
+    # In its own process group, so stopping a render also stops anything ffmpeg spawned,
+    # and a Ctrl+C meant for the worker does not kill it halfway.
+    process = subprocess.Popen(
+        ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=os.name == "posix"
+    )
+    with _renders_lock:
+        _running_renders[mp4_path] = process
     try:
-        result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True)
-        logger.debug(f"FFmpeg stdout: {result.stdout.decode().strip()}")
-        logger.debug(f"FFmpeg stderr: {result.stderr.decode().strip()}")
+        stdout, stderr = process.communicate()
+    finally:
+        with _renders_lock:
+            _running_renders.pop(mp4_path, None)
+
+    if process.returncode == 0:
+        logger.debug(f"FFmpeg stdout: {stdout.decode().strip()}")
+        logger.debug(f"FFmpeg stderr: {stderr.decode().strip()}")
         logger.info(f"Video successfully generated at: {mp4_path}")
         return mp4_path
-    except subprocess.CalledProcessError as e:
-        stdout = e.stdout.decode().strip() if e.stdout else "No stdout"
-        stderr = e.stderr.decode().strip() if e.stderr else "No stderr"
-        logger.error(f"FFmpeg failed to generate video:\nstdout: {stdout}\nstderr: {stderr}")
-        raise RuntimeError("Video generation failed.") from e
+    if process.returncode < 0:
+        logger.warning(f"FFmpeg was stopped by signal {-process.returncode} while generating '{mp4_path}'.")
+        raise RuntimeError("Video generation was interrupted.")
+
+    logger.error(
+        f"FFmpeg failed to generate video:\nstdout: {stdout.decode().strip() or 'No stdout'}\n"
+        f"stderr: {stderr.decode().strip() or 'No stderr'}"
+    )
+    raise RuntimeError("Video generation failed.")
+
+
+def kill_render(mp4_path: str) -> bool:
+    """
+    Kills the ffmpeg process group rendering `mp4_path`, leaving a partial file behind.
+
+    Returns:
+    --------
+    bool
+        True if a render of `mp4_path` was running.
+    """
+    with _renders_lock:
+        process = _running_renders.get(mp4_path)
+    if process is None or process.poll() is not None:
+        return False
+
+    logger.info(f"Stopping the render of '{mp4_path}'.")
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        # Finished in the meantime.
+        return False
+    return True
@@ -8,6 +8,8 @@ Responsibilities:
 - Determine the type of file (audio or image).
 - Transfer files to the appropriate shared location, including user-specific directories.
 - Validate and create destination paths.
+- Run the file work of tune creation (temp files, moves, cleanup) on the `fs` executor,
+  so awaiting it never blocks the event loop.
 
 Logging:
 --------
@@ -31,6 +33,7 @@ from app.dto import TuneDto
 from app.logger.logging_setup import logger
 from app.settings.env_settings import FILE_SHARE_OS
 from app.components.file_processing.file_processing_utils import base64_to_file, generate_file_path_non_windows, generate_file_path_windows, validate_and_create_path
+from app.utils.executor_util import EXECUTOR_FS, in_executor
 
 def get_mp4_path(output_path: str, video_title: str) -> str:
     return os.path.join(output_path, f"{video_title}.mp4")
@@ -41,6 +44,7 @@ def get_audio_path(tune: Tune) -> str:
 def get_image_path(tune: Tune) -> str:
     return f"{tune.base_dest_path}/{tune.img_name}"
 
+@in_executor(EXECUTOR_FS)
 def persistence_preparation_processing(
     tune: TuneDto, user_id: str
 ) -> Tuple[str, str, Tuple[str, str], Tuple[str, str], str]:
@@ -72,6 +76,7 @@ def persistence_preparation_processing(
     )
 
 
+@in_executor(EXECUTOR_FS)
 def processing_commit(file_mappings: List[Tuple[str, str]]):
     for temp_path, final_path in file_mappings:
         move_temp_file(temp_path, final_path)
@@ -91,6 +96,7 @@ def move_temp_file(temp_path: str, final_path: str):
     logger.info(f"Moved temp file from '{temp_path}' to final destination '{final_path}'")
 
 
+@in_executor(EXECUTOR_FS)
 def cleanup_temp_files(temp_paths: List[str]):
     for path in temp_paths:
         try:
@@ -0,0 +1,133 @@
+"""
+Repository Layer: Leader Election
+=================================
+Takes, keeps and gives up leadership of a named role, either through a Postgres
+session-level advisory lock or through a lease row in `leader_leases`.
+
+Functions:
+----------
+- try_advisory_lock: Take the advisory lock of a role without waiting.
+- check_advisory_lock: Confirm the session holding the lock is still alive.
+- release_advisory_lock: Give up the advisory lock.
+- claim_leader_lease: Take the lease row of a role if it is free, expired or already ours.
+- renew_leader_lease: Extend a lease still held.
+- release_leader_lease: Give up a lease.
+"""
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.db import LeaderLease
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def try_advisory_lock(key: int, conn: Connection) -> bool:
+    """
+    Try to take the session-level advisory lock `key` on `conn`. The lock lives as long
+    as the connection, so it is freed when the holding process dies.
+    """
+    try:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        conn.commit()
+        return bool(acquired)
+    except Exception:
+        conn.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def check_advisory_lock(conn: Connection):
+    """
+    Round-trip on the connection holding an advisory lock. Only this session can
+    release the lock, so it is held for as long as this succeeds.
+    """
+    try:
+        conn.execute(text("SELECT 1"))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def release_advisory_lock(key: int, conn: Connection):
+    try:
+        conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def claim_leader_lease(name: str, holder: str, expires_at: datetime, now: datetime, db: Session) -> bool:
+    """
+    Take the lease of role `name` for `holder` if nobody holds it, it expired, or
+    `holder` already holds it. The conditional update lets only one claimer win.
+
+    Returns:
+    --------
+    bool
+        True if `holder` now leads the role.
+    """
+    try:
+        if db.get(LeaderLease, name) is None:
+            try:
+                db.add(LeaderLease(name=name))
+                db.commit()
+            except IntegrityError:
+                # Another process created the row first; compete for it below.
+                db.rollback()
+
+        claimable = (LeaderLease.holder.is_(None)) | (LeaderLease.holder == holder) | (LeaderLease.expires_at < now)
+        updated = (
+            db.query(LeaderLease)
+            .filter(LeaderLease.name == name, claimable)
+            .update({
+                LeaderLease.holder: holder,
+                LeaderLease.acquired_at: now,
+                LeaderLease.expires_at: expires_at
+            }, synchronize_session=False)
+        )
+        db.commit()
+        return updated == 1
+    except Exception:
+        db.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def renew_leader_lease(name: str, holder: str, expires_at: datetime, db: Session) -> bool:
+    """
+    Returns:
+    --------
+    bool
+        True if `holder` still held the lease and it was extended.
+    """
+    try:
+        updated = (
+            db.query(LeaderLease)
+            .filter(LeaderLease.name == name, LeaderLease.holder == holder)
+            .update({LeaderLease.expires_at: expires_at}, synchronize_session=False)
+        )
+        db.commit()
+        return updated == 1
+    except Exception:
+        db.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def release_leader_lease(name: str, holder: str, db: Session):
+    try:
+        (
+            db.query(LeaderLease)
+            .filter(LeaderLease.name == name, LeaderLease.holder == holder)
+            .update({LeaderLease.holder: None, LeaderLease.expires_at: None}, synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,178 @@
+"""
+Service Layer: Leader Election
+==============================
+Elects one process among those running a role, such as the upload scheduler, so only
+the leader scans while the others stay on hot standby.
+
+On Postgres the leader holds a session-level advisory lock on a dedicated connection,
+opened outside the connection pool. If the leader dies, its connection closes and the
+lock is freed at once; after an error the connection is invalidated rather than reused,
+so the lock never outlives the leadership. Other
+databases use a lease row in `leader_leases`, renewed every `LEADER_RENEW_SECONDS`
+and taken over once it has not been renewed for `LEADER_LEASE_SECONDS`. Standbys try
+to take over every `LEADER_RETRY_SECONDS`.
+
+A leader that cannot confirm its leadership steps down and stops the role's work.
+Tune leases still guard each upload, so a brief overlap during failover never
+uploads a tune twice.
+
+Metrics:
+--------
+- leader.is_leader (role): 1 while this process leads the role.
+- leader.acquired / leader.lost (role): leadership gained, and lost without stepping down.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.engine import Connection
+from app.components.leader_election.leader_election_repository import (
+    check_advisory_lock,
+    claim_leader_lease,
+    release_advisory_lock,
+    release_leader_lease,
+    renew_leader_lease,
+    try_advisory_lock
+)
+from app.components.leader_election.leader_election_utils import get_advisory_lock_key, supports_advisory_locks
+from app.components.upload.tune_lease.tune_lease_service import WORKER_ID
+from app.db.db import engine, get_db_session_context, unpooled_engine
+from app.logger.logging_setup import logger
+from app.settings.env_settings import LEADER_LEASE_SECONDS, LEADER_RENEW_SECONDS, LEADER_RETRY_SECONDS
+from app.utils.executor_util import EXECUTOR_DB, run_blocking
+from app.utils.metrics_util import increment_counter, set_gauge
+
+
+class LeaderElection:
+    """
+    This process's candidacy for the role `name`.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.is_leader = False
+        self._use_advisory_lock = supports_advisory_locks(engine)
+        self._lock_key = get_advisory_lock_key(name)
+        self._conn: Optional[Connection] = None
+
+    async def try_acquire(self) -> bool:
+        """
+        Takes leadership if it is free. Returns True if this process now leads.
+        """
+        try:
+            if self._use_advisory_lock:
+                # Opening a connection blocks; standbys retry it every LEADER_RETRY_SECONDS.
+                self._conn = await run_blocking(EXECUTOR_DB, unpooled_engine.connect)
+                acquired = await try_advisory_lock(self._lock_key, self._conn)
+                if not acquired:
+                    await self._close_connection()
+            else:
+                now = datetime.now(timezone.utc)
+                with get_db_session_context() as db:
+                    acquired = await claim_leader_lease(self.name, WORKER_ID, _get_lease_expiry(now), now, db)
+        except Exception as e:
+            logger.error(f"Leader Election: Failed to contend for '{self.name}': {e}")
+            await self._close_connection(invalidate=True)
+            acquired = False
+
+        if acquired:
+            logger.info(f"Leader Election: {WORKER_ID} now leads '{self.name}'.")
+            increment_counter("leader.acquired", role=self.name)
+        self._set_leader(acquired)
+        return acquired
+
+    async def renew(self) -> bool:
+        """
+        Confirms and extends leadership. Returns False, having stepped down, if it was lost.
+        """
+        try:
+            if self._use_advisory_lock:
+                await check_advisory_lock(self._conn)
+                held = True
+            else:
+                with get_db_session_context() as db:
+                    held = await renew_leader_lease(self.name, WORKER_ID, _get_lease_expiry(datetime.now(timezone.utc)), db)
+        except Exception as e:
+            logger.error(f"Leader Election: Failed to renew leadership of '{self.name}': {e}")
+            held = False
+
+        if not held:
+            logger.warning(f"Leader Election: {WORKER_ID} lost leadership of '{self.name}'.")
+            increment_counter("leader.lost", role=self.name)
+            await self._close_connection(invalidate=True)
+            self._set_leader(False)
+        return held
+
+    async def release(self):
+        """
+        Steps down so a standby can take over without waiting for a timeout.
+        """
+        if not self.is_leader:
+            return
+        self._set_leader(False)
+        try:
+            if self._use_advisory_lock:
+                await release_advisory_lock(self._lock_key, self._conn)
+            else:
+                with get_db_session_context() as db:
+                    await release_leader_lease(self.name, WORKER_ID, db)
+            logger.info(f"Leader Election: {WORKER_ID} stepped down from '{self.name}'.")
+        except Exception as e:
+            # The lock goes with the invalidated connection; a lease row simply expires.
+            logger.error(f"Leader Election: Failed to step down from '{self.name}': {e}")
+            await self._close_connection(invalidate=True)
+        finally:
+            await self._close_connection()
+
+    def _set_leader(self, is_leader: bool):
+        self.is_leader = is_leader
+        set_gauge("leader.is_leader", 1 if is_leader else 0, role=self.name)
+
+    async def _close_connection(self, invalidate: bool = False):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        await run_blocking(EXECUTOR_DB, _close_lock_connection, conn, invalidate)
+
+
+async def run_as_leader(name: str, func: Callable[[], Awaitable[None]]):
+    """
+    Runs `func` while this process leads the role `name` and stands by otherwise,
+    restarting it whenever leadership is regained. Runs until cancelled, then steps down.
+    """
+    election = LeaderElection(name)
+    try:
+        while True:
+            if not await election.try_acquire():
+                await asyncio.sleep(LEADER_RETRY_SECONDS)
+                continue
+
+            task = asyncio.create_task(func())
+            try:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=LEADER_RENEW_SECONDS)
+                    if done or not await election.renew():
+                        break
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+            if task.done() and not task.cancelled() and task.exception():
+                logger.error(f"Leader Election: '{name}' stopped with an error: {task.exception()}")
+            # Let a standby take over if the role keeps failing here.
+            await election.release()
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+    finally:
+        await election.release()
+
+
+def _close_lock_connection(conn: Connection, invalidate: bool):
+    try:
+        if invalidate:
+            # Drops the session, and any lock it holds, whatever state it was left in.
+            conn.invalidate()
+        conn.close()
+    except Exception as e:
+        logger.debug(f"Leader Election: Ignoring error while closing the lock connection: {e}")
+
+
+def _get_lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=LEADER_LEASE_SECONDS)
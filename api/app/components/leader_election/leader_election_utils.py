@@ -0,0 +1,22 @@
+import hashlib
+from sqlalchemy.engine import Engine
+
+# Dialects whose session-level advisory locks back the election.
+ADVISORY_LOCK_DIALECTS = ("postgresql",)
+
+# Role elected among the processes running the upload scheduler.
+SCHEDULER_LEADER_NAME = "upload_scheduler"
+# Role elected among the processes polling YouTube for the processing status of uploads.
+PROCESSING_STATUS_LEADER_NAME = "processing_status_poller"
+
+
+def supports_advisory_locks(bind: Engine) -> bool:
+    return bind.dialect.name in ADVISORY_LOCK_DIALECTS
+
+
+def get_advisory_lock_key(name: str) -> int:
+    """
+    Maps a role name to a stable signed 64-bit advisory lock key, the same in every process.
+    """
+    digest = hashlib.sha256(f"popebeats2tube:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
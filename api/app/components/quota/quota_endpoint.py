@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.auth_dependencies import get_current_user
+from app.components.quota.quota_service import get_quota_forecast
+from app.db.db import get_db_session
+from app.logger.logging_setup import logger
+from app.utils.http_response_util import response_200
+
+quota_router = APIRouter(dependencies=[Depends(get_current_user)])
+
+@quota_router.get("/forecast")
+async def get_forecast(
+    db: Session = Depends(get_db_session),
+    current_user_id: str = Depends(get_current_user),
+    days: int = Query(7, ge=1, le=31)
+):
+    """
+    Returns the remaining YouTube quota for today and a per-day forecast of how many
+    scheduled uploads fit the budget and how many will be deferred.
+
+    Args:
+    -----
+    db : Session
+        The database session used for querying.
+    current_user_id : str
+        The ID of the current user extracted from the token.
+    days : int
+        The number of quota days to forecast, starting with today.
+    """
+    try:
+        forecast = get_quota_forecast(str(current_user_id), db, days)
+        return response_200("Success.", "Successfully computed quota forecast.", forecast)
+    except Exception as e:
+        logger.error(f"Failed to compute quota forecast for user_id {current_user_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
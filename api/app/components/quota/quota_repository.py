@@ -0,0 +1,194 @@
+"""
+Repository Layer: YouTube Quota
+===============================
+This module provides functions for reading and writing the YouTube quota ledger.
+
+Responsibilities:
+-----------------
+- Read the units consumed per project, or per project and user, on a quota day.
+- Reserve units within the project's (and optionally the user's) daily limit.
+- Add (or release) consumed units for a user on a quota day.
+
+The project's total for a quota day lives in a single ledger row, next to the per-user
+rows. Every change to it is one conditional UPDATE, so the limit is enforced by the
+database even when several processes reserve quota at the same time.
+
+Functions:
+----------
+- get_units_used: Units consumed on a quota day by the project, or by one user.
+- try_add_units_used: Add units to the project's and the user's rows if both stay within their limits.
+- add_units_used: Add units to the project's and the user's rows unconditionally.
+- fill_units_used: Raise the project's units for a quota day to its limit.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.db import QuotaLedger, QuotaUsage
+
+
+def get_units_used(project_id: str, quota_day: date, db: Session, user_id: Optional[str] = None) -> int:
+    if user_id:
+        query = db.query(QuotaUsage.units_used).filter(
+            QuotaUsage.project_id == project_id,
+            QuotaUsage.user_id == user_id,
+            QuotaUsage.quota_day == quota_day
+        )
+    else:
+        query = db.query(QuotaLedger.units_used).filter(
+            QuotaLedger.project_id == project_id,
+            QuotaLedger.quota_day == quota_day
+        )
+    return int(query.scalar() or 0)
+
+
+def try_add_units_used(
+    project_id: str,
+    user_id: str,
+    quota_day: date,
+    units: int,
+    project_limit: int,
+    user_limit: Optional[int],
+    db: Session
+) -> bool:
+    """
+    Add units to the project's and the user's rows for the quota day, provided neither
+    would exceed its limit (`user_limit` None means the user has no cap of their own).
+
+    The project row is updated first, so concurrent reservations queue on the same row.
+    On False, the caller must roll back to undo a project update already made.
+
+    The caller is responsible for committing the transaction.
+    """
+    _create_missing_rows(project_id, user_id, quota_day, db)
+    now = datetime.now(timezone.utc)
+
+    updated = (
+        db.query(QuotaLedger)
+        .filter(
+            QuotaLedger.project_id == project_id,
+            QuotaLedger.quota_day == quota_day,
+            QuotaLedger.units_used + units <= project_limit
+        )
+        .update({
+            QuotaLedger.units_used: QuotaLedger.units_used + units,
+            QuotaLedger.date_updated: now
+        }, synchronize_session=False)
+    )
+    if updated != 1:
+        return False
+
+    user_filter = [
+        QuotaUsage.project_id == project_id,
+        QuotaUsage.user_id == user_id,
+        QuotaUsage.quota_day == quota_day
+    ]
+    if user_limit is not None:
+        user_filter.append(QuotaUsage.units_used + units <= user_limit)
+    updated = (
+        db.query(QuotaUsage)
+        .filter(*user_filter)
+        .update({
+            QuotaUsage.units_used: QuotaUsage.units_used + units,
+            QuotaUsage.date_updated: now
+        }, synchronize_session=False)
+    )
+    return updated == 1
+
+
+def add_units_used(project_id: str, user_id: str, quota_day: date, units: int, db: Session):
+    """
+    Add units to the project's and the user's rows for the quota day, whatever the
+    limits. Negative units release a previous reservation; no row drops below zero.
+
+    The caller is responsible for committing the transaction.
+    """
+    _create_missing_rows(project_id, user_id, quota_day, db)
+    now = datetime.now(timezone.utc)
+
+    (
+        db.query(QuotaLedger)
+        .filter(QuotaLedger.project_id == project_id, QuotaLedger.quota_day == quota_day)
+        .update({
+            QuotaLedger.units_used: case((QuotaLedger.units_used + units < 0, 0), else_=QuotaLedger.units_used + units),
+            QuotaLedger.date_updated: now
+        }, synchronize_session=False)
+    )
+    _add_user_units(project_id, user_id, quota_day, units, now, db)
+
+
+def fill_units_used(project_id: str, user_id: str, quota_day: date, limit: int, db: Session) -> int:
+    """
+    Raise the project's units for the quota day to `limit`, attributing the difference
+    to the user. Each raise only applies if no other process changed the row since it
+    was read, and is retried otherwise.
+
+    The caller is responsible for committing the transaction.
+
+    Returns:
+    --------
+    int
+        The units added, 0 if the project had already reached the limit.
+    """
+    _create_missing_rows(project_id, user_id, quota_day, db)
+    now = datetime.now(timezone.utc)
+
+    while True:
+        used = get_units_used(project_id, quota_day, db)
+        if used >= limit:
+            return 0
+        updated = (
+            db.query(QuotaLedger)
+            .filter(
+                QuotaLedger.project_id == project_id,
+                QuotaLedger.quota_day == quota_day,
+                QuotaLedger.units_used == used
+            )
+            .update({
+                QuotaLedger.units_used: limit,
+                QuotaLedger.date_updated: now
+            }, synchronize_session=False)
+        )
+        if updated == 1:
+            _add_user_units(project_id, user_id, quota_day, limit - used, now, db)
+            return limit - used
+
+
+def _add_user_units(project_id: str, user_id: str, quota_day: date, units: int, now: datetime, db: Session):
+    (
+        db.query(QuotaUsage)
+        .filter(
+            QuotaUsage.project_id == project_id,
+            QuotaUsage.user_id == user_id,
+            QuotaUsage.quota_day == quota_day
+        )
+        .update({
+            QuotaUsage.units_used: case((QuotaUsage.units_used + units < 0, 0), else_=QuotaUsage.units_used + units),
+            QuotaUsage.date_updated: now
+        }, synchronize_session=False)
+    )
+
+
+def _create_missing_rows(project_id: str, user_id: str, quota_day: date, db: Session):
+    # Commits empty rows of the day on first use, so the updates above always find their row.
+    created = False
+    if db.query(QuotaLedger.id).filter(QuotaLedger.project_id == project_id, QuotaLedger.quota_day == quota_day).first() is None:
+        db.add(QuotaLedger(project_id=project_id, quota_day=quota_day, units_used=0, date_updated=datetime.now(timezone.utc)))
+        created = True
+    if db.query(QuotaUsage.id).filter(
+        QuotaUsage.project_id == project_id,
+        QuotaUsage.user_id == user_id,
+        QuotaUsage.quota_day == quota_day
+    ).first() is None:
+        db.add(QuotaUsage(project_id=project_id, user_id=user_id, quota_day=quota_day, units_used=0, date_updated=datetime.now(timezone.utc)))
+        created = True
+    if not created:
+        return
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process created a row first; both rows exist now.
+        db.rollback()
+        _create_missing_rows(project_id, user_id, quota_day, db)
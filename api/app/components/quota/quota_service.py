@@ -0,0 +1,174 @@
+"""
+Service Layer: YouTube Quota
+============================
+Tracks YouTube Data API quota consumption per Google project and per user, and
+decides whether an operation still fits today's budget.
+
+Responsibilities:
+-----------------
+- Reserve quota before an operation is attempted, and release it when the operation never reached YouTube.
+- Record unconditional charges (e.g. status polling).
+- Reconcile the ledger when YouTube reports `quotaExceeded`.
+- Forecast the remaining capacity for the coming quota days.
+
+Quota days follow the Pacific-time boundary YouTube resets quotas on.
+
+The limits are enforced by the database (see `quota_repository.try_add_units_used`), so
+processes sharing the project can never reserve more than its daily budget between them.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.components.quota.quota_repository import add_units_used, fill_units_used, get_units_used, try_add_units_used
+from app.components.quota.quota_utils import get_next_quota_reset, get_quota_cost, get_quota_day
+from app.components.tune_ops.tune_ops_utils import ACTIVE_TUNE_STATUSES
+from app.db.db import Tune
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    YOUTUBE_QUOTA_PROJECT_ID,
+    YOUTUBE_QUOTA_DAILY_LIMIT,
+    YOUTUBE_QUOTA_USER_DAILY_LIMIT,
+)
+from app.utils.metrics_util import increment_counter
+
+def get_remaining_quota(user_id: str, db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Returns the units still available to a user today: the smaller of the project's
+    remaining budget and the user's own cap (if one is configured).
+    """
+    quota_day = get_quota_day(now)
+    remaining = YOUTUBE_QUOTA_DAILY_LIMIT - get_units_used(YOUTUBE_QUOTA_PROJECT_ID, quota_day, db)
+    if YOUTUBE_QUOTA_USER_DAILY_LIMIT > 0:
+        user_used = get_units_used(YOUTUBE_QUOTA_PROJECT_ID, quota_day, db, user_id=user_id)
+        remaining = min(remaining, YOUTUBE_QUOTA_USER_DAILY_LIMIT - user_used)
+    return max(0, remaining)
+
+
+def try_reserve_quota(user_id: str, operation: str, db: Session) -> bool:
+    """
+    Reserves the cost of `operation` against today's budget.
+
+    Returns:
+    --------
+    bool
+        True if the operation fits and was recorded, False if it must be deferred.
+    """
+    cost = get_quota_cost(operation)
+    user_limit = YOUTUBE_QUOTA_USER_DAILY_LIMIT if YOUTUBE_QUOTA_USER_DAILY_LIMIT > 0 else None
+    try:
+        if not try_add_units_used(YOUTUBE_QUOTA_PROJECT_ID, user_id, get_quota_day(), cost, YOUTUBE_QUOTA_DAILY_LIMIT, user_limit, db):
+            db.rollback()
+            increment_counter("quota.deferred", operation=operation)
+            logger.warning(f"Quota budget exhausted for user {user_id}. Deferring '{operation}' until {get_next_quota_reset().isoformat()}.")
+            return False
+
+        db.commit()
+        increment_counter("quota.units_used", cost, operation=operation)
+        logger.debug(f"Reserved {cost} quota units for '{operation}' (user {user_id}).")
+        return True
+    except Exception:
+        db.rollback()
+        raise
+
+
+def release_quota(user_id: str, operation: str, db: Session):
+    """
+    Returns a reservation made by `try_reserve_quota` for an operation that never reached YouTube.
+    """
+    cost = get_quota_cost(operation)
+    try:
+        add_units_used(YOUTUBE_QUOTA_PROJECT_ID, user_id, get_quota_day(), -cost, db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    increment_counter("quota.units_used", -cost, operation=operation)
+    logger.debug(f"Released {cost} quota units for '{operation}' (user {user_id}).")
+
+
+def record_quota_usage(user_id: str, operation: str, db: Session, calls: int = 1):
+    """
+    Records operations that are performed regardless of the remaining budget.
+    """
+    units = get_quota_cost(operation) * calls
+    try:
+        add_units_used(YOUTUBE_QUOTA_PROJECT_ID, user_id, get_quota_day(), units, db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    increment_counter("quota.units_used", units, operation=operation)
+
+
+def mark_quota_exhausted(user_id: str, db: Session):
+    """
+    Brings the ledger in line with YouTube after a `quotaExceeded` response, so the
+    remaining tunes are deferred until the next reset instead of failing one by one.
+    """
+    try:
+        fill_units_used(YOUTUBE_QUOTA_PROJECT_ID, user_id, get_quota_day(), YOUTUBE_QUOTA_DAILY_LIMIT, db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    increment_counter("quota.exceeded_reported")
+    logger.warning(f"YouTube reported the project quota as exceeded. Uploads are paused until {get_next_quota_reset().isoformat()}.")
+
+
+def get_quota_forecast(user_id: str, db: Session, days: int = 7) -> dict:
+    """
+    Forecasts quota capacity for today and the following quota days.
+
+    Each day lists the uploads scheduled for it (tunes not uploaded or dead-lettered, with
+    overdue tunes counted towards today), how many uploads the budget can take, and
+    how many would be deferred to a later day. Future days assume the full daily
+    budget (or the user's cap) is available to this user.
+    """
+    now = datetime.now(timezone.utc)
+    today = get_quota_day(now)
+    insert_cost = get_quota_cost("videos.insert")
+    horizon_end = get_next_quota_reset(now) + timedelta(days=days - 1)
+
+    pending = (
+        db.query(Tune.upload_date)
+        .filter(
+            Tune.user_id == user_id,
+            Tune.status.in_(ACTIVE_TUNE_STATUSES),
+            Tune.upload_date < horizon_end
+        )
+        .all()
+    )
+    scheduled_per_day = Counter(max(today, get_quota_day(upload_date)) for (upload_date,) in pending if upload_date)
+
+    remaining_today = get_remaining_quota(user_id, db, now)
+    user_limit = YOUTUBE_QUOTA_USER_DAILY_LIMIT if YOUTUBE_QUOTA_USER_DAILY_LIMIT > 0 else YOUTUBE_QUOTA_DAILY_LIMIT
+    daily_capacity = min(YOUTUBE_QUOTA_DAILY_LIMIT, user_limit) // insert_cost
+
+    forecast = []
+    carried_over = 0
+    for offset in range(days):
+        day = today + timedelta(days=offset)
+        capacity = remaining_today // insert_cost if offset == 0 else daily_capacity
+        demand = scheduled_per_day.get(day, 0) + carried_over
+        uploads = min(demand, capacity)
+        carried_over = demand - uploads
+        forecast.append({
+            "quota_day": day.isoformat(),
+            "scheduled_uploads": scheduled_per_day.get(day, 0),
+            "upload_capacity": capacity,
+            "planned_uploads": uploads,
+            "deferred_uploads": carried_over,
+        })
+
+    return {
+        "project_id": YOUTUBE_QUOTA_PROJECT_ID,
+        "project_daily_limit": YOUTUBE_QUOTA_DAILY_LIMIT,
+        "project_units_used": get_units_used(YOUTUBE_QUOTA_PROJECT_ID, today, db),
+        "user_daily_limit": YOUTUBE_QUOTA_USER_DAILY_LIMIT or None,
+        "user_units_used": get_units_used(YOUTUBE_QUOTA_PROJECT_ID, today, db, user_id=user_id),
+        "remaining_units": remaining_today,
+        "video_insert_cost": insert_cost,
+        "next_reset_at": get_next_quota_reset(now),
+        "days": forecast,
+    }
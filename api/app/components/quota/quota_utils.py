@@ -0,0 +1,58 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+from app.components.retry_policy.retry_policy_utils import get_error_reason
+from app.settings.env_settings import YOUTUBE_QUOTA_VIDEO_INSERT_COST
+
+# YouTube Data API daily quotas reset at midnight Pacific time.
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Unit cost per YouTube Data API operation.
+QUOTA_COSTS = {
+    "videos.insert": YOUTUBE_QUOTA_VIDEO_INSERT_COST,
+    "videos.list": 1,
+    "videos.update": 50,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "search.list": 100,
+}
+
+
+class QuotaDeferredError(Exception):
+    """
+    Raised when an operation does not fit today's quota budget and has to wait for the reset.
+    """
+
+
+def get_quota_cost(operation: str) -> int:
+    if operation not in QUOTA_COSTS:
+        raise ValueError(f"Unknown YouTube API operation: {operation}")
+    return QUOTA_COSTS[operation]
+
+
+def get_quota_day(now: Optional[datetime] = None) -> date:
+    """
+    Returns the quota day (the calendar date in Pacific time) a moment falls into.
+    """
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(QUOTA_TIMEZONE).date()
+
+
+def get_next_quota_reset(now: Optional[datetime] = None) -> datetime:
+    """
+    Returns the UTC moment the current quota day ends.
+    """
+    next_day = get_quota_day(now) + timedelta(days=1)
+    return datetime.combine(next_day, time.min, tzinfo=QUOTA_TIMEZONE).astimezone(timezone.utc)
+
+
+def is_quota_exceeded_error(error: Exception) -> bool:
+    return get_error_reason(error) in ("quotaExceeded", "dailyLimitExceeded")
+
+
+def is_quota_deferral(error: Exception) -> bool:
+    """
+    Whether `error` means the operation has to wait for the quota reset: our own budget
+    did not cover it, or YouTube reported the quota as exceeded.
+    """
+    return isinstance(error, QuotaDeferredError) or is_quota_exceeded_error(error)
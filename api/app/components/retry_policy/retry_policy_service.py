@@ -0,0 +1,133 @@
+"""
+Service Layer: Retry Policy
+===========================
+Shared retry engine for YouTube and Google OAuth calls.
+
+Responsibilities:
+-----------------
+- Classify errors as retryable or fatal (see `retry_policy_utils`).
+- Retry transient failures with exponential backoff and full jitter.
+- Honor `Retry-After` headers sent with 429/503 responses.
+- Cap the total number of retries a single tune may spend across all its calls.
+- Count attempts, retries and give-ups per operation for monitoring.
+
+Metrics:
+--------
+- retry.attempts{operation}: calls made, including the first one.
+- retry.retries{operation}: calls repeated after a retryable error.
+- retry.fatal{operation}: errors classified as fatal.
+- retry.exhausted{operation}: retryable errors given up on (attempts, budget or Retry-After too long).
+"""
+import asyncio
+from typing import Any, Callable, Optional
+from app.components.retry_policy.retry_policy_utils import (
+    compute_backoff_delay,
+    get_retry_after_seconds,
+    is_retryable_error,
+)
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+    RETRY_TUNE_BUDGET,
+)
+from app.utils.metrics_util import increment_counter
+
+
+class RetryPolicy:
+    """
+    Describes how often and how patiently an operation is retried.
+    """
+    def __init__(
+        self,
+        operation: str,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = RETRY_MAX_DELAY_SECONDS
+    ):
+        self.operation = operation
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+
+class RetryBudget:
+    """
+    Total number of retries shared by every call made on behalf of one tune.
+    """
+    def __init__(self, max_retries: int = RETRY_TUNE_BUDGET):
+        self._remaining = max_retries
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    def try_consume(self) -> bool:
+        if self._remaining <= 0:
+            return False
+        self._remaining -= 1
+        return True
+
+
+async def call_with_retry_async(
+    func: Callable[..., Any],
+    *args,
+    policy: RetryPolicy,
+    budget: Optional[RetryBudget] = None,
+    **kwargs
+) -> Any:
+    """
+    Awaits `func` and retries it on retryable errors, sleeping between attempts.
+    """
+    attempt = 0
+    while True:
+        increment_counter("retry.attempts", operation=policy.operation)
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            delay = _get_retry_delay(e, attempt, policy, budget)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _get_retry_delay(
+    error: Exception,
+    attempt: int,
+    policy: RetryPolicy,
+    budget: Optional[RetryBudget]
+) -> Optional[float]:
+    """
+    Decides whether `error` should be retried and returns the delay before the next attempt,
+    or None if the error must be raised.
+    """
+    if not is_retryable_error(error):
+        increment_counter("retry.fatal", operation=policy.operation)
+        logger.debug(f"{policy.operation}: fatal error, not retrying: {error}")
+        return None
+
+    if attempt + 1 >= policy.max_attempts:
+        increment_counter("retry.exhausted", operation=policy.operation)
+        logger.warning(f"{policy.operation}: giving up after {attempt + 1} attempts: {error}")
+        return None
+
+    delay = compute_backoff_delay(attempt, policy.base_delay, policy.max_delay)
+    retry_after = get_retry_after_seconds(error)
+    if retry_after is not None:
+        if retry_after > policy.max_delay:
+            # Waiting that long would hold a worker slot; let the tune be rescheduled instead.
+            increment_counter("retry.exhausted", operation=policy.operation)
+            logger.warning(f"{policy.operation}: Retry-After of {retry_after:.0f}s exceeds the maximum delay. Giving up.")
+            return None
+        delay = max(delay, retry_after)
+
+    if budget is not None and not budget.try_consume():
+        increment_counter("retry.exhausted", operation=policy.operation)
+        logger.warning(f"{policy.operation}: retry budget for this tune is exhausted: {error}")
+        return None
+
+    increment_counter("retry.retries", operation=policy.operation)
+    logger.warning(f"{policy.operation}: retryable error (attempt {attempt + 1}/{policy.max_attempts}), retrying in {delay:.1f}s: {error}")
+    return delay
@@ -0,0 +1,110 @@
+import http.client
+import json
+import random
+import socket
+import ssl
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import httpx
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# 403 is normally fatal, except for the per-second rate limits YouTube reports with it.
+RETRYABLE_ERROR_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError"}
+
+# Retrying these only burns quota and time; they need a new day or user action.
+FATAL_ERROR_REASONS = {"quotaExceeded", "dailyLimitExceeded", "uploadLimitExceeded", "invalid_grant"}
+
+TRANSIENT_EXCEPTIONS = (
+    socket.timeout,
+    TimeoutError,
+    ConnectionError,
+    ssl.SSLError,
+    http.client.HTTPException,
+    httpx.TransportError,
+)
+
+
+def get_error_status(error: Exception) -> Optional[int]:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    return None
+
+
+def get_error_reason(error: Exception) -> Optional[str]:
+    """
+    Extracts the machine-readable error reason from a Google API or OAuth error response.
+    """
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+
+    content = error.response.content
+    if not content:
+        return None
+
+    try:
+        payload = json.loads(content)
+    except (ValueError, TypeError):
+        return None
+
+    err = payload.get("error")
+    if isinstance(err, str):
+        # OAuth token endpoint: {"error": "invalid_grant", ...}
+        return err
+    if isinstance(err, dict):
+        for detail in err.get("errors", []):
+            if detail.get("reason"):
+                return detail["reason"]
+        return err.get("status")
+    return None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Classifies an error raised by a YouTube or token call as retryable (transient) or fatal.
+    """
+    reason = get_error_reason(error)
+    if reason in FATAL_ERROR_REASONS:
+        return False
+    if reason in RETRYABLE_ERROR_REASONS:
+        return True
+
+    status = get_error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    return isinstance(error, TRANSIENT_EXCEPTIONS)
+
+
+def get_retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Returns the delay requested by a `Retry-After` header, in seconds, if present.
+    Both the delta-seconds and HTTP-date forms are supported.
+    """
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def compute_backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Exponential backoff with full jitter: a random delay in [0, min(max_delay, base_delay * 2^attempt)].
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
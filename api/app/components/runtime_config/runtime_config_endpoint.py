@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.auth_dependencies import verify_admin_api_key
+from app.components.runtime_config.runtime_config_schema import RuntimeConfigUpdate
+from app.components.runtime_config.runtime_config_service import get_runtime_config_service, update_runtime_config_service
+from app.components.runtime_config.runtime_config_validator import validate_runtime_config_update
+from app.db.db import get_db_session
+from app.logger.logging_setup import logger
+from app.utils.http_response_util import response_200
+
+runtime_config_router = APIRouter(dependencies=[Depends(verify_admin_api_key)])
+
+@runtime_config_router.get("")
+async def get_runtime_config(db: Session = Depends(get_db_session)):
+    """
+    Lists the settings that can be changed at runtime, each with its effective value,
+    its environment default and whether it is overridden. Requires the admin API key.
+    """
+    try:
+        config = await get_runtime_config_service(db)
+        return response_200("Success.", "Successfully fetched runtime configuration.", config)
+    except Exception as e:
+        logger.error(f"Failed to fetch runtime configuration: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@runtime_config_router.patch("")
+async def update_runtime_config(update: RuntimeConfigUpdate, db: Session = Depends(get_db_session)):
+    """
+    Changes the given settings without a restart. This process applies them at once,
+    other processes within `POPEBEATS2TUBE_RUNTIME_CONFIG_REFRESH_SECONDS`. Running
+    renders and uploads are never interrupted; a smaller pool only holds back new work.
+
+    Raises:
+    -------
+    HTTPException
+        400: If no setting is given.
+    """
+    try:
+        validate_runtime_config_update(update)
+        config = await update_runtime_config_service(update.model_dump(exclude_unset=True), db)
+        return response_200("Success.", "Successfully updated runtime configuration.", config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to update runtime configuration: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
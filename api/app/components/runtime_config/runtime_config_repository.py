@@ -0,0 +1,44 @@
+"""
+Repository Layer: Runtime Configuration
+=======================================
+Stores the settings changed at runtime, one row per overridden setting, so every
+process applies them and they survive restarts.
+
+Functions:
+----------
+- get_runtime_settings: All stored overrides, by setting name.
+- save_runtime_settings: Store or remove overrides in one transaction.
+"""
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.db.db import RuntimeSetting
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_runtime_settings(db: Session) -> Dict[str, str]:
+    return {name: value for name, value in db.query(RuntimeSetting.name, RuntimeSetting.value).all()}
+
+
+@in_executor(EXECUTOR_DB)
+def save_runtime_settings(values: Dict[str, Optional[str]], now: datetime, db: Session):
+    """
+    Stores each value as the override of its setting; a None value removes the
+    override, so the setting goes back to its default.
+    """
+    try:
+        for name, value in values.items():
+            setting = db.get(RuntimeSetting, name)
+            if value is None:
+                if setting is not None:
+                    db.delete(setting)
+            elif setting is None:
+                db.add(RuntimeSetting(name=name, value=value, date_updated=now))
+            else:
+                setting.value = value
+                setting.date_updated = now
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,25 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from app.components.runtime_config.runtime_config_utils import (
+    MAX_IO_WORKERS,
+    MAX_SCHEDULER_INTERVAL_MINUTES,
+    MAX_STAGE_WORKERS,
+    MAX_USER_CONCURRENCY
+)
+
+class RuntimeConfigUpdate(BaseModel):
+    """
+    Settings to change at runtime. Omitted settings are left as they are; a setting
+    set to null goes back to its environment default.
+    """
+    probe_workers: Optional[int] = Field(None, ge=1, le=MAX_STAGE_WORKERS)
+    render_workers: Optional[int] = Field(None, ge=1, le=MAX_STAGE_WORKERS)
+    upload_workers: Optional[int] = Field(None, ge=1, le=MAX_STAGE_WORKERS)
+    finalize_workers: Optional[int] = Field(None, ge=1, le=MAX_STAGE_WORKERS)
+    user_concurrency: Optional[int] = Field(None, ge=1, le=MAX_USER_CONCURRENCY)
+    io_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS)
+    db_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS)
+    fs_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS)
+    upload_io_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS)
+    subprocess_wait_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS)
+    scheduler_interval_minutes: Optional[int] = Field(None, ge=1, le=MAX_SCHEDULER_INTERVAL_MINUTES)
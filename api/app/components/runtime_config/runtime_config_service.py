@@ -0,0 +1,150 @@
+"""
+Service Layer: Runtime Configuration
+====================================
+Changes pool sizes and the sweep interval while the application runs, without a
+restart that would kill in-flight uploads.
+
+Responsibilities:
+-----------------
+- Store overrides set through the admin API in `runtime_settings`; a setting without
+  one keeps its environment default.
+- Apply the effective values to this process: the worker count of each pipeline
+  stage, the per-user cap of every stage, the thread pools and the sweep interval.
+  With adaptive upload concurrency, the upload workers are the ceiling the upload
+  concurrency controller adapts below.
+- Re-read the overrides every `RUNTIME_CONFIG_REFRESH_SECONDS` in processes running
+  the upload pipeline, so a change made through the API reaches every worker.
+
+Every change is applied without interrupting running jobs: stages and thread pools
+finish what they run under the old size (see `UploadDispatcher.resize` and
+`NamedExecutor.resize`).
+
+Metrics:
+--------
+- runtime_config.value (setting): the value applied in this process.
+"""
+import asyncio
+import traceback
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from app.components.runtime_config.runtime_config_repository import get_runtime_settings, save_runtime_settings
+from app.components.runtime_config.runtime_config_utils import (
+    EXECUTOR_WORKER_SETTINGS,
+    IO_WORKERS,
+    RUNTIME_SETTING_DEFAULTS,
+    SCHEDULER_INTERVAL,
+    STAGE_WORKER_SETTINGS,
+    UPLOAD_WORKERS,
+    USER_CONCURRENCY,
+    parse_runtime_settings
+)
+from app.components.upload.upload_concurrency.upload_concurrency_service import upload_concurrency_controller
+from app.components.upload.upload_pipeline.upload_pipeline_service import upload_pipeline
+from app.db.db import get_db_session_context
+from app.jobs.tune_upload_job import set_scheduler_interval
+from app.logger.logging_setup import logger
+from app.settings.env_settings import RUNTIME_CONFIG_REFRESH_SECONDS
+from app.utils.executor_util import resize_default_executor, resize_executor
+from app.utils.metrics_util import set_gauge
+
+# Values in effect in this process; everything starts at its default.
+_applied: Dict[str, int] = dict(RUNTIME_SETTING_DEFAULTS)
+_watcher_task: Optional[asyncio.Task] = None
+
+
+async def get_runtime_config_service(db: Session) -> Dict[str, dict]:
+    """
+    Returns every setting with its effective value, its default and whether it is overridden.
+    """
+    overrides = parse_runtime_settings(await get_runtime_settings(db))
+    return {
+        name: {"value": overrides.get(name, default), "default": default, "overridden": name in overrides}
+        for name, default in RUNTIME_SETTING_DEFAULTS.items()
+    }
+
+
+async def update_runtime_config_service(changes: Dict[str, Optional[int]], db: Session) -> Dict[str, dict]:
+    """
+    Stores the changed settings, a None value resetting one to its default, and applies
+    them to this process. Other processes apply them at their next refresh.
+    """
+    await save_runtime_settings(
+        {name: None if value is None else str(value) for name, value in changes.items()},
+        datetime.now(timezone.utc),
+        db
+    )
+    logger.info(f"Runtime configuration changed: {changes}")
+    apply_runtime_config(parse_runtime_settings(await get_runtime_settings(db)))
+    return await get_runtime_config_service(db)
+
+
+def apply_runtime_config(overrides: Dict[str, int]):
+    """
+    Applies the effective value of every setting that changed since it was last applied.
+    """
+    for name, default in RUNTIME_SETTING_DEFAULTS.items():
+        value = overrides.get(name, default)
+        if _applied.get(name) == value:
+            continue
+        try:
+            _get_applier(name)(value)
+        except Exception as e:
+            logger.error(f"Failed to apply runtime setting '{name}'={value}: {e}")
+            continue
+        _applied[name] = value
+        set_gauge("runtime_config.value", value, setting=name)
+
+
+async def refresh_runtime_config():
+    """
+    Reads the stored overrides and applies what changed.
+    """
+    try:
+        with get_db_session_context() as db:
+            overrides = parse_runtime_settings(await get_runtime_settings(db))
+        apply_runtime_config(overrides)
+    except Exception as e:
+        # The current values stay in effect until the next refresh.
+        logger.error(f"Failed to refresh the runtime configuration: {e}")
+        logger.debug(traceback.format_exc())
+
+
+def start_runtime_config_watcher():
+    global _watcher_task
+    if _watcher_task is None or _watcher_task.done():
+        _watcher_task = asyncio.create_task(_watch_runtime_config())
+
+
+async def stop_runtime_config_watcher():
+    global _watcher_task
+    if _watcher_task is None:
+        return
+    _watcher_task.cancel()
+    try:
+        await _watcher_task
+    except asyncio.CancelledError:
+        pass
+    _watcher_task = None
+
+
+async def _watch_runtime_config():
+    while True:
+        await refresh_runtime_config()
+        await asyncio.sleep(RUNTIME_CONFIG_REFRESH_SECONDS)
+
+
+def _get_applier(name: str) -> Callable[[int], None]:
+    if name == UPLOAD_WORKERS and upload_concurrency_controller.enabled:
+        return upload_concurrency_controller.set_max_limit
+    if name in STAGE_WORKER_SETTINGS:
+        return lambda value: upload_pipeline.resize_stage(STAGE_WORKER_SETTINGS[name], value)
+    if name == USER_CONCURRENCY:
+        return upload_pipeline.set_user_limit
+    if name == IO_WORKERS:
+        return resize_default_executor
+    if name in EXECUTOR_WORKER_SETTINGS:
+        return lambda value: resize_executor(EXECUTOR_WORKER_SETTINGS[name], value)
+    if name == SCHEDULER_INTERVAL:
+        return set_scheduler_interval
+    raise ValueError(f"Unknown runtime setting '{name}'.")
@@ -0,0 +1,88 @@
+from typing import Dict
+from app.components.upload.upload_pipeline.upload_pipeline_utils import STAGE_FINALIZE, STAGE_PROBE, STAGE_RENDER, STAGE_UPLOAD
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    DISPATCH_USER_CONCURRENCY,
+    EXECUTOR_DB_WORKERS,
+    EXECUTOR_FS_WORKERS,
+    EXECUTOR_SUBPROCESS_WAIT_WORKERS,
+    EXECUTOR_UPLOAD_IO_WORKERS,
+    IO_EXECUTOR_WORKERS,
+    PIPELINE_FINALIZE_WORKERS,
+    PIPELINE_PROBE_WORKERS,
+    PIPELINE_RENDER_WORKERS,
+    PIPELINE_UPLOAD_WORKERS,
+    SCHEDULER_INTERVAL_MINUTES
+)
+from app.utils.executor_util import EXECUTOR_DB, EXECUTOR_FS, EXECUTOR_SUBPROCESS_WAIT, EXECUTOR_UPLOAD_IO
+
+# Settings that can be changed at runtime, named as in the admin API.
+PROBE_WORKERS = "probe_workers"
+RENDER_WORKERS = "render_workers"
+UPLOAD_WORKERS = "upload_workers"
+FINALIZE_WORKERS = "finalize_workers"
+USER_CONCURRENCY = "user_concurrency"
+IO_WORKERS = "io_workers"
+DB_WORKERS = "db_workers"
+FS_WORKERS = "fs_workers"
+UPLOAD_IO_WORKERS = "upload_io_workers"
+SUBPROCESS_WAIT_WORKERS = "subprocess_wait_workers"
+SCHEDULER_INTERVAL = "scheduler_interval_minutes"
+
+# Value of each setting without an override: its environment setting.
+RUNTIME_SETTING_DEFAULTS = {
+    PROBE_WORKERS: PIPELINE_PROBE_WORKERS,
+    RENDER_WORKERS: PIPELINE_RENDER_WORKERS,
+    UPLOAD_WORKERS: PIPELINE_UPLOAD_WORKERS,
+    FINALIZE_WORKERS: PIPELINE_FINALIZE_WORKERS,
+    USER_CONCURRENCY: DISPATCH_USER_CONCURRENCY,
+    IO_WORKERS: IO_EXECUTOR_WORKERS,
+    DB_WORKERS: EXECUTOR_DB_WORKERS,
+    FS_WORKERS: EXECUTOR_FS_WORKERS,
+    UPLOAD_IO_WORKERS: EXECUTOR_UPLOAD_IO_WORKERS,
+    SUBPROCESS_WAIT_WORKERS: EXECUTOR_SUBPROCESS_WAIT_WORKERS,
+    SCHEDULER_INTERVAL: SCHEDULER_INTERVAL_MINUTES,
+}
+
+# Pipeline stage sized by each worker setting.
+STAGE_WORKER_SETTINGS = {
+    PROBE_WORKERS: STAGE_PROBE,
+    RENDER_WORKERS: STAGE_RENDER,
+    UPLOAD_WORKERS: STAGE_UPLOAD,
+    FINALIZE_WORKERS: STAGE_FINALIZE,
+}
+
+# Named executor sized by each thread pool setting.
+EXECUTOR_WORKER_SETTINGS = {
+    DB_WORKERS: EXECUTOR_DB,
+    FS_WORKERS: EXECUTOR_FS,
+    UPLOAD_IO_WORKERS: EXECUTOR_UPLOAD_IO,
+    SUBPROCESS_WAIT_WORKERS: EXECUTOR_SUBPROCESS_WAIT,
+}
+
+# Accepted ranges.
+MAX_STAGE_WORKERS = 256
+MAX_USER_CONCURRENCY = 64
+MAX_IO_WORKERS = 512
+MAX_SCHEDULER_INTERVAL_MINUTES = 24 * 60
+
+
+def parse_runtime_settings(stored: Dict[str, str]) -> Dict[str, int]:
+    """
+    Parses the overrides stored in `runtime_settings`. Rows that name no known setting
+    or hold no positive integer are skipped, so one bad row never blocks the others.
+    """
+    parsed = {}
+    for name, value in stored.items():
+        if name not in RUNTIME_SETTING_DEFAULTS:
+            logger.warning(f"Ignoring unknown runtime setting '{name}'.")
+            continue
+        try:
+            parsed[name] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring runtime setting '{name}': '{value}' is not an integer.")
+            continue
+        if parsed[name] < 1:
+            logger.warning(f"Ignoring runtime setting '{name}': {value} is not positive.")
+            del parsed[name]
+    return parsed
@@ -0,0 +1,5 @@
+from app.components.runtime_config.runtime_config_schema import RuntimeConfigUpdate
+
+def validate_runtime_config_update(update: RuntimeConfigUpdate):
+    if not update.model_fields_set:
+        raise ValueError("Set at least one setting, or null to reset it to its default.")
@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 
+from app.auth_dependencies import verify_admin_api_key
+from app.utils.http_response_util import response_200
+from app.utils.metrics_util import get_metrics_snapshot
+
 system_health_router = APIRouter()
 
 @system_health_router.get("")
@@ -9,4 +13,12 @@ async def health_check():
     Basic liveness check endpoint.
     Returns 200 OK if app is running.
     """
-    return JSONResponse(status_code=200, content={"status": "ok"})
\ No newline at end of file
+    return JSONResponse(status_code=200, content={"status": "ok"})
+
+@system_health_router.get("/metrics", dependencies=[Depends(verify_admin_api_key)])
+async def get_metrics():
+    """
+    Returns the in-process counters and gauges (retry counters, pipeline state, etc.)
+    for monitoring. Requires the admin API key.
+    """
+    return response_200("Success.", "Successfully fetched metrics.", get_metrics_snapshot())
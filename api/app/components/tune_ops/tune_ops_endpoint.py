@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from math import ceil
 
 from sqlalchemy.orm import Session
@@ -8,13 +8,19 @@ from fastapi.encoders import jsonable_encoder
 from requests import Session
 
 from app.auth_dependencies import get_current_user
-from app.components.tune_ops.tune_ops_validator import validate_scheduled_tunes_upload_time
+from app.components.tune_ops.tune_ops_validator import (
+    validate_allocation_window,
+    validate_scheduled_tunes_upload_time,
+    validate_tune_statuses
+)
 from app.components.user_mgmt.user_mgmt_validator import validate_user_exists
-from app.db.db import get_db_session
+from app.db.db import detach_from_session, get_db_session
 from app.dto import TuneDto
+from app.settings.env_settings import SCHEDULER_ENABLED
 from app.utils.http_response_util import (
     response_200,
     response_201,
+    response_202,
     response_204
 )
 
@@ -26,7 +32,9 @@ from app.components.tune_ops.tune_ops_service import (
 )
 from app.components.user_mgmt.user_mgmt_service import get_user_by_id_service
 from app.components.auth.google_oauth.google_oauth_service import validate_and_refresh_token
+from app.components.upload.due_tune_queue.due_tune_queue_listener import wake_schedule_listeners
 from app.components.upload.upload_processing.upload_processing_service import process_and_upload_tunes
+from app.components.upload.upload_dispatcher.upload_dispatcher_utils import LANE_INSTANT
 from app.logger.logging_setup import logger
 
 tune_ops_router = APIRouter(dependencies=[Depends(get_current_user)])
@@ -39,6 +47,11 @@ async def create_instant_tune(
 ):
     """
     Handles the instant upload of single or batch of tunes.
+
+    When the in-process scheduler is disabled, the tunes are stored in the instant lane,
+    due at once, and the worker processes are woken to upload them; the response is
+    then 202 Accepted. It is also 202 when a tune was not uploaded right away (deferred
+    to the quota reset or processed by another worker), listing its ID.
     """
     logger.debug("Received tune/s upload request.")
 
@@ -48,8 +61,25 @@ async def create_instant_tune(
     await validate_and_refresh_token(user, db)
 
     try:
-        created_tunes = await create_tunes_service(tunes, user.id, db)
-        await process_and_upload_tunes(created_tunes, user)
+        created_tunes = await create_tunes_service(tunes, user.id, db, dispatch_lane=LANE_INSTANT)
+        if not SCHEDULER_ENABLED:
+            await wake_schedule_listeners([tune.id for tune in created_tunes])
+            return response_202(
+                "Accepted",
+                "Tune/s queued for upload."
+            )
+
+        # The upload takes minutes; it must not hold the request's pooled connection meanwhile.
+        detach_from_session(db, user, *created_tunes)
+        outcomes = await process_and_upload_tunes(created_tunes, user, LANE_INSTANT)
+        pending_ids = [tune_id for tune_id, uploaded in outcomes.items() if not uploaded]
+        if pending_ids:
+            # Deferred to the quota reset, or claimed or leased by another worker.
+            return response_202(
+                "Accepted",
+                "Tune/s queued or deferred for upload.",
+                {"pending_tune_ids": pending_ids}
+            )
 
         return response_201(
             "Success",
@@ -66,7 +96,8 @@ async def get_all_user_tunes(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     executed: Optional[bool] = Query(None),
-    upload_date_before: Optional[datetime] = Query(None)
+    upload_date_before: Optional[datetime] = Query(None),
+    status: Optional[List[str]] = Query(None)
 ):
     """
     Retrieve a paginated list of tunes for the current user.
@@ -81,20 +112,29 @@ async def get_all_user_tunes(
         The page number for pagination.
     limit : int
         The number of items per page for pagination.
+    status : Optional[List[str]]
+        Only return tunes in one of these lifecycle statuses (repeat the parameter for several).
 
     Returns:
     --------
     dict
         A dictionary containing the paginated list of tunes, current page, and total pages.
+
+    Raises:
+    -------
+    HTTPException
+        400: If a status is unknown.
     """
     try:
+        validate_tune_statuses(status)
         tunes, total_count = await get_user_tunes_service(
             str(current_user_id),
             page,
             limit,
             db,
             upload_date_before=upload_date_before,
-            executed=executed
+            executed=executed,
+            statuses=status
         )
         total_pages = ceil(total_count / limit)
 
@@ -108,6 +148,8 @@ async def get_all_user_tunes(
                 "total_count": total_count,
             },
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to retrieve tunes for user_id {current_user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -116,22 +158,37 @@ async def get_all_user_tunes(
 async def create_scheduled_tune(
     tunes: list[TuneDto], 
     db: Session = Depends(get_db_session),
-    current_user_id: str = Depends(get_current_user)
+    current_user_id: str = Depends(get_current_user),
+    allocate: bool = Query(False),
+    window_start: Optional[datetime] = Query(None),
+    window_end: Optional[datetime] = Query(None)
 ):
     """
     Create multiple tune entries in a single batch operation.
 
+    With `allocate`, the upload dates in the request are ignored: each tune is placed
+    into a free slot between `window_start` (default: now) and `window_end`, spread
+    over the window around the renders and uploads already scheduled, per user and
+    overall, and within the YouTube quota of each day.
+
     Args:
     -----
     tunes : List[TuneDto]
         The list of tune data to create.
     db : Session
         The database session used for committing the new tunes.
+    allocate : bool
+        Whether to allocate the upload dates inside the window.
+    window_start : Optional[datetime]
+        The earliest upload date to allocate.
+    window_end : Optional[datetime]
+        The end (exclusive) of the window to allocate upload dates in.
 
     Returns:
     --------
     dict
-        A dictionary containing the result of the batch operation.
+        A dictionary containing the result of the batch operation; with `allocate`, the
+        ID, title and assigned upload date of every tune.
 
     Logs:
     -----
@@ -142,17 +199,29 @@ async def create_scheduled_tune(
     Raises:
     -------
     HTTPException
-        400: If any upload date is in the past.
+        400: If any upload date is in the past, or with `allocate`, if the window is
+        invalid or the tunes do not all fit it.
     """
     try:
         user = get_user_by_id_service(current_user_id, db)
         validate_user_exists(user)
-        validate_scheduled_tunes_upload_time(tunes)
+        if not allocate:
+            validate_scheduled_tunes_upload_time(tunes)
+            await create_tunes_service(tunes, str(current_user_id), db)
+            return response_201(
+                "Success",
+                "Scheduled tunes created successfully.",
+            )
 
-        await create_tunes_service(tunes, str(current_user_id), db)
+        allocation_window = validate_allocation_window(window_start, window_end)
+        created_tunes = await create_tunes_service(tunes, str(current_user_id), db, allocation_window)
         return response_201(
             "Success",
-            "Scheduled tunes created successfully.",
+            "Scheduled tunes created in allocated slots.",
+            jsonable_encoder([
+                {"id": tune.id, "video_title": tune.video_title, "upload_date": tune.upload_date}
+                for tune in created_tunes
+            ])
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -10,6 +10,11 @@ Responsibilities:
 - Create a new tune, including file transfers.
 - Update an existing tune, handling updated files.
 - Delete a tune.
+- Persist and clear resumable upload checkpoints.
+- Store the media measurements the capacity planner learns from.
+- Move tunes through their lifecycle statuses.
+- Count processing attempts and record failures with their retry time.
+- Record upload attempts and complete uploads atomically.
 
 Logging:
 --------
@@ -24,24 +29,56 @@ Functions:
 - create_tune: Create a new tune and handle associated file transfers.
 - update_tune: Update an existing tune, including file updates.
 - delete_tune: Delete a tune from the database.
+- save_upload_checkpoint: Persist the resumable upload session URI and committed byte offset.
+- save_tune_media_stats: Store the audio duration, video size and render time measured for a tune.
+- transition_tune_status: Move a tune to a new lifecycle status, recording the transition time.
+- start_tune_processing: Move a tune into its first processing stage and count the attempt.
+- record_tune_failure: Store a failed attempt's error and either its retry time or the dead letter.
+- refund_tune_attempt: Uncount an attempt that a shutdown interrupted.
+- defer_tune: Hold a pending tune back until a given time, without counting an attempt.
+- start_upload_attempt: Record the start of an upload attempt, assigning the idempotency token.
+- finish_upload_attempt: Close an upload attempt that did not produce a video.
+- has_in_doubt_upload_attempt: Check whether an earlier attempt may have reached YouTube.
+- resolve_in_doubt_upload_attempts: Close in-doubt attempts once they are reconciled.
+- complete_tune_upload: Store the video ID, executed flag and attempt outcome in one transaction.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import uuid
 from typing import List, Optional, Tuple
 from sqlalchemy import case
 from sqlalchemy.orm import Session
-from app.db.db import Tune
+from app.db.db import Tune, TuneUploadAttempt
 from app.dto import TuneDto
-
-
-async def get_tunes(
+from app.components.upload.processing_status.processing_status_utils import PROCESSING_STATUS_PROCESSING
+from app.components.tune_ops.tune_ops_utils import (
+    ACTIVE_TUNE_STATUSES,
+    IN_DOUBT_UPLOAD_OUTCOMES,
+    PENDING_TUNE_STATUSES,
+    TERMINAL_TUNE_STATUSES,
+    TUNE_STATUS_DEAD_LETTERED,
+    TUNE_STATUS_FAILED,
+    TUNE_STATUS_QUEUED,
+    TUNE_STATUS_SOURCES,
+    TUNE_STATUS_UPLOADED,
+    UPLOAD_ATTEMPT_IN_PROGRESS,
+    UPLOAD_ATTEMPT_RECONCILED,
+    UPLOAD_ATTEMPT_SUCCEEDED,
+    get_status_timestamp_values
+)
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_tunes(
     db: Session,
     user_id: Optional[str] = None,
     page: int = 1,
     limit: int = 10,
     upload_date_before: Optional[datetime] = None,
-    executed: Optional[bool] = None
+    executed: Optional[bool] = None,
+    statuses: Optional[List[str]] = None
 ) -> Tuple[List[Tune], int]:
     """
     Retrieve paginated tunes with optional filters.
@@ -51,6 +88,7 @@ async def get_tunes(
     - user_id: tunes for a specific user.
     - upload_date_before: only tunes scheduled to upload before or at a given datetime.
     - executed: whether the tune has already been processed or not.
+    - statuses: only tunes in one of the given lifecycle statuses.
 
     Returns:
     --------
@@ -68,12 +106,15 @@ async def get_tunes(
         if executed is not None:
             query = query.filter(Tune.executed == executed)
 
+        if statuses:
+            query = query.filter(Tune.status.in_(statuses))
+
         total_count = query.count()
 
         tunes = (
             query
             .order_by(
-                case((Tune.executed == False, 0), (Tune.executed == True, 1)),
+                case((Tune.status.in_(TERMINAL_TUNE_STATUSES), 1), else_=0),
                 Tune.upload_date.asc()
             )
             .offset((page - 1) * limit)
@@ -86,11 +127,13 @@ async def get_tunes(
         raise Exception("Error occurred while fetching tunes.") from e
     
     
-async def get_tune_by_id(tune_id: int, db: Session) -> Optional[Tune]:
-    return db.query(Tune).filter(Tune.id == tune_id).first()
+@in_executor(EXECUTOR_DB)
+def get_tune_by_id(tune_id: int, db: Session) -> Optional[Tune]:
+    return _find_tune(tune_id, db)
 
 
-async def insert_tunes(tunes: List[Tune], db: Session) -> List[Tune]:
+@in_executor(EXECUTOR_DB)
+def insert_tunes(tunes: List[Tune], db: Session) -> List[Tune]:
     """
     Create multiple tunes in a single database transaction.
 
@@ -125,7 +168,8 @@ async def insert_tunes(tunes: List[Tune], db: Session) -> List[Tune]:
         db.rollback()
         raise Exception(f"Error occurred during batch creation of tunes: {str(e)}")
 
-async def update_tune(tune_id: int, tune: TuneDto, db: Session) -> Optional[TuneDto]:
+@in_executor(EXECUTOR_DB)
+def update_tune(tune_id: int, tune: TuneDto, db: Session) -> Optional[TuneDto]:
     """
     Update an existing tune with new details excluding audio and video fields.
 
@@ -149,12 +193,17 @@ async def update_tune(tune_id: int, tune: TuneDto, db: Session) -> Optional[Tune
     - INFO: Details of the updated tune.
     - ERROR: Failures during database operations.
     """
-    tune_obj = await get_tune_by_id(tune_id, db)
+    tune_obj = _find_tune(tune_id, db)
     if not tune_obj:
         return None
 
     tune_obj.upload_date = tune.upload_date
-    tune_obj.executed = tune.executed
+    # Marking a tune executed by hand archives it; clearing the flag queues it again.
+    if tune.executed and tune_obj.status != TUNE_STATUS_UPLOADED:
+        _apply_status(tune_obj, TUNE_STATUS_UPLOADED)
+    elif not tune.executed and tune_obj.status == TUNE_STATUS_UPLOADED:
+        _apply_status(tune_obj, TUNE_STATUS_QUEUED)
+        _clear_upload_state(tune_obj)
     tune_obj.video_title = tune.video_title
     tune_obj.video_description = tune.video_description
     tune_obj.privacy_status = tune.privacy_status
@@ -171,38 +220,446 @@ async def update_tune(tune_id: int, tune: TuneDto, db: Session) -> Optional[Tune
         "tags": json.loads(tune_obj.tags) if tune_obj.tags else [],
     })
 
-async def mark_tune_as_executed(tune_id: int, db: Session) -> bool:
+def save_upload_checkpoint(tune_id: int, session_uri: Optional[str], bytes_committed: Optional[int], db: Session) -> bool:
     """
-    Mark a tune as executed.
+    Persist the resumable upload session URI and the byte offset YouTube has committed.
+
+    Kept synchronous so the uploader can run it in a worker thread after every chunk.
 
     Args:
     -----
     tune_id : int
-        The ID of the tune to mark as executed.
+        The ID of the tune being uploaded.
+    session_uri : Optional[str]
+        The resumable session URI, or None to clear the checkpoint.
+    bytes_committed : Optional[int]
+        The number of bytes confirmed by YouTube.
     db : Session
         The database session used for the operation.
 
     Returns:
     --------
-    Optional[TuneDto]
-        The updated tune mapped to a DTO object if successful, otherwise None.
+    bool
+        True if the tune exists and the checkpoint was stored, otherwise False.
+    """
+    updated = (
+        db.query(Tune)
+        .filter(Tune.id == tune_id)
+        .update(
+            {
+                Tune.upload_session_uri: session_uri,
+                Tune.upload_bytes_committed: bytes_committed,
+            },
+            synchronize_session=False
+        )
+    )
+    db.commit()
+    return updated > 0
+
+def save_tune_media_stats(
+    tune_id: int,
+    audio_duration_seconds: Optional[float],
+    video_size_bytes: Optional[int],
+    render_seconds: Optional[float],
+    db: Session
+) -> bool:
+    """
+    Store what the pipeline measured for a tune. Measurements given as None are left unchanged.
 
-    Logs:
+    Kept synchronous so the upload pipeline can run it in a worker thread.
+
+    Returns:
+    --------
+    bool
+        True if the tune exists, otherwise False.
+    """
+    values = {
+        column: value
+        for column, value in (
+            (Tune.audio_duration_seconds, audio_duration_seconds),
+            (Tune.video_size_bytes, video_size_bytes),
+            (Tune.render_seconds, render_seconds),
+        )
+        if value is not None
+    }
+    if not values:
+        return True
+    try:
+        updated = db.query(Tune).filter(Tune.id == tune_id).update(values, synchronize_session=False)
+        db.commit()
+        return updated > 0
+    except Exception:
+        db.rollback()
+        raise
+
+def transition_tune_status(tune_id: int, status: str, db: Session) -> bool:
+    """
+    Move a tune to `status` if its current status allows it (see `TUNE_STATUS_SOURCES`),
+    recording the transition time.
+
+    Kept synchronous so the upload pipeline can run it in a worker thread.
+
+    Args:
     -----
-    - DEBUG: Start and success of marking tune as executed.
-    - ERROR: Failures during database operations.
+    tune_id : int
+        The ID of the tune.
+    status : str
+        The lifecycle status to move to.
+    db : Session
+        The database session used for the operation.
+
+    Returns:
+    --------
+    bool
+        True if the tune moved, False if it does not exist or its status does not allow the move.
+    """
+    values = _get_status_update_values(status)
+    try:
+        updated = (
+            db.query(Tune)
+            .filter(Tune.id == tune_id, Tune.status.in_(TUNE_STATUS_SOURCES[status]))
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception:
+        db.rollback()
+        raise
+
+def start_tune_processing(tune_id: int, status: str, db: Session) -> bool:
+    """
+    Move a tune into its first processing stage (rendering, or uploading when a stored
+    session is resumed) and count the attempt.
+
+    Kept synchronous so the upload pipeline can run it in a worker thread.
+
+    Returns:
+    --------
+    bool
+        True if the tune moved, False if it does not exist or its status does not allow the move.
+    """
+    values = _get_status_update_values(status)
+    values[Tune.attempt_count] = Tune.attempt_count + 1
+    values[Tune.next_attempt_at] = None
+    try:
+        updated = (
+            db.query(Tune)
+            .filter(Tune.id == tune_id, Tune.status.in_(TUNE_STATUS_SOURCES[status]))
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception:
+        db.rollback()
+        raise
+
+def record_tune_failure(
+    tune_id: int,
+    error: str,
+    next_attempt_at: Optional[datetime],
+    db: Session,
+    lease_owner: Optional[str] = None,
+    count_attempt: bool = True
+) -> Optional[str]:
+    """
+    Record a failed processing attempt.
+
+    Args:
+    -----
+    tune_id : int
+        The ID of the tune that failed.
+    error : str
+        A short description of the failure, truncated to fit the column.
+    next_attempt_at : Optional[datetime]
+        When to retry the tune, or None to dead-letter it.
+    db : Session
+        The database session used for the operation.
+    lease_owner : Optional[str]
+        If given, the failure is only recorded while this worker holds the tune's lease.
+    count_attempt : bool
+        False uncounts the attempt in the same update, for attempts that only had to
+        wait (e.g. for the quota reset) and must not use up the tune's attempts.
+
+    Returns:
+    --------
+    Optional[str]
+        The tune's new status, or None if it does not exist, no longer is in progress or
+        is leased by another worker.
+    """
+    status = TUNE_STATUS_FAILED if next_attempt_at else TUNE_STATUS_DEAD_LETTERED
+    values = _get_status_update_values(status)
+    values[Tune.last_error] = error[:1024] if error else None
+    values[Tune.next_attempt_at] = next_attempt_at
+    if not count_attempt:
+        values[Tune.attempt_count] = case((Tune.attempt_count > 0, Tune.attempt_count - 1), else_=0)
+    tune_filter = [Tune.id == tune_id, Tune.status.in_(TUNE_STATUS_SOURCES[status])]
+    if lease_owner is not None:
+        tune_filter.append(Tune.lease_owner == lease_owner)
+    try:
+        updated = (
+            db.query(Tune)
+            .filter(*tune_filter)
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        return status if updated else None
+    except Exception:
+        db.rollback()
+        raise
+
+def refund_tune_attempt(tune_id: int, db: Session) -> bool:
+    """
+    Uncount the current attempt of a tune whose processing a shutdown interrupted, so
+    restarts do not use up its `TUNE_MAX_ATTEMPTS`. The status is left as is.
+
+    Returns:
+    --------
+    bool
+        True if an attempt was uncounted.
+    """
+    try:
+        updated = (
+            db.query(Tune)
+            .filter(Tune.id == tune_id, Tune.attempt_count > 0, Tune.status.in_(ACTIVE_TUNE_STATUSES))
+            .update({Tune.attempt_count: Tune.attempt_count - 1}, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception:
+        db.rollback()
+        raise
+
+def defer_tune(tune_id: int, next_attempt_at: datetime, db: Session, lease_owner: Optional[str] = None) -> bool:
+    """
+    Hold a tune that has not started processing back until `next_attempt_at`, e.g. the
+    quota reset. Its status and attempt count are left as they are.
+
+    Kept synchronous so the upload pipeline can run it in a worker thread.
+
+    Returns:
+    --------
+    bool
+        True if the tune was deferred, False if it does not exist, no longer is pending
+        or is leased by another worker.
+    """
+    tune_filter = [Tune.id == tune_id, Tune.status.in_(PENDING_TUNE_STATUSES)]
+    if lease_owner is not None:
+        tune_filter.append(Tune.lease_owner == lease_owner)
+    try:
+        updated = (
+            db.query(Tune)
+            .filter(*tune_filter)
+            .update({Tune.next_attempt_at: next_attempt_at}, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception:
+        db.rollback()
+        raise
+
+def start_upload_attempt(tune_id: int, db: Session) -> Optional[Tuple[int, str]]:
     """
-    tune_obj = await get_tune_by_id(tune_id, db)
+    Record the start of an upload attempt.
+
+    Kept synchronous so the upload pipeline can run it in a worker thread.
+
+    The tune's idempotency token is generated on its first attempt and reused by
+    every later one, so all attempts tag the video the same way.
+
+    Args:
+    -----
+    tune_id : int
+        The ID of the tune being uploaded.
+    db : Session
+        The database session used for the operation.
+
+    Returns:
+    --------
+    Optional[Tuple[int, str]]
+        The attempt ID and the tune's idempotency token, or None if the tune does not exist.
+    """
+    tune_obj = _find_tune(tune_id, db)
     if not tune_obj:
         return None
 
-    tune_obj.executed = True
+    try:
+        if not tune_obj.upload_idempotency_token:
+            tune_obj.upload_idempotency_token = uuid.uuid4().hex
+
+        attempt = TuneUploadAttempt(
+            tune_id=tune_id,
+            idempotency_token=tune_obj.upload_idempotency_token,
+            started_at=datetime.now(timezone.utc),
+            outcome=UPLOAD_ATTEMPT_IN_PROGRESS
+        )
+        db.add(attempt)
+        db.commit()
+        return attempt.id, tune_obj.upload_idempotency_token
+    except Exception:
+        db.rollback()
+        raise
+
+def finish_upload_attempt(attempt_id: int, outcome: str, error: Optional[str], db: Session) -> bool:
+    """
+    Close an upload attempt that did not produce a video.
+
+    Args:
+    -----
+    attempt_id : int
+        The ID of the attempt to close.
+    outcome : str
+        The final outcome of the attempt.
+    error : Optional[str]
+        A short description of the failure, truncated to fit the column.
+    db : Session
+        The database session used for the operation.
+
+    Returns:
+    --------
+    bool
+        True if the attempt exists and was updated, otherwise False.
+    """
+    updated = (
+        db.query(TuneUploadAttempt)
+        .filter(TuneUploadAttempt.id == attempt_id)
+        .update(
+            {
+                TuneUploadAttempt.outcome: outcome,
+                TuneUploadAttempt.finished_at: datetime.now(timezone.utc),
+                TuneUploadAttempt.error: error[:1024] if error else None,
+            },
+            synchronize_session=False
+        )
+    )
     db.commit()
-    db.refresh(tune_obj)
+    return updated > 0
 
-    return True
+def has_in_doubt_upload_attempt(tune_id: int, db: Session) -> bool:
+    """
+    Check whether an earlier attempt may have delivered the video to YouTube
+    without the outcome being recorded.
+    """
+    return db.query(
+        db.query(TuneUploadAttempt)
+        .filter(
+            TuneUploadAttempt.tune_id == tune_id,
+            TuneUploadAttempt.outcome.in_(IN_DOUBT_UPLOAD_OUTCOMES)
+        )
+        .exists()
+    ).scalar()
+
+def resolve_in_doubt_upload_attempts(tune_id: int, outcome: str, db: Session, youtube_video_id: Optional[str] = None) -> int:
+    """
+    Close every in-doubt attempt of a tune with the given outcome.
+
+    Returns:
+    --------
+    int
+        The number of attempts that were closed.
+    """
+    resolved = (
+        db.query(TuneUploadAttempt)
+        .filter(
+            TuneUploadAttempt.tune_id == tune_id,
+            TuneUploadAttempt.outcome.in_(IN_DOUBT_UPLOAD_OUTCOMES)
+        )
+        .update(
+            {
+                TuneUploadAttempt.outcome: outcome,
+                TuneUploadAttempt.finished_at: datetime.now(timezone.utc),
+                TuneUploadAttempt.youtube_video_id: youtube_video_id,
+            },
+            synchronize_session=False
+        )
+    )
+    db.commit()
+    return resolved
 
-async def delete_tune_by_id(tune_id: int, db: Session) -> bool:
+def complete_tune_upload(
+    tune_id: int,
+    youtube_video_id: str,
+    db: Session,
+    attempt_id: Optional[int] = None,
+    lease_owner: Optional[str] = None
+) -> bool:
+    """
+    Record a finished upload in a single transaction: the tune gets its video ID, is
+    marked uploaded and queued for processing status polling, the checkpoint and
+    lease are cleared, the given attempt succeeds and any other in-doubt attempts are marked
+    reconciled.
+
+    Args:
+    -----
+    tune_id : int
+        The ID of the uploaded tune.
+    youtube_video_id : str
+        The ID YouTube assigned to the video.
+    db : Session
+        The database session used for the operation.
+    attempt_id : Optional[int]
+        The attempt that produced the video, if it is known.
+    lease_owner : Optional[str]
+        If given, the upload is only recorded while this worker holds the tune's lease.
+
+    Returns:
+    --------
+    bool
+        True if the upload was recorded, False if the tune does not exist or is leased
+        by another worker.
+
+    Logs:
+    -----
+    - ERROR: Failures during database operations are raised to the caller after a rollback.
+    """
+    now = datetime.now(timezone.utc)
+    values = _get_status_update_values(TUNE_STATUS_UPLOADED, now)
+    values.update({
+        Tune.youtube_video_id: youtube_video_id,
+        Tune.upload_session_uri: None,
+        Tune.upload_bytes_committed: None,
+        Tune.processing_status: PROCESSING_STATUS_PROCESSING,
+        Tune.processing_failure_reason: None,
+        Tune.processing_checked_at: None,
+        Tune.lease_owner: None,
+        Tune.lease_expires_at: None,
+        Tune.last_error: None,
+        Tune.next_attempt_at: None,
+    })
+    tune_filter = [Tune.id == tune_id]
+    if lease_owner is not None:
+        tune_filter.append(Tune.lease_owner == lease_owner)
+
+    try:
+        updated = (
+            db.query(Tune)
+            .filter(*tune_filter)
+            .update(values, synchronize_session=False)
+        )
+        if not updated:
+            db.rollback()
+            return False
+
+        attempts = (
+            db.query(TuneUploadAttempt)
+            .filter(
+                TuneUploadAttempt.tune_id == tune_id,
+                (TuneUploadAttempt.id == attempt_id) | TuneUploadAttempt.outcome.in_(IN_DOUBT_UPLOAD_OUTCOMES)
+            )
+            .all()
+        )
+        for attempt in attempts:
+            attempt.outcome = UPLOAD_ATTEMPT_SUCCEEDED if attempt.id == attempt_id else UPLOAD_ATTEMPT_RECONCILED
+            attempt.finished_at = attempt.finished_at or now
+            attempt.youtube_video_id = youtube_video_id
+
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+
+@in_executor(EXECUTOR_DB)
+def delete_tune_by_id(tune_id: int, db: Session) -> bool:
     tune = db.query(Tune).filter(Tune.id == tune_id).first()
     if not tune:
         return False
@@ -210,3 +667,33 @@ async def delete_tune_by_id(tune_id: int, db: Session) -> bool:
     db.delete(tune)
     db.commit()
     return True
+
+
+def _find_tune(tune_id: int, db: Session) -> Optional[Tune]:
+    return db.query(Tune).filter(Tune.id == tune_id).first()
+
+
+def _apply_status(tune_obj: Tune, status: str, now: Optional[datetime] = None):
+    for column, value in get_status_timestamp_values(status, now or datetime.now(timezone.utc)).items():
+        setattr(tune_obj, column, value)
+
+
+def _clear_upload_state(tune_obj: Tune):
+    # A queued-again tune is a new upload: a new idempotency token keeps its attempts from
+    # being reconciled with the published video, which no longer belongs to it.
+    tune_obj.youtube_video_id = None
+    tune_obj.upload_idempotency_token = None
+    tune_obj.upload_session_uri = None
+    tune_obj.upload_bytes_committed = None
+    tune_obj.processing_status = None
+    tune_obj.processing_failure_reason = None
+    tune_obj.processing_checked_at = None
+    tune_obj.attempt_count = 0
+    tune_obj.next_attempt_at = None
+
+
+def _get_status_update_values(status: str, now: Optional[datetime] = None) -> dict:
+    return {
+        getattr(Tune, column): value
+        for column, value in get_status_timestamp_values(status, now or datetime.now(timezone.utc)).items()
+    }
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional, Tuple
 from datetime import datetime, timezone
 import json
@@ -9,19 +10,56 @@ from app.logger.logging_setup import logger
 from app.dto import TuneDto
 
 from app.components.tune_ops.tune_ops_repository import (
+    complete_tune_upload,
+    defer_tune,
     delete_tune_by_id,
+    finish_upload_attempt,
     get_tune_by_id,
     get_tunes,
+    has_in_doubt_upload_attempt,
     insert_tunes,
-    mark_tune_as_executed,
+    record_tune_failure,
+    refund_tune_attempt,
+    resolve_in_doubt_upload_attempts,
+    save_tune_media_stats,
+    save_upload_checkpoint,
+    start_tune_processing,
+    start_upload_attempt,
+    transition_tune_status,
     update_tune
 )
+from app.components.capacity_planner.capacity_planner_service import allocate_upload_slots_service
 from app.components.file_processing.file_processing_service import cleanup_temp_files, persistence_preparation_processing, processing_commit
 from app.components.file_processing.file_processing_utils import delete_directory
+from app.components.ffmpeg.generate_mp4.generate_mp4_service import probe_audio_duration
 
-from app.components.tune_ops.tune_ops_utils import map_tune_dto_to_model
+from app.components.tune_ops.tune_ops_utils import (
+    IN_PROGRESS_TUNE_STATUSES,
+    TUNE_STATUS_DEAD_LETTERED,
+    get_tune_retry_at,
+    map_tune_dto_to_model
+)
+from app.components.upload.due_tune_queue.due_tune_queue_service import notify_tune_removed, notify_tune_scheduled
+from app.settings.env_settings import TUNE_MAX_ATTEMPTS
+from app.utils.executor_util import EXECUTOR_FS, EXECUTOR_SUBPROCESS_WAIT, run_blocking
+from app.utils.metrics_util import increment_counter
+
+# Allocations in this process run one at a time, each planning around the tunes the previous one stored.
+_slot_allocation_lock = asyncio.Lock()
 
-async def create_tunes_service(tunes: List[TuneDto], user_id: str, db: Session) -> List[Tune]:
+async def create_tunes_service(
+    tunes: List[TuneDto],
+    user_id: str,
+    db: Session,
+    allocation_window: Optional[Tuple[datetime, datetime]] = None,
+    dispatch_lane: Optional[str] = None
+) -> List[Tune]:
+    """
+    Stores a batch of tunes and moves their files to the share. With an allocation window,
+    their upload dates are not taken from the request but allocated to free slots inside it.
+    Tunes given a dispatch lane (instant uploads) are due at once and processed in that
+    lane by whichever process picks them up.
+    """
     db_tunes = []
     temp_paths = []
     file_mappings: List[Tuple[str, str]] = []
@@ -31,43 +69,67 @@ async def create_tunes_service(tunes: List[TuneDto], user_id: str, db: Session)
     try:
         for tune in tunes:
             logger.debug(f"Preparing persistence paths for tune: '{tune.video_title}'")
-            audio_map, img_map, base_dest_path = persistence_preparation_processing(tune, user_id)
+            audio_map, img_map, base_dest_path = await persistence_preparation_processing(tune, user_id)
 
             temp_paths.extend([audio_map[0], img_map[0]])
             file_mappings.extend([audio_map, img_map])
 
             logger.debug(f"Mapped tune '{tune.video_title}' to DB model with base path: {base_dest_path}")
-            db_tunes.append(map_tune_dto_to_model(tune, user_id, base_dest_path=base_dest_path))
+            db_tune = map_tune_dto_to_model(tune, user_id, base_dest_path=base_dest_path)
+            db_tune.audio_duration_seconds = await _measure_audio_duration(audio_map[0])
+            if dispatch_lane:
+                db_tune.dispatch_lane = dispatch_lane
+                db_tune.upload_date = datetime.now(timezone.utc)
+            db_tunes.append(db_tune)
 
         logger.debug(f"Inserting {len(db_tunes)} tunes into the database...")
-        created_tunes = await insert_tunes(db_tunes, db)
+        if allocation_window:
+            async with _slot_allocation_lock:
+                await allocate_upload_slots_service(db_tunes, user_id, *allocation_window, db)
+                created_tunes = await insert_tunes(db_tunes, db)
+        else:
+            created_tunes = await insert_tunes(db_tunes, db)
 
         logger.debug("Database insert successful. Committing file move operations...")
-        processing_commit(file_mappings)
+        await processing_commit(file_mappings)
+
+        for tune in created_tunes:
+            notify_tune_scheduled(tune.id, tune.upload_date, tune.status)
 
         logger.info(f"Batch upload successfully validated, saved, and processed for user_id={user_id}")
         return created_tunes
 
     except Exception as e:
         logger.error(f"Batch creation failed: {str(e)}")
-        cleanup_temp_files(temp_paths)
+        await cleanup_temp_files(temp_paths)
         raise
 
 
+async def _measure_audio_duration(audio_path: str) -> Optional[float]:
+    # Known from creation on, the duration lets the capacity planner size the tune; an
+    # audio file ffprobe cannot read fails later, in the probe stage.
+    try:
+        return await run_blocking(EXECUTOR_SUBPROCESS_WAIT, probe_audio_duration, audio_path)
+    except Exception as e:
+        logger.warning(f"Could not measure the duration of '{audio_path}': {e}")
+        return None
+
+
 async def get_user_tunes_service(
     user_id: str,
     page: int,
     limit: int,
     db: Session,
     upload_date_before: Optional[datetime] = None,
-    executed: Optional[bool] = None
+    executed: Optional[bool] = None,
+    statuses: Optional[List[str]] = None
 ) -> Tuple[List[TuneDto], int]:
     """
     Service layer — returns serialized DTOs for use in FastAPI routes.
     """
-    logger.debug(f"Fetching tunes for user: {user_id}, page: {page}, limit: {limit}, executed: {executed}, before: {upload_date_before}")
+    logger.debug(f"Fetching tunes for user: {user_id}, page: {page}, limit: {limit}, executed: {executed}, statuses: {statuses}, before: {upload_date_before}")
     
-    tunes, total_count = await get_tunes(db, user_id, page, limit, upload_date_before, executed)
+    tunes, total_count = await get_tunes(db, user_id, page, limit, upload_date_before, executed, statuses)
 
     tune_dtos = [
         TuneDto.model_validate({
@@ -87,7 +149,10 @@ async def update_tune_service(tune_id: int, tune: TuneDto, db: Session) -> TuneD
     if not existing:
         raise LookupError("Tune not found")
 
-    return await update_tune(tune_id, tune, db)
+    updated = await update_tune(tune_id, tune, db)
+    if updated:
+        notify_tune_scheduled(tune_id, updated.upload_date, updated.status)
+    return updated
 
 async def delete_tune_service(tune_id: int, db: Session) -> bool:
     existing = await get_tune_by_id(tune_id, db)
@@ -95,12 +160,146 @@ async def delete_tune_service(tune_id: int, db: Session) -> bool:
         raise LookupError("Tune not found")
 
     if existing.base_dest_path:
-        delete_directory(existing.base_dest_path)
+        await run_blocking(EXECUTOR_FS, delete_directory, existing.base_dest_path)
+
+    deleted = await delete_tune_by_id(tune_id, db)
+    if deleted:
+        notify_tune_removed(tune_id)
+    return deleted
+
+def complete_tune_upload_service(
+    tune: Tune,
+    youtube_video_id: str,
+    db: Session,
+    attempt_id: Optional[int] = None,
+    lease_owner: Optional[str] = None
+) -> bool:
+    """
+    Records the upload of a tune. With `lease_owner`, only while that worker still
+    holds the tune's lease; False then means another worker owns the tune.
+    """
+    if not complete_tune_upload(tune.id, youtube_video_id, db, attempt_id, lease_owner):
+        logger.error(f"Failed to mark tune '{tune.video_title}' as uploaded: it no longer exists or is leased by another worker.")
+        return False
+    notify_tune_removed(tune.id)
+    logger.debug(f"Marked tune '{tune.video_title}' as uploaded with video ID {youtube_video_id}.")
+    return True
+
+def set_tune_status_service(tune: Tune, status: str, db: Session) -> bool:
+    if not transition_tune_status(tune.id, status, db):
+        logger.warning(f"Tune '{tune.video_title}' cannot move from '{tune.status}' to '{status}'.")
+        return False
+    logger.debug(f"Tune '{tune.video_title}' moved from '{tune.status}' to '{status}'.")
+    tune.status = status
+    return True
+
+def start_tune_processing_service(tune: Tune, status: str, db: Session) -> bool:
+    # A tune still in progress was left behind by a worker that stopped mid-attempt;
+    # one that keeps doing so is dead-lettered instead of taking down the next worker.
+    if tune.status in IN_PROGRESS_TUNE_STATUSES and (tune.attempt_count or 0) >= TUNE_MAX_ATTEMPTS:
+        record_tune_failure_service(tune, f"Attempt {tune.attempt_count} never finished; the worker stopped during processing.", db)
+        return False
 
-    return await delete_tune_by_id(tune_id, db)
+    if not start_tune_processing(tune.id, status, db):
+        logger.warning(f"Tune '{tune.video_title}' cannot start processing from '{tune.status}'.")
+        return False
+    tune.status = status
+    tune.attempt_count = (tune.attempt_count or 0) + 1
+    logger.debug(f"Started attempt {tune.attempt_count} of tune '{tune.video_title}'.")
+    return True
 
-async def mark_tune_as_executed_service(tune: Tune, db: Session) -> bool:
-    if (await mark_tune_as_executed(tune.id, db) == True):
-            logger.debug(f"Marked tune '{tune.video_title}' as executed.")
+def record_tune_failure_service(
+    tune: Tune,
+    error: str,
+    db: Session,
+    retry_at: Optional[datetime] = None,
+    lease_owner: Optional[str] = None,
+    count_attempt: bool = True
+) -> Optional[str]:
+    """
+    Records a failed attempt. The tune is retried after an exponential delay, at
+    `retry_at` when the caller knows better (e.g. the quota reset), or dead-lettered
+    once it has used up `TUNE_MAX_ATTEMPTS`. With `lease_owner`, the failure is only
+    recorded while that worker still holds the tune's lease. An attempt that only has
+    to wait for `retry_at` is recorded with `count_attempt=False`, so it does not count
+    toward `TUNE_MAX_ATTEMPTS`.
+    """
+    if retry_at is None and (tune.attempt_count or 0) < TUNE_MAX_ATTEMPTS:
+        retry_at = get_tune_retry_at(tune.attempt_count, datetime.now(timezone.utc))
+
+    status = record_tune_failure(tune.id, error, retry_at, db, lease_owner, count_attempt)
+    if status is None:
+        logger.warning(f"Failure of tune '{tune.video_title}' not recorded: it is no longer in progress or is leased by another worker.")
+        return None
+
+    tune.status = status
+    if not count_attempt:
+        tune.attempt_count = max((tune.attempt_count or 0) - 1, 0)
+        increment_counter("tune.deferred")
+        logger.info(f"Tune '{tune.video_title}' deferred until {retry_at.isoformat()}; the attempt does not count: {error}")
+        notify_tune_scheduled(tune.id, tune.upload_date, status, retry_at)
+    elif status == TUNE_STATUS_DEAD_LETTERED:
+        increment_counter("tune.dead_lettered")
+        logger.warning(f"Tune '{tune.video_title}' dead-lettered after {tune.attempt_count} attempts: {error}")
+        notify_tune_removed(tune.id)
+    else:
+        increment_counter("tune.failed")
+        logger.info(f"Tune '{tune.video_title}' failed attempt {tune.attempt_count}; retrying at {retry_at.isoformat()}.")
+        notify_tune_scheduled(tune.id, tune.upload_date, status, retry_at)
+    return status
+
+def refund_tune_attempt_service(tune: Tune, db: Session):
+    if refund_tune_attempt(tune.id, db):
+        tune.attempt_count = max((tune.attempt_count or 0) - 1, 0)
+        logger.debug(f"Interrupted attempt of tune '{tune.video_title}' does not count toward its limit.")
+
+def defer_tune_service(tune: Tune, retry_at: datetime, reason: str, db: Session, lease_owner: Optional[str] = None) -> bool:
+    """
+    Holds a tune that has not started processing back until `retry_at`, without
+    counting an attempt, so it is not picked up again before then.
+    """
+    if not defer_tune(tune.id, retry_at, db, lease_owner):
+        logger.warning(f"Deferral of tune '{tune.video_title}' not recorded: it is no longer pending or is leased by another worker.")
+        return False
+
+    tune.next_attempt_at = retry_at
+    increment_counter("tune.deferred")
+    logger.info(f"Tune '{tune.video_title}' deferred until {retry_at.isoformat()}: {reason}")
+    notify_tune_scheduled(tune.id, tune.upload_date, tune.status, retry_at)
+    return True
+
+def start_upload_attempt_service(tune: Tune, db: Session) -> Tuple[int, str]:
+    started = start_upload_attempt(tune.id, db)
+    if started is None:
+        raise LookupError("Tune not found")
+    attempt_id, idempotency_token = started
+    tune.upload_idempotency_token = idempotency_token
+    logger.debug(f"Started upload attempt {attempt_id} for tune '{tune.video_title}'.")
+    return attempt_id, idempotency_token
+
+def finish_upload_attempt_service(attempt_id: int, outcome: str, error: Optional[str], db: Session):
+    if not finish_upload_attempt(attempt_id, outcome, error, db):
+        logger.error(f"Failed to record outcome '{outcome}' for upload attempt {attempt_id}.")
+
+def has_in_doubt_upload_attempt_service(tune: Tune, db: Session) -> bool:
+    return has_in_doubt_upload_attempt(tune.id, db)
+
+def resolve_in_doubt_upload_attempts_service(tune: Tune, outcome: str, db: Session):
+    resolved = resolve_in_doubt_upload_attempts(tune.id, outcome, db)
+    logger.debug(f"Closed {resolved} in-doubt upload attempt(s) of tune '{tune.video_title}' as '{outcome}'.")
+
+def save_upload_checkpoint_service(tune_id: int, session_uri: Optional[str], bytes_committed: Optional[int], db: Session):
+    if save_upload_checkpoint(tune_id, session_uri, bytes_committed, db):
+        logger.debug(f"Stored upload checkpoint for tune {tune_id}: {bytes_committed} bytes committed.")
     else:
-        logger.error(f"Failed to mark tune '{tune.video_title}' as executed.")
\ No newline at end of file
+        logger.error(f"Failed to store upload checkpoint for tune {tune_id}.")
+
+def save_tune_media_stats_service(
+    tune_id: int,
+    audio_duration_seconds: Optional[float],
+    video_size_bytes: Optional[int],
+    render_seconds: Optional[float],
+    db: Session
+):
+    if not save_tune_media_stats(tune_id, audio_duration_seconds, video_size_bytes, render_seconds, db):
+        logger.warning(f"Failed to store media measurements for tune {tune_id}: tune not found.")
@@ -1,12 +1,80 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import json
+import random
+from typing import Optional
+from sqlalchemy import and_, or_
 from app.db.db import Tune
 from app.dto import TuneDto
+from app.settings.env_settings import TUNE_RETRY_BASE_DELAY_SECONDS, TUNE_RETRY_MAX_DELAY_SECONDS
+
+# Lifecycle of a tune, stored in `tunes.status`.
+TUNE_STATUS_QUEUED = "queued"
+TUNE_STATUS_RENDERING = "rendering"
+TUNE_STATUS_RENDERED = "rendered"
+TUNE_STATUS_UPLOADING = "uploading"
+TUNE_STATUS_UPLOADED = "uploaded"
+TUNE_STATUS_FAILED = "failed"
+TUNE_STATUS_DEAD_LETTERED = "dead_lettered"
+
+TUNE_STATUSES = (
+    TUNE_STATUS_QUEUED,
+    TUNE_STATUS_RENDERING,
+    TUNE_STATUS_RENDERED,
+    TUNE_STATUS_UPLOADING,
+    TUNE_STATUS_UPLOADED,
+    TUNE_STATUS_FAILED,
+    TUNE_STATUS_DEAD_LETTERED,
+)
+
+# Waiting for a worker to pick them up.
+PENDING_TUNE_STATUSES = (TUNE_STATUS_QUEUED, TUNE_STATUS_RENDERED, TUNE_STATUS_FAILED)
+
+# A worker is on it; picked up again only once its lease has expired.
+IN_PROGRESS_TUNE_STATUSES = (TUNE_STATUS_RENDERING, TUNE_STATUS_UPLOADING)
+
+# Never picked up again without a manual change.
+TERMINAL_TUNE_STATUSES = (TUNE_STATUS_UPLOADED, TUNE_STATUS_DEAD_LETTERED)
+
+ACTIVE_TUNE_STATUSES = PENDING_TUNE_STATUSES + IN_PROGRESS_TUNE_STATUSES
+
+# Statuses a tune may move from into each status. Re-entering an in-progress status
+# happens when a worker reclaims a tune whose lease expired.
+TUNE_STATUS_SOURCES = {
+    TUNE_STATUS_QUEUED: (TUNE_STATUS_FAILED, TUNE_STATUS_DEAD_LETTERED, TUNE_STATUS_UPLOADED),
+    TUNE_STATUS_RENDERING: ACTIVE_TUNE_STATUSES,
+    TUNE_STATUS_RENDERED: (TUNE_STATUS_RENDERING,),
+    TUNE_STATUS_UPLOADING: (TUNE_STATUS_QUEUED, TUNE_STATUS_RENDERED, TUNE_STATUS_UPLOADING, TUNE_STATUS_FAILED),
+    TUNE_STATUS_UPLOADED: ACTIVE_TUNE_STATUSES,
+    TUNE_STATUS_FAILED: ACTIVE_TUNE_STATUSES,
+    TUNE_STATUS_DEAD_LETTERED: ACTIVE_TUNE_STATUSES,
+}
+
+# Transition timestamp set when a tune enters the status.
+TUNE_STATUS_TIMESTAMP_COLUMNS = {
+    TUNE_STATUS_RENDERING: "render_started_at",
+    TUNE_STATUS_RENDERED: "rendered_at",
+    TUNE_STATUS_UPLOADING: "upload_started_at",
+    TUNE_STATUS_UPLOADED: "uploaded_at",
+}
+
+# Outcomes of a row in `tune_upload_attempts`.
+UPLOAD_ATTEMPT_IN_PROGRESS = "in_progress"
+UPLOAD_ATTEMPT_SUCCEEDED = "succeeded"
+UPLOAD_ATTEMPT_FAILED = "failed"
+UPLOAD_ATTEMPT_RECONCILED = "reconciled"
+UPLOAD_ATTEMPT_NOT_FOUND = "not_found"
+
+# An attempt that never finished, or failed after the upload started, may still have
+# produced a video on YouTube; the tune is reconciled before it is uploaded again.
+IN_DOUBT_UPLOAD_OUTCOMES = (UPLOAD_ATTEMPT_IN_PROGRESS, UPLOAD_ATTEMPT_FAILED)
 
 
 def map_tune_dto_to_model(tune: TuneDto, user_id: str, base_dest_path: str) -> Tune:
     return Tune(
         upload_date=tune.upload_date,
-        executed=tune.executed,
+        # New tunes always start queued; `executed` follows the status from here on.
+        executed=False,
+        status=TUNE_STATUS_QUEUED,
         video_title=tune.video_title,
         base_dest_path=base_dest_path,
         img_name=tune.img_name,
@@ -25,4 +93,62 @@ def map_tune_dto_to_model(tune: TuneDto, user_id: str, base_dest_path: str) -> T
 
 
 def format_tags_for_db(tags: list[str]) -> str:
-    return ",".join(tag.strip() for tag in tags if isinstance(tag, str)).strip()
\ No newline at end of file
+    return ",".join(tag.strip() for tag in tags if isinstance(tag, str)).strip()
+
+
+def parse_tags_from_db(tags: str) -> list[str]:
+    # Tags are stored comma-separated on creation but as a JSON list after an update.
+    if not tags:
+        return []
+    if tags.startswith("["):
+        return [tag for tag in json.loads(tags) if isinstance(tag, str)]
+    return [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+
+def is_actionable_tune(now: datetime):
+    """
+    SQL condition for tunes a worker should pick up: pending ones, and in-progress
+    ones whose worker stopped renewing its lease.
+    """
+    return or_(
+        Tune.status.in_(PENDING_TUNE_STATUSES),
+        and_(
+            Tune.status.in_(IN_PROGRESS_TUNE_STATUSES),
+            Tune.lease_expires_at.is_(None) | (Tune.lease_expires_at < now)
+        )
+    )
+
+
+def get_status_timestamp_values(status: str, now: datetime) -> dict:
+    """
+    Column values recording a transition into `status` at `now`.
+    """
+    values = {"status": status, "status_changed_at": now, "executed": status == TUNE_STATUS_UPLOADED}
+    timestamp_column = TUNE_STATUS_TIMESTAMP_COLUMNS.get(status)
+    if timestamp_column:
+        values[timestamp_column] = now
+    return values
+
+
+def is_due_tune(now: datetime):
+    """
+    SQL condition for tunes whose upload date and, after a failure, retry time have passed.
+    """
+    return and_(
+        Tune.upload_date <= now,
+        Tune.next_attempt_at.is_(None) | (Tune.next_attempt_at <= now)
+    )
+
+
+def get_tune_due_at(upload_date: datetime, next_attempt_at: Optional[datetime]) -> datetime:
+    return max(upload_date, next_attempt_at) if next_attempt_at else upload_date
+
+
+def get_tune_retry_at(attempt_count: int, now: datetime) -> datetime:
+    """
+    Time of the next attempt after `attempt_count` failed ones: an exponential delay
+    of base * 2^(attempts - 1), capped, with the upper half jittered so tunes that
+    failed together do not retry together.
+    """
+    delay = min(TUNE_RETRY_MAX_DELAY_SECONDS, TUNE_RETRY_BASE_DELAY_SECONDS * (2 ** max(attempt_count - 1, 0)))
+    return now + timedelta(seconds=random.uniform(delay / 2, delay))
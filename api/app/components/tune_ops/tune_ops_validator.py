@@ -1,7 +1,9 @@
-from datetime import datetime, timezone
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 from app.dto import TuneDto
+from app.components.tune_ops.tune_ops_utils import TUNE_STATUSES
 from app.logger.logging_setup import logger
+from app.settings.env_settings import SLOT_ALLOCATION_MAX_WINDOW_DAYS
 
 def validate_scheduled_tunes_upload_time(tunes: List[TuneDto]):
     current_time = datetime.now(timezone.utc)
@@ -11,4 +13,27 @@ def validate_scheduled_tunes_upload_time(tunes: List[TuneDto]):
         if not tune.upload_date:
             raise ValueError(f"Upload date is missing for '{tune.video_title}'")
         if tune.upload_date < current_time:
-            raise ValueError(f"Upload date is in the past for '{tune.video_title}'")
\ No newline at end of file
+            raise ValueError(f"Upload date is in the past for '{tune.video_title}'")
+
+def validate_allocation_window(window_start: Optional[datetime], window_end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """
+    Returns the allocation window in UTC, starting no earlier than now. Naive times are taken as UTC.
+    """
+    current_time = datetime.now(timezone.utc)
+    if window_end is None:
+        raise ValueError("Slot allocation needs a window end ('window_end').")
+    window_end = window_end if window_end.tzinfo else window_end.replace(tzinfo=timezone.utc)
+    if window_start is not None and window_start.tzinfo is None:
+        window_start = window_start.replace(tzinfo=timezone.utc)
+    window_start = max(window_start or current_time, current_time)
+
+    if window_end <= window_start:
+        raise ValueError("The allocation window must end in the future and after it starts.")
+    if window_end - window_start > timedelta(days=SLOT_ALLOCATION_MAX_WINDOW_DAYS):
+        raise ValueError(f"The allocation window may span at most {SLOT_ALLOCATION_MAX_WINDOW_DAYS} days.")
+    return window_start, window_end
+
+def validate_tune_statuses(statuses: List[str]):
+    for status in statuses or []:
+        if status not in TUNE_STATUSES:
+            raise ValueError(f"Unknown tune status '{status}'. Expected one of: {', '.join(TUNE_STATUSES)}")
@@ -0,0 +1,126 @@
+"""
+Service Layer: Upload Bandwidth Shaper
+======================================
+Process-wide token-bucket limiter that every upload stream draws from, so a batch
+of concurrent uploads cannot saturate the uplink.
+
+Responsibilities:
+-----------------
+- Limit the aggregate upload rate to the configured bytes per second.
+- Switch rates by time of day (e.g. full speed at night) via bandwidth profiles.
+- Share the bandwidth fairly between concurrent uploads.
+
+The bucket is implemented as a reservation timeline (GCRA): each caller reserves
+a small slice of bytes and sleeps until its reservation is due. Because streams
+reserve one slice at a time, concurrent uploads interleave in arrival order and
+get an equal share.
+
+Metrics:
+--------
+- upload.bandwidth.limit_bps: the rate currently in force (0 means unlimited).
+- upload.bandwidth.bytes: bytes released to upload streams.
+- upload.bandwidth.throttled_seconds: total time streams were held back.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+from app.components.upload.bandwidth_shaper.bandwidth_shaper_utils import (
+    BandwidthProfile,
+    get_profile_rate,
+    parse_bandwidth_profiles,
+    validate_bandwidth_rate
+)
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    UPLOAD_BANDWIDTH_LIMIT,
+    UPLOAD_BANDWIDTH_PROFILES,
+    UPLOAD_BANDWIDTH_TIMEZONE,
+    UPLOAD_BANDWIDTH_BURST,
+)
+from app.utils.metrics_util import increment_counter, set_gauge
+
+# Streams draw tokens in slices this large, which bounds how long one stream can
+# hold the bucket before the others get their turn.
+SLICE_BYTES = 64 * 1024
+
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by all upload streams of the event loop.
+    """
+    def __init__(
+        self,
+        rate: int,
+        burst: int,
+        profiles: Optional[List[BandwidthProfile]] = None,
+        profile_timezone: str = "UTC"
+    ):
+        self.rate = rate
+        self.burst = max(burst, SLICE_BYTES)
+        self.profiles = profiles or []
+        self.profile_timezone = ZoneInfo(profile_timezone)
+        self._next_free = time.monotonic()
+
+    def current_rate(self) -> int:
+        """
+        Returns the bytes per second in force right now; 0 means unlimited.
+        """
+        return self.rate_at(datetime.now(timezone.utc))
+
+    def rate_at(self, moment: datetime) -> int:
+        """
+        Returns the bytes per second in force at `moment`; 0 means unlimited.
+        """
+        profile_rate = get_profile_rate(self.profiles, moment.astimezone(self.profile_timezone))
+        return self.rate if profile_rate is None else profile_rate
+
+    async def acquire_async(self, nbytes: int):
+        """
+        Suspends the calling coroutine until `nbytes` may be sent.
+        """
+        for portion in _slices(nbytes):
+            delay = self._reserve(portion)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _reserve(self, nbytes: int) -> float:
+        """
+        Books `nbytes` on the shared timeline and returns how long the caller must wait.
+        """
+        now = time.monotonic()
+        rate = self.current_rate()
+        set_gauge("upload.bandwidth.limit_bps", rate)
+        increment_counter("upload.bandwidth.bytes", nbytes)
+
+        if rate <= 0:
+            self._next_free = now
+            return 0.0
+
+        # Idle time accrues credit, but never more than one burst.
+        self._next_free = max(self._next_free, now - self.burst / rate)
+        self._next_free += nbytes / rate
+        delay = max(0.0, self._next_free - now)
+
+        if delay > 0:
+            increment_counter("upload.bandwidth.throttled_seconds", delay)
+        return delay
+
+
+def _slices(nbytes: int):
+    while nbytes > 0:
+        portion = min(nbytes, SLICE_BYTES)
+        yield portion
+        nbytes -= portion
+
+
+def _create_upload_bandwidth_limiter() -> BandwidthLimiter:
+    validate_bandwidth_rate(UPLOAD_BANDWIDTH_LIMIT, "POPEBEATS2TUBE_UPLOAD_BANDWIDTH_LIMIT")
+    profiles = parse_bandwidth_profiles(UPLOAD_BANDWIDTH_PROFILES)
+    logger.debug(f"Upload bandwidth limit: {UPLOAD_BANDWIDTH_LIMIT or 'unlimited'} B/s, {len(profiles)} time-of-day profile(s).")
+    return BandwidthLimiter(UPLOAD_BANDWIDTH_LIMIT, UPLOAD_BANDWIDTH_BURST, profiles, UPLOAD_BANDWIDTH_TIMEZONE)
+
+
+# Shared by every upload in this process.
+upload_bandwidth_limiter = _create_upload_bandwidth_limiter()
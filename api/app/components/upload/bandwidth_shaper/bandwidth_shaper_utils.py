@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.logger.logging_setup import logger
+
+MINUTES_PER_DAY = 24 * 60
+
+# (start minute, end minute, bytes per second); 0 bytes per second means unlimited.
+BandwidthProfile = Tuple[int, int, int]
+
+
+def parse_bandwidth_profiles(profiles: str) -> List[BandwidthProfile]:
+    """
+    Parses time-of-day bandwidth profiles.
+
+    Format: comma separated `HH:MM-HH:MM=<bytes per second>` entries, e.g.
+    `00:00-07:00=0,07:00-23:00=524288`. Ranges may wrap past midnight (`22:00-06:00`),
+    the end time is exclusive and `0` lifts the limit for that window.
+
+    Raises:
+    -------
+    ValueError
+        If an entry is malformed or its rate is negative.
+    """
+    parsed = []
+    for entry in (part.strip() for part in (profiles or "").split(",")):
+        if not entry:
+            continue
+        try:
+            window, rate = entry.split("=")
+            start, end = window.split("-")
+            parsed.append((_parse_minute(start), _parse_minute(end), int(rate)))
+        except ValueError as e:
+            logger.error(f"Invalid bandwidth profile entry '{entry}': {e}")
+            raise ValueError(f"Invalid bandwidth profile entry '{entry}'. Expected HH:MM-HH:MM=<bytes per second>.")
+        validate_bandwidth_rate(parsed[-1][2], f"bandwidth profile '{entry}'")
+    return parsed
+
+
+def validate_bandwidth_rate(rate: int, name: str) -> int:
+    """
+    Raises:
+    -------
+    ValueError
+        If `rate` is negative. A non-positive rate would otherwise silently lift the limit.
+    """
+    if rate < 0:
+        raise ValueError(f"The rate of {name} must be 0 (unlimited) or a positive number of bytes per second, got {rate}.")
+    return rate
+
+
+def get_profile_rate(profiles: List[BandwidthProfile], moment: datetime) -> Optional[int]:
+    """
+    Returns the rate of the first profile covering `moment`, or None if no profile applies.
+    """
+    minute = moment.hour * 60 + moment.minute
+    for start, end, rate in profiles:
+        if start <= end:
+            if start <= minute < end:
+                return rate
+        elif minute >= start or minute < end:
+            return rate
+    return None
+
+
+def _parse_minute(value: str) -> int:
+    hours, minutes = value.strip().split(":")
+    minute = int(hours) * 60 + int(minutes)
+    if not 0 <= minute <= MINUTES_PER_DAY:
+        raise ValueError(f"time out of range: {value}")
+    return minute
@@ -0,0 +1,113 @@
+"""
+Postgres LISTEN/NOTIFY listener for the due tune queue.
+
+A trigger on `tunes` (see migration e1bc8edf6729) sends the ID of every inserted,
+deleted or rescheduled tune on the `tune_schedule` channel. Listening to it keeps
+this process's queue current with changes made by other processes. The listener
+is only started on Postgres; other databases rely on the consistency sweep.
+
+Processes that hand tunes to another one for an immediate upload (an API running
+without the scheduler) also publish them explicitly, see `wake_schedule_listeners`.
+"""
+import asyncio
+from typing import Callable, List, Optional
+import asyncpg
+from sqlalchemy.engine import make_url
+from app.components.upload.due_tune_queue.due_tune_queue_repository import get_tune_schedule, publish_tune_schedule_changes
+from app.components.upload.due_tune_queue.due_tune_queue_service import notify_tune_removed, notify_tune_scheduled
+from app.db.db import get_db_session_context
+from app.logger.logging_setup import logger
+from app.settings.env_settings import DB_CONN_STR
+
+TUNE_SCHEDULE_CHANNEL = "tune_schedule"
+
+# Pause before reconnecting after the listening connection is lost.
+RECONNECT_DELAY_SECONDS = 5
+
+# How often the listening connection is checked for liveness.
+HEALTH_CHECK_SECONDS = 30
+
+# Strong references to running refresh tasks, which the event loop only holds weakly.
+_refresh_tasks = set()
+
+
+def get_listener_dsn() -> Optional[str]:
+    """
+    Returns a plain Postgres DSN for asyncpg, or None if the database is not Postgres.
+    """
+    url = make_url(DB_CONN_STR)
+    if url.get_backend_name() != "postgresql":
+        return None
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def wake_schedule_listeners(tune_ids: List[int]):
+    """
+    Tells the listening worker processes that the given tunes are due, so they pick them
+    up at once. Without LISTEN/NOTIFY, the workers' next consistency sweep finds them.
+    """
+    if not tune_ids:
+        return
+    if get_listener_dsn() is None:
+        logger.debug(f"No LISTEN/NOTIFY; tunes {tune_ids} are picked up by the workers' next consistency sweep.")
+        return
+    try:
+        with get_db_session_context() as db:
+            await publish_tune_schedule_changes(tune_ids, TUNE_SCHEDULE_CHANNEL, db)
+    except Exception as e:
+        # The workers' consistency sweep still finds them.
+        logger.error(f"Failed to notify workers of tunes {tune_ids}: {e}")
+
+
+async def listen_for_schedule_changes(dsn: str, on_reconnect: Callable[[], None]):
+    """
+    Listens on the schedule channel until cancelled, reconnecting after failures.
+
+    `on_reconnect` is called after every reconnection, since notifications sent while
+    the connection was down are lost.
+    """
+    first_connect = True
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            await connection.add_listener(TUNE_SCHEDULE_CHANNEL, _on_notification)
+            logger.debug(f"Listening for tune schedule changes on '{TUNE_SCHEDULE_CHANNEL}'.")
+            if not first_connect:
+                on_reconnect()
+            first_connect = False
+
+            while not connection.is_closed():
+                await asyncio.sleep(HEALTH_CHECK_SECONDS)
+                await connection.execute("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Tune schedule listener lost its connection: {e}. Reconnecting in {RECONNECT_DELAY_SECONDS}s.")
+        finally:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+def _on_notification(connection, pid: int, channel: str, payload: str):
+    try:
+        tune_id = int(payload)
+    except ValueError:
+        logger.warning(f"Ignoring malformed tune schedule notification: {payload!r}")
+        return
+    task = asyncio.get_running_loop().create_task(_refresh_tune(tune_id))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _refresh_tune(tune_id: int):
+    try:
+        with get_db_session_context() as db:
+            schedule = await get_tune_schedule(tune_id, db)
+        if schedule is None:
+            notify_tune_removed(tune_id)
+        else:
+            notify_tune_scheduled(tune_id, *schedule)
+    except Exception as e:
+        logger.error(f"Failed to refresh tune {tune_id} from a schedule notification: {e}")
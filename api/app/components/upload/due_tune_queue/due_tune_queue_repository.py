@@ -0,0 +1,77 @@
+"""
+Repository Layer: Due Tune Queue
+================================
+Reads the minimal schedule data (tune ID, due time) the in-memory due tune queue
+is built from, and the due tunes themselves once the scheduler dispatches them.
+
+Both reads are paged, so their memory stays flat however large the backlog grows.
+
+Functions:
+----------
+- get_pending_tune_schedule_page: (ID, due time) of the next page of tunes a worker should pick up.
+- get_tune_schedule: upload date, status and retry time of a single tune.
+- get_due_tunes_with_users: the given tunes that are still due, each with its user.
+- publish_tune_schedule_changes: send tune IDs on a Postgres notification channel.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.db import Tune, User
+from app.components.tune_ops.tune_ops_utils import get_tune_due_at, is_actionable_tune, is_due_tune
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_pending_tune_schedule_page(after_id: int, limit: int, now: datetime, db: Session) -> List[Tuple[int, datetime]]:
+    """
+    Returns (ID, due time) of up to `limit` actionable tunes with an ID above `after_id`,
+    in ID order (keyset pagination on the primary key). A failed tune is due at its
+    retry time.
+    """
+    rows = (
+        db.query(Tune.id, Tune.upload_date, Tune.next_attempt_at)
+        .filter(Tune.id > after_id, is_actionable_tune(now), Tune.upload_date.isnot(None))
+        .order_by(Tune.id)
+        .limit(limit)
+        .all()
+    )
+    return [(tune_id, get_tune_due_at(upload_date, next_attempt_at)) for tune_id, upload_date, next_attempt_at in rows]
+
+
+@in_executor(EXECUTOR_DB)
+def get_due_tunes_with_users(tune_ids: List[int], now: datetime, db: Session) -> List[Tuple[Tune, Optional[User]]]:
+    """
+    Loads the given tunes that are still actionable and due, together with their
+    users in the same query. The user is None if it no longer exists.
+    """
+    return (
+        db.query(Tune, User)
+        .outerjoin(User, User.id == Tune.user_id)
+        .filter(Tune.id.in_(tune_ids), is_actionable_tune(now), is_due_tune(now))
+        .order_by(Tune.id)
+        .all()
+    )
+
+
+@in_executor(EXECUTOR_DB)
+def get_tune_schedule(tune_id: int, db: Session) -> Optional[Tuple[Optional[datetime], str, Optional[datetime]]]:
+    """
+    Returns (upload date, status, next attempt) of the tune, or None if it no longer exists.
+    """
+    return db.query(Tune.upload_date, Tune.status, Tune.next_attempt_at).filter(Tune.id == tune_id).first()
+
+
+@in_executor(EXECUTOR_DB)
+def publish_tune_schedule_changes(tune_ids: List[int], channel: str, db: Session):
+    """
+    Send each tune ID on the Postgres notification `channel`. The notifications are
+    delivered to the listening processes once the transaction commits.
+    """
+    try:
+        for tune_id in tune_ids:
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": str(tune_id)})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,179 @@
+"""
+Service Layer: Due Tune Queue
+=============================
+In-memory min-heap of (upload_date, tune_id) for every scheduled tune, so the
+scheduler can sleep exactly until the next upload is due instead of polling.
+
+Responsibilities:
+-----------------
+- Keep the next due upload at the top of the heap as tunes are created, moved or deleted.
+- Wake the scheduler whenever the earliest due time may have changed.
+- Track which tunes are being processed, so the scheduler and instant uploads never
+  work on the same tune twice.
+
+Entries are replaced lazily: moving or removing a tune only updates the index, and
+stale heap entries are dropped when they surface (or when the heap is compacted).
+
+The tune operations also update the queue from the database threads of the upload
+pipeline, so every access holds the queue's lock and `wake` hands the wake-up to the
+scheduler's event loop.
+"""
+import asyncio
+import heapq
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.components.tune_ops.tune_ops_utils import PENDING_TUNE_STATUSES, get_tune_due_at
+from app.logger.logging_setup import logger
+from app.utils.metrics_util import set_gauge
+
+# The heap is rebuilt once stale entries outnumber live ones by this factor.
+COMPACTION_FACTOR = 2
+
+
+class DueTuneQueue:
+    def __init__(self):
+        self._heap: List[Tuple[float, int]] = []
+        self._due_at: Dict[int, float] = {}
+        self._in_flight: Set[int] = set()
+        self._wake_event = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._due_at)
+
+    def schedule(self, tune_id: int, upload_date: datetime):
+        """
+        Adds a tune or moves it to a new upload date.
+        """
+        due_at = upload_date.timestamp()
+        with self._lock:
+            if self._due_at.get(tune_id) == due_at:
+                return
+            earliest = self.next_due_at()
+            self._due_at[tune_id] = due_at
+            heapq.heappush(self._heap, (due_at, tune_id))
+            self._compact_if_needed()
+        if earliest is None or due_at < earliest:
+            self.wake()
+
+    def remove(self, tune_id: int):
+        with self._lock:
+            if self._due_at.pop(tune_id, None) is not None:
+                self._compact_if_needed()
+
+    def replace_all(self, schedule: Iterable[Tuple[int, datetime]]):
+        """
+        Replaces the whole queue, e.g. with the result of a consistency sweep.
+        """
+        scheduled = {tune_id: upload_date.timestamp() for tune_id, upload_date in schedule}
+        with self._lock:
+            self._due_at = scheduled
+            self._heap = [(due_at, tune_id) for tune_id, due_at in self._due_at.items()]
+            heapq.heapify(self._heap)
+            set_gauge("scheduler.queued_tunes", len(self._due_at))
+        self.wake()
+
+    def next_due_at(self) -> Optional[float]:
+        """
+        Returns the POSIX timestamp of the earliest scheduled upload, if any.
+        """
+        with self._lock:
+            self._drop_stale_top()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """
+        Removes and returns the IDs of all tunes due at `now`, skipping tunes in flight.
+        """
+        now_ts = now.timestamp()
+        due = []
+        with self._lock:
+            while True:
+                self._drop_stale_top()
+                if not self._heap or self._heap[0][0] > now_ts:
+                    break
+                _, tune_id = heapq.heappop(self._heap)
+                del self._due_at[tune_id]
+                if tune_id not in self._in_flight:
+                    due.append(tune_id)
+            set_gauge("scheduler.queued_tunes", len(self._due_at))
+        return due
+
+    def claim(self, tune_ids: Iterable[int]) -> Set[int]:
+        """
+        Marks tunes as being processed and returns the ones that were not claimed already.
+        """
+        with self._lock:
+            claimed = {tune_id for tune_id in tune_ids if tune_id not in self._in_flight}
+            self._in_flight.update(claimed)
+            set_gauge("scheduler.in_flight_tunes", len(self._in_flight))
+        return claimed
+
+    def release(self, tune_ids: Iterable[int]):
+        with self._lock:
+            self._in_flight.difference_update(tune_ids)
+            set_gauge("scheduler.in_flight_tunes", len(self._in_flight))
+
+    def is_in_flight(self, tune_id: int) -> bool:
+        with self._lock:
+            return tune_id in self._in_flight
+
+    def wake(self):
+        """
+        Wakes the scheduler. Safe to call from any thread.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or _is_running_on(loop):
+            self._wake_event.set()
+        else:
+            loop.call_soon_threadsafe(self._wake_event.set)
+
+    async def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Sleeps until woken or until `timeout` seconds pass. Returns True if woken.
+        """
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._wake_event.clear()
+        return True
+
+    def _drop_stale_top(self):
+        while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _compact_if_needed(self):
+        if len(self._heap) > COMPACTION_FACTOR * max(len(self._due_at), 1024):
+            self._heap = [(due_at, tune_id) for tune_id, due_at in self._due_at.items()]
+            heapq.heapify(self._heap)
+            logger.debug(f"Compacted the due tune queue to {len(self._heap)} entries.")
+
+
+def _is_running_on(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+# Shared by the scheduler, the tune operations and the upload pipeline in this process.
+due_tune_queue = DueTuneQueue()
+
+
+def notify_tune_scheduled(tune_id: int, upload_date: Optional[datetime], status: str, next_attempt_at: Optional[datetime] = None):
+    """
+    Brings the queue in line with a tune that was created, updated or failed in this process.
+    """
+    if status not in PENDING_TUNE_STATUSES or upload_date is None:
+        due_tune_queue.remove(tune_id)
+    else:
+        due_tune_queue.schedule(tune_id, get_tune_due_at(upload_date, next_attempt_at))
+
+
+def notify_tune_removed(tune_id: int):
+    due_tune_queue.remove(tune_id)
@@ -0,0 +1,80 @@
+"""
+Repository Layer: Video Processing Status
+=========================================
+Reads the uploaded tunes whose YouTube processing has not settled yet and stores
+the results of processing status checks.
+
+Functions:
+----------
+- get_tunes_awaiting_processing: Tunes still processing, with their owner's tokens.
+- save_processing_statuses: Store the outcome of a polling round in one transaction.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.db.db import Tune, User
+from app.components.upload.processing_status.processing_status_utils import PROCESSING_STATUS_PROCESSING
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_tunes_awaiting_processing(db: Session, limit: int) -> List[Tuple[int, str, str, Optional[str], Optional[str]]]:
+    """
+    Retrieve uploaded tunes whose video is still processing, least recently checked first.
+
+    Returns:
+    --------
+    List[Tuple[int, str, str, Optional[str], Optional[str]]]
+        (tune ID, video ID, user ID, access token, refresh token) per tune.
+    """
+    return (
+        db.query(
+            Tune.id,
+            Tune.youtube_video_id,
+            Tune.user_id,
+            User.youtube_access_token,
+            User.youtube_refresh_token
+        )
+        .join(User, User.id == Tune.user_id)
+        .filter(
+            Tune.processing_status == PROCESSING_STATUS_PROCESSING,
+            Tune.youtube_video_id.isnot(None)
+        )
+        .order_by(Tune.processing_checked_at.is_(None).desc(), Tune.processing_checked_at.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+@in_executor(EXECUTOR_DB)
+def save_processing_statuses(statuses: Dict[int, Tuple[str, Optional[str]]], checked_at: datetime, db: Session):
+    """
+    Store the processing status and failure reason of each checked tune.
+
+    Args:
+    -----
+    statuses : Dict[int, Tuple[str, Optional[str]]]
+        Processing status and failure reason by tune ID.
+    checked_at : datetime
+        When the statuses were fetched.
+    db : Session
+        The database session used for the operation.
+    """
+    try:
+        for tune_id, (status, failure_reason) in statuses.items():
+            (
+                db.query(Tune)
+                .filter(Tune.id == tune_id)
+                .update(
+                    {
+                        Tune.processing_status: status,
+                        Tune.processing_failure_reason: failure_reason[:255] if failure_reason else None,
+                        Tune.processing_checked_at: checked_at,
+                    },
+                    synchronize_session=False
+                )
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
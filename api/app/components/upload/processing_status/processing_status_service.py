@@ -0,0 +1,119 @@
+"""
+Service Layer: Video Processing Status
+======================================
+Checks whether YouTube finished processing the videos the pipeline uploaded.
+
+Videos still processing are collected per user and checked with videos.list in
+batches of up to 50 IDs, so a round costs one quota unit per 50 videos rather than
+one per video. Results are stored on the tune (`processing_status`,
+`processing_failure_reason`, `processing_checked_at`).
+
+Metrics:
+--------
+- processing_poll.checked: videos checked.
+- processing_poll.settled: videos that reached a final state, by status.
+- processing_poll.pending: videos still processing after the last round.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from app.components.quota.quota_service import record_quota_usage
+from app.components.retry_policy.retry_policy_service import RetryPolicy, call_with_retry_async
+from app.components.upload.processing_status.processing_status_repository import get_tunes_awaiting_processing, save_processing_statuses
+from app.components.upload.processing_status.processing_status_utils import (
+    PROCESSING_STATUS_PROCESSING,
+    VIDEOS_LIST_MAX_IDS,
+    ProcessingPollResult,
+    batched,
+    get_processing_outcome
+)
+from app.components.upload.tune2tube.tune2tube_client import YouTubeClient
+from app.db.db import get_db_session_context
+from app.logger.logging_setup import logger
+from app.settings.env_settings import PROCESSING_POLL_MAX_VIDEOS
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+from app.utils.metrics_util import increment_counter, set_gauge
+
+PROCESSING_POLL_RETRY_POLICY = RetryPolicy("youtube_processing_poll")
+
+
+async def poll_processing_status() -> ProcessingPollResult:
+    """
+    Runs one polling round over the videos that are still processing.
+
+    Returns:
+    --------
+    ProcessingPollResult
+        How many videos were checked, settled and are still pending.
+    """
+    with get_db_session_context() as db:
+        rows = await get_tunes_awaiting_processing(db, PROCESSING_POLL_MAX_VIDEOS)
+
+    if not rows:
+        set_gauge("processing_poll.pending", 0)
+        return ProcessingPollResult()
+
+    tunes_by_user: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    tokens_by_user: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for tune_id, video_id, user_id, access_token, refresh_token in rows:
+        tunes_by_user[user_id].append((tune_id, video_id))
+        tokens_by_user[user_id] = (access_token, refresh_token)
+
+    results = await asyncio.gather(
+        *(_check_user_videos(user_id, tunes, *tokens_by_user[user_id]) for user_id, tunes in tunes_by_user.items()),
+        return_exceptions=True
+    )
+
+    statuses: Dict[int, Tuple[str, Optional[str]]] = {}
+    for user_id, result in zip(tunes_by_user, results):
+        if isinstance(result, Exception):
+            logger.error(f"Processing status check failed for user {user_id}: {result}")
+            continue
+        statuses.update(result)
+
+    if statuses:
+        with get_db_session_context() as db:
+            await save_processing_statuses(statuses, datetime.now(timezone.utc), db)
+
+    settled = sum(1 for status, _ in statuses.values() if status != PROCESSING_STATUS_PROCESSING)
+    result = ProcessingPollResult(checked=len(statuses), settled=settled, pending=len(rows) - settled)
+    increment_counter("processing_poll.checked", result.checked)
+    set_gauge("processing_poll.pending", result.pending)
+    logger.debug(f"Processing status poll: {result.checked} checked, {result.settled} settled, {result.pending} pending.")
+    return result
+
+
+async def _check_user_videos(
+    user_id: str,
+    tunes: List[Tuple[int, str]],
+    access_token: Optional[str],
+    refresh_token: Optional[str]
+) -> Dict[int, Tuple[str, Optional[str]]]:
+    client = YouTubeClient(access_token, refresh_token)
+    statuses = {}
+
+    for batch in batched(tunes, VIDEOS_LIST_MAX_IDS):
+        response = await call_with_retry_async(
+            client.list, "videos", part="status,processingDetails", id=",".join(video_id for _, video_id in batch),
+            policy=PROCESSING_POLL_RETRY_POLICY
+        )
+        await _record_poll_quota_usage(user_id)
+
+        resources = {item["id"]: item for item in response.get("items", [])}
+        for tune_id, video_id in batch:
+            status, failure_reason = get_processing_outcome(resources.get(video_id))
+            statuses[tune_id] = (status, failure_reason)
+            if status != PROCESSING_STATUS_PROCESSING:
+                increment_counter("processing_poll.settled", status=status)
+                logger.info(f"Video {video_id} (tune {tune_id}) finished processing: {status}" + (f" ({failure_reason})" if failure_reason else ""))
+    return statuses
+
+
+@in_executor(EXECUTOR_DB)
+def _record_poll_quota_usage(user_id: str):
+    try:
+        with get_db_session_context() as db:
+            record_quota_usage(user_id, "videos.list", db)
+    except Exception as e:
+        logger.error(f"Failed to record processing poll quota usage for user {user_id}: {e}")
@@ -0,0 +1,66 @@
+from typing import Iterator, List, Optional, Tuple
+from app.settings.env_settings import PROCESSING_POLL_MAX_SECONDS, PROCESSING_POLL_MIN_SECONDS
+
+# Processing state of an uploaded video, as stored in `tunes.processing_status`.
+PROCESSING_STATUS_PROCESSING = "processing"
+PROCESSING_STATUS_SUCCEEDED = "succeeded"
+PROCESSING_STATUS_FAILED = "failed"
+PROCESSING_STATUS_REJECTED = "rejected"
+PROCESSING_STATUS_DELETED = "deleted"
+
+# videos.list accepts at most 50 IDs per call.
+VIDEOS_LIST_MAX_IDS = 50
+
+
+class ProcessingPollResult:
+    """
+    Outcome of one polling round: how many videos were checked, how many reached a
+    final state and how many are still processing.
+    """
+    def __init__(self, checked: int = 0, settled: int = 0, pending: int = 0):
+        self.checked = checked
+        self.settled = settled
+        self.pending = pending
+
+
+def get_processing_outcome(resource: Optional[dict]) -> Tuple[str, Optional[str]]:
+    """
+    Maps a videos.list resource (parts `status` and `processingDetails`) to a processing
+    status and, for failures, the reason YouTube gave. A video missing from the response
+    has been deleted or is no longer visible to the uploader.
+    """
+    if resource is None:
+        return PROCESSING_STATUS_DELETED, "Video not found."
+
+    status = resource.get("status", {})
+    upload_status = status.get("uploadStatus")
+    if upload_status == "processed":
+        return PROCESSING_STATUS_SUCCEEDED, None
+    if upload_status == "rejected":
+        return PROCESSING_STATUS_REJECTED, status.get("rejectionReason")
+    if upload_status == "failed":
+        return PROCESSING_STATUS_FAILED, status.get("failureReason")
+    if upload_status == "deleted":
+        return PROCESSING_STATUS_DELETED, None
+
+    processing_details = resource.get("processingDetails", {})
+    if processing_details.get("processingStatus") in ("failed", "terminated"):
+        return PROCESSING_STATUS_FAILED, processing_details.get("processingFailureReason") or processing_details["processingStatus"]
+    return PROCESSING_STATUS_PROCESSING, None
+
+
+def get_next_poll_interval(current: float, result: Optional[ProcessingPollResult]) -> float:
+    """
+    Polls quickly while videos are settling and backs off exponentially while nothing
+    changes. With nothing left to check the poller idles at the longest interval.
+    """
+    if result is None or result.pending == 0:
+        return PROCESSING_POLL_MAX_SECONDS
+    if result.settled > 0:
+        return PROCESSING_POLL_MIN_SECONDS
+    return min(current * 2, PROCESSING_POLL_MAX_SECONDS)
+
+
+def batched(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
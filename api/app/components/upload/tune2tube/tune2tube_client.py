@@ -0,0 +1,199 @@
+"""
+Async YouTube Data API client built on httpx.
+
+All requests share one connection pool, so concurrent uploads and status checks are
+coroutines multiplexed over a bounded set of connections rather than one blocked
+thread each.
+
+Implements what the upload pipeline needs:
+
+- `initiate_upload`: start a resumable `videos.insert` session.
+- `upload_chunk`: PUT one chunk, streaming it from disk through the bandwidth limiter.
+- `query_upload_status`: `bytes */N` status query of a resumable session.
+- `list`: GET on a Data API collection (`videos`, `channels`, `playlistItems`, ...).
+
+Errors surface as `httpx.HTTPStatusError` / `httpx.TransportError`, which the retry
+policy already classifies. Chunk throughput and throttling responses to upload requests
+are reported to the upload concurrency controller.
+"""
+import re
+import time
+from typing import AsyncIterator, BinaryIO, Callable, Optional, Tuple
+import httpx
+from app.components.auth.google_oauth.google_oauth_token_ops_utils import refresh_google_access_token
+from app.components.upload.bandwidth_shaper.bandwidth_shaper_service import SLICE_BYTES, upload_bandwidth_limiter
+from app.components.upload.upload_concurrency.upload_concurrency_service import upload_concurrency_controller
+from app.components.upload.upload_concurrency.upload_concurrency_utils import is_throttling_status
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    YOUTUBE_ACCESS_API_ROOT_URL,
+    YOUTUBE_ACCESS_HTTP_MAX_CONNECTIONS,
+    YOUTUBE_ACCESS_HTTP_TIMEOUT_SECONDS,
+    YOUTUBE_ACCESS_SERVICE_NAME,
+    YOUTUBE_ACCESS_SERVICE_VERSION
+)
+from app.utils.executor_util import EXECUTOR_UPLOAD_IO, run_blocking
+from app.utils.metrics_util import increment_counter
+
+DEFAULT_API_ROOT_URL = "https://www.googleapis.com/"
+
+# Status a resumable session answers with while the upload is incomplete.
+RESUME_INCOMPLETE = 308
+
+# Operations of the resumable upload protocol, whose throttling drives the upload concurrency.
+UPLOAD_OPERATIONS = ("videos.insert", "videos.insert.status", "videos.insert.chunk")
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_youtube_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide connection pool for YouTube API calls, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        limits = httpx.Limits(
+            max_connections=YOUTUBE_ACCESS_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=YOUTUBE_ACCESS_HTTP_MAX_CONNECTIONS
+        )
+        _http_client = httpx.AsyncClient(limits=limits, timeout=YOUTUBE_ACCESS_HTTP_TIMEOUT_SECONDS)
+        logger.debug(f"Created YouTube HTTP connection pool ({YOUTUBE_ACCESS_HTTP_MAX_CONNECTIONS} connections).")
+    return _http_client
+
+
+async def close_youtube_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class YouTubeClient:
+    """
+    YouTube Data API calls made on behalf of one user.
+
+    An expired access token is refreshed once with the refresh token when a request
+    is answered with 401; the new token is kept for the rest of this client's calls.
+    """
+    def __init__(self, access_token: str, refresh_token: Optional[str]):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        root_url = (YOUTUBE_ACCESS_API_ROOT_URL or DEFAULT_API_ROOT_URL).rstrip("/")
+        self.api_url = f"{root_url}/{YOUTUBE_ACCESS_SERVICE_NAME}/{YOUTUBE_ACCESS_SERVICE_VERSION}"
+        self.upload_url = f"{root_url}/upload/{YOUTUBE_ACCESS_SERVICE_NAME}/{YOUTUBE_ACCESS_SERVICE_VERSION}/videos"
+
+    async def list(self, resource: str, **params) -> dict:
+        response = await self._send("GET", f"{self.api_url}/{resource}", operation=f"{resource}.list", params=params)
+        return response.json()
+
+    async def initiate_upload(self, body: dict, total_size: int, mimetype: str) -> str:
+        """
+        Starts a resumable `videos.insert` session and returns its session URI.
+        """
+        response = await self._send(
+            "POST",
+            self.upload_url,
+            operation="videos.insert",
+            params={"uploadType": "resumable", "part": ",".join(body.keys())},
+            json=body,
+            headers={"X-Upload-Content-Length": str(total_size), "X-Upload-Content-Type": mimetype}
+        )
+        session_uri = response.headers.get("location")
+        if not session_uri:
+            raise httpx.HTTPStatusError("Resumable upload initiation returned no session URI.", request=response.request, response=response)
+        return session_uri
+
+    async def query_upload_status(self, session_uri: str, total_size: int) -> Tuple[int, Optional[dict]]:
+        """
+        Asks the session how many bytes YouTube has committed.
+
+        Returns:
+        --------
+        Tuple[int, Optional[dict]]
+            The committed byte offset and, if the upload already completed, the video resource.
+        """
+        response = await self._send(
+            "PUT",
+            session_uri,
+            operation="videos.insert.status",
+            headers={"Content-Range": f"bytes */{total_size}", "Content-Length": "0"}
+        )
+        return _parse_upload_response(response, total_size)
+
+    async def upload_chunk(self, session_uri: str, stream: BinaryIO, offset: int, length: int, total_size: int) -> Tuple[int, Optional[dict]]:
+        """
+        Streams `length` bytes of `stream` starting at `offset` to the session.
+
+        Returns:
+        --------
+        Tuple[int, Optional[dict]]
+            The committed byte offset and, once the last chunk is accepted, the video resource.
+        """
+        started_at = time.monotonic()
+        response = await self._send(
+            "PUT",
+            session_uri,
+            operation="videos.insert.chunk",
+            content_factory=lambda: _iter_file_range(stream, offset, length),
+            headers={
+                "Content-Range": f"bytes {offset}-{offset + length - 1}/{total_size}",
+                "Content-Length": str(length)
+            }
+        )
+        committed, video = _parse_upload_response(response, total_size)
+        upload_concurrency_controller.record_transfer(length, time.monotonic() - started_at)
+        return committed, video
+
+    async def _send(self, method: str, url: str, operation: str, **kwargs) -> httpx.Response:
+        response = await self._request(method, url, **kwargs)
+        if response.status_code == 401 and self.refresh_token:
+            logger.debug("YouTube access token rejected. Refreshing it.")
+            await self._refresh_access_token()
+            response = await self._request(method, url, **kwargs)
+
+        increment_counter("youtube.http.requests", operation=operation, status=response.status_code)
+        if response.status_code >= 400:
+            if operation in UPLOAD_OPERATIONS and is_throttling_status(response.status_code):
+                upload_concurrency_controller.record_throttle(operation, response.status_code)
+            response.raise_for_status()
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict] = None,
+        content_factory: Optional[Callable[[], AsyncIterator[bytes]]] = None,
+        **kwargs
+    ) -> httpx.Response:
+        # Streamed bodies are consumed by the request, so each send draws a fresh one.
+        if content_factory is not None:
+            kwargs["content"] = content_factory()
+        headers = {**(headers or {}), "Authorization": f"Bearer {self.access_token}"}
+        return await get_youtube_http_client().request(method, url, headers=headers, **kwargs)
+
+    async def _refresh_access_token(self):
+        token_response = await refresh_google_access_token(self.refresh_token)
+        self.access_token = token_response["access_token"]
+
+
+async def _iter_file_range(stream: BinaryIO, offset: int, length: int) -> AsyncIterator[bytes]:
+    await run_blocking(EXECUTOR_UPLOAD_IO, stream.seek, offset)
+    remaining = length
+    while remaining > 0:
+        block = await run_blocking(EXECUTOR_UPLOAD_IO, stream.read, min(SLICE_BYTES, remaining))
+        if not block:
+            raise IOError(f"Video file ended {remaining} bytes before the expected size.")
+        await upload_bandwidth_limiter.acquire_async(len(block))
+        remaining -= len(block)
+        yield block
+
+
+def _parse_upload_response(response: httpx.Response, total_size: int) -> Tuple[int, Optional[dict]]:
+    if response.status_code in (200, 201):
+        return total_size, response.json()
+    if response.status_code != RESUME_INCOMPLETE:
+        raise httpx.HTTPStatusError(f"Unexpected upload response {response.status_code}.", request=response.request, response=response)
+
+    committed_range = re.fullmatch(r"bytes=0-(\d+)", response.headers.get("range", ""))
+    return (int(committed_range.group(1)) + 1 if committed_range else 0), None
@@ -1,17 +1,34 @@
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
-from google.oauth2.credentials import Credentials
+import asyncio
+import mimetypes
+import os
+from typing import Awaitable, BinaryIO, Callable, Optional
+import httpx
+from app.components.retry_policy.retry_policy_service import RetryBudget, RetryPolicy, call_with_retry_async
+from app.components.upload.tune2tube.tune2tube_client import YouTubeClient
 from app.logger.logging_setup import logger
-from app.settings.env_settings import (
-    YOUTUBE_ACCESS_SERVICE_NAME,
-    YOUTUBE_ACCESS_SERVICE_VERSION,
-    GOOGLE_OAUTH_CLIENT_ID,
-    GOOGLE_OAUTH_CLIENT_SECRET,
-    GOOGLE_OAUTH_TOKEN_URL
-)
-
-def upload_video(
+from app.settings.env_settings import YOUTUBE_ACCESS_UPLOAD_CHUNK_SIZE
+from app.utils.executor_util import EXECUTOR_UPLOAD_IO, run_blocking
+
+# YouTube requires every chunk except the last to be a multiple of 256 KiB.
+RESUMABLE_CHUNK_GRANULARITY = 256 * 1024
+
+# Status codes returned by a status query when the session URI is no longer usable.
+EXPIRED_SESSION_STATUSES = (404, 410)
+
+UPLOAD_CHUNK_RETRY_POLICY = RetryPolicy("youtube_upload_chunk")
+RECONCILE_RETRY_POLICY = RetryPolicy("youtube_reconcile")
+
+# Every upload carries a tag derived from the tune's idempotency token, so a video
+# whose upload outcome was lost can be found again among the channel's uploads.
+IDEMPOTENCY_TAG_PREFIX = "pb2t-"
+
+# How many of the channel's most recent uploads are searched for a lost video.
+RECONCILE_SEARCH_LIMIT = 50
+
+# YouTube Data API calls made by `find_uploaded_video_by_token`, for quota accounting.
+RECONCILE_OPERATIONS = ("channels.list", "playlistItems.list", "videos.list")
+
+async def upload_video(
     access_token: str,
     refresh_token: str,
     video_file: str,
@@ -21,13 +38,37 @@ def upload_video(
     license: str,
     embeddable: bool,
     privacy_status: str = "unlisted",
-    tags: list[str] = None
-):
-    logger.debug("Initializing YouTube upload")
+    tags: list[str] = None,
+    resume_session_uri: Optional[str] = None,
+    on_checkpoint: Optional[Callable[[str, int], Awaitable[None]]] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    on_session_expired: Optional[Callable[[], Awaitable[None]]] = None
+) -> str:
+    """
+    Uploads a video to YouTube using the resumable upload protocol.
+
+    When `resume_session_uri` is given, the session status is queried first and the
+    upload continues from the last byte YouTube has committed. `on_checkpoint` is
+    awaited with the session URI and committed byte offset whenever either changes,
+    and once more when the upload is cancelled, so callers can persist them and
+    resume after a crash or shutdown.
 
-    credentials = _get_credentials(access_token, refresh_token)
-    youtube = _get_youtube_client(credentials)
-    media_body = MediaFileUpload(video_file, chunksize=-1, resumable=True)
+    If the resumed session has expired, the upload starts over in a new session, which
+    YouTube charges as a new `videos.insert`. `on_session_expired` is awaited before that
+    happens and may raise to stop the upload, e.g. when the quota does not cover it.
+
+    Transient chunk failures are retried with backoff; a failed chunk resumes from the
+    committed offset. Retries are drawn from `retry_budget` when one is given.
+
+    The file is streamed through the process-wide bandwidth limiter, so concurrent
+    uploads share the configured uplink budget.
+
+    Returns:
+    --------
+    str
+        The ID of the uploaded video.
+    """
+    logger.debug("Initializing YouTube upload")
 
     body = {
         "snippet": {
@@ -43,38 +84,184 @@ def upload_video(
         }
     }
 
+    video_stream = await run_blocking(EXECUTOR_UPLOAD_IO, open, video_file, "rb")
+    upload = None
+    last_checkpoint = (resume_session_uri, 0)
     try:
+        upload = ResumableUpload(
+            YouTubeClient(access_token, refresh_token),
+            video_stream,
+            await run_blocking(EXECUTOR_UPLOAD_IO, os.path.getsize, video_file),
+            mimetypes.guess_type(video_file)[0] or "video/mp4",
+            body,
+            resume_session_uri,
+            on_session_expired
+        )
+
         logger.debug("Sending upload request to YouTube")
-        request = youtube.videos().insert(part="snippet,status", body=body, media_body=media_body)
         response = None
         while response is None:
-            status, response = request.next_chunk()
-            if status:
-                logger.debug(f"Upload progress: {int(status.progress() * 100)}%")
+            response = await call_with_retry_async(
+                upload.next_chunk,
+                policy=UPLOAD_CHUNK_RETRY_POLICY,
+                budget=retry_budget
+            )
+
+            checkpoint = (upload.session_uri, upload.committed)
+            if on_checkpoint and response is None and checkpoint != last_checkpoint:
+                await on_checkpoint(*checkpoint)
+            last_checkpoint = checkpoint
+
+            if response is None:
+                logger.debug(f"Upload progress: {int(upload.committed * 100 / max(upload.total_size, 1))}%")
         logger.info(f"Video uploaded successfully. Video ID: {response['id']}")
-    except HttpError as e:
+        return response['id']
+    except asyncio.CancelledError:
+        # Stopped mid-upload, e.g. by a shutdown drain: store where the session stands, so
+        # the next attempt resumes it instead of starting over.
+        if on_checkpoint and upload is not None and upload.session_uri:
+            checkpoint = (upload.session_uri, upload.committed)
+            if checkpoint != last_checkpoint:
+                await on_checkpoint(*checkpoint)
+        raise
+    except httpx.HTTPStatusError as e:
         logger.error(f"YouTube API error: {e}")
         raise
     except Exception as e:
         logger.error(f"Unexpected upload error: {e}")
         raise
+    finally:
+        video_stream.close()
 
-def _get_credentials(token, refresh_token):
-    try:
-        return Credentials(
-            token=token,
-            refresh_token=refresh_token,
-            token_uri=GOOGLE_OAUTH_TOKEN_URL,
-            client_id=GOOGLE_OAUTH_CLIENT_ID,
-            client_secret=GOOGLE_OAUTH_CLIENT_SECRET
-        )
-    except Exception as e:
-        logger.error(f"Failed to create credentials: {e}")
-        raise
+class ResumableUpload:
+    """
+    State of one resumable upload session.
 
-def _get_youtube_client(credentials):
-    try:
-        return build(YOUTUBE_ACCESS_SERVICE_NAME, YOUTUBE_ACCESS_SERVICE_VERSION, credentials=credentials)
-    except Exception as e:
-        logger.error(f"Failed to initialize YouTube client: {e}")
-        raise
+    Each `next_chunk` call advances the upload by one chunk. After a failed call the
+    next one first queries the session for the committed offset, so a retry resends
+    only what YouTube has not kept.
+    """
+    def __init__(
+        self,
+        client: YouTubeClient,
+        stream: BinaryIO,
+        total_size: int,
+        mimetype: str,
+        body: dict,
+        resume_session_uri: Optional[str] = None,
+        on_session_expired: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        self.client = client
+        self.stream = stream
+        self.total_size = total_size
+        self.mimetype = mimetype
+        self.body = body
+        self.session_uri = resume_session_uri
+        self.committed = 0
+        self.chunk_size = get_upload_chunk_size()
+        self._resumed_session_uri = resume_session_uri
+        self._in_error_state = resume_session_uri is not None
+        self._on_session_expired = on_session_expired
+        self._session_expired = False
+        if resume_session_uri:
+            logger.info(f"Resuming upload session: {resume_session_uri}")
+
+    async def next_chunk(self) -> Optional[dict]:
+        """
+        Sends the next chunk and returns the video resource once the upload is complete.
+        """
+        try:
+            if self.session_uri is None:
+                if self._session_expired:
+                    if self._on_session_expired:
+                        await self._on_session_expired()
+                    self._session_expired = False
+                self.session_uri = await self.client.initiate_upload(self.body, self.total_size, self.mimetype)
+                self.committed = 0
+            elif self._in_error_state:
+                response = await self._query_status()
+                self._in_error_state = False
+                if response is not None or self.session_uri is None:
+                    return response
+
+            length = self.total_size - self.committed
+            if self.chunk_size > 0:
+                length = min(length, self.chunk_size)
+            self.committed, response = await self.client.upload_chunk(
+                self.session_uri, self.stream, self.committed, length, self.total_size
+            )
+            return response
+        except Exception:
+            self._in_error_state = self.session_uri is not None
+            raise
+
+    async def _query_status(self) -> Optional[dict]:
+        try:
+            self.committed, response = await self.client.query_upload_status(self.session_uri, self.total_size)
+            return response
+        except httpx.HTTPStatusError as e:
+            if self.session_uri != self._resumed_session_uri or e.response.status_code not in EXPIRED_SESSION_STATUSES:
+                raise
+            logger.warning("Stored upload session has expired. Starting a new upload session.")
+            self.session_uri = None
+            self._resumed_session_uri = None
+            self._session_expired = True
+            self.committed = 0
+            return None
+
+def build_idempotency_tag(idempotency_token: str) -> str:
+    return f"{IDEMPOTENCY_TAG_PREFIX}{idempotency_token}"
+
+async def find_uploaded_video_by_token(access_token: str, refresh_token: str, idempotency_token: str) -> Optional[str]:
+    """
+    Searches the channel's most recent uploads for the video tagged with
+    `idempotency_token`.
+
+    Used before re-uploading a tune whose previous attempt may have reached YouTube
+    without its outcome being recorded. Costs one unit each for channels.list,
+    playlistItems.list and videos.list (see `RECONCILE_OPERATIONS`).
+
+    Returns:
+    --------
+    Optional[str]
+        The ID of the matching video, or None if none of the recent uploads carry the tag.
+    """
+    client = YouTubeClient(access_token, refresh_token)
+    tag = build_idempotency_tag(idempotency_token)
+
+    channels = await call_with_retry_async(
+        client.list, "channels", part="contentDetails", mine="true",
+        policy=RECONCILE_RETRY_POLICY
+    )
+    if not channels.get("items"):
+        logger.warning("No channel found for the account; cannot search its uploads.")
+        return None
+    uploads_playlist_id = channels["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+    playlist = await call_with_retry_async(
+        client.list, "playlistItems", part="contentDetails", playlistId=uploads_playlist_id, maxResults=RECONCILE_SEARCH_LIMIT,
+        policy=RECONCILE_RETRY_POLICY
+    )
+    video_ids = [item["contentDetails"]["videoId"] for item in playlist.get("items", [])]
+    if not video_ids:
+        return None
+
+    videos = await call_with_retry_async(
+        client.list, "videos", part="snippet", id=",".join(video_ids),
+        policy=RECONCILE_RETRY_POLICY
+    )
+    for video in videos.get("items", []):
+        if tag in video.get("snippet", {}).get("tags", []):
+            logger.info(f"Found previously uploaded video {video['id']} for token {idempotency_token}.")
+            return video["id"]
+    return None
+
+def get_upload_chunk_size() -> int:
+    """
+    Returns the configured upload chunk size, rounded down to the 256 KiB granularity
+    required by the resumable protocol. A non-positive value uploads the file in one request.
+    """
+    if YOUTUBE_ACCESS_UPLOAD_CHUNK_SIZE <= 0:
+        return -1
+    chunks = max(1, YOUTUBE_ACCESS_UPLOAD_CHUNK_SIZE // RESUMABLE_CHUNK_GRANULARITY)
+    return chunks * RESUMABLE_CHUNK_GRANULARITY
@@ -0,0 +1,129 @@
+"""
+Repository Layer: Tune Leases
+=============================
+Claims, renews and releases the processing lease stored on `tunes`, so several
+worker processes can share the backlog without uploading a tune twice.
+
+Functions:
+----------
+- claim_tune_leases: Lease the given tunes that are pending and not leased by a live worker.
+- renew_tune_leases: Extend the leases a worker still holds.
+- release_tune_leases: Give up a worker's leases.
+"""
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from app.db.db import Tune
+from app.components.tune_ops.tune_ops_utils import ACTIVE_TUNE_STATUSES
+from app.components.upload.tune_lease.tune_lease_utils import supports_skip_locked
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def claim_tune_leases(
+    tune_ids: List[int],
+    owner: str,
+    expires_at: datetime,
+    now: datetime,
+    db: Session
+) -> Tuple[List[int], List[int]]:
+    """
+    Lease the given tunes that are not uploaded or dead-lettered and whose lease is
+    free or expired.
+
+    On Postgres and MySQL the candidate rows are locked with `FOR UPDATE SKIP LOCKED`,
+    so concurrent claimers skip each other's rows instead of waiting. Other databases
+    (SQLite) fall back to a conditional update per row; their writes are serialized,
+    so only one claimer's update can match.
+
+    Returns:
+    --------
+    Tuple[List[int], List[int]]
+        The IDs that were claimed, and the subset taken over from an expired lease.
+    """
+    if not tune_ids:
+        return [], []
+
+    claimable = (
+        Tune.status.in_(ACTIVE_TUNE_STATUSES),
+        Tune.lease_expires_at.is_(None) | (Tune.lease_expires_at < now)
+    )
+    lease_values = {
+        Tune.lease_owner: owner,
+        Tune.lease_expires_at: expires_at,
+    }
+
+    try:
+        candidates_query = db.query(Tune.id, Tune.lease_owner).filter(Tune.id.in_(tune_ids), *claimable)
+        if supports_skip_locked(db):
+            candidates = candidates_query.with_for_update(skip_locked=True).all()
+            claimed = [candidate.id for candidate in candidates]
+            if claimed:
+                db.query(Tune).filter(Tune.id.in_(claimed)).update(lease_values, synchronize_session=False)
+        else:
+            candidates = candidates_query.all()
+            claimed = []
+            for candidate in candidates:
+                updated = (
+                    db.query(Tune)
+                    .filter(Tune.id == candidate.id, *claimable)
+                    .update(lease_values, synchronize_session=False)
+                )
+                if updated:
+                    claimed.append(candidate.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    claimed_set = set(claimed)
+    reclaimed = [candidate.id for candidate in candidates if candidate.id in claimed_set and candidate.lease_owner]
+    return claimed, reclaimed
+
+
+@in_executor(EXECUTOR_DB)
+def renew_tune_leases(tune_ids: List[int], owner: str, expires_at: datetime, db: Session) -> List[int]:
+    """
+    Extend the leases `owner` still holds on the given tunes.
+
+    Returns:
+    --------
+    List[int]
+        The IDs whose lease was renewed. Missing IDs were lost to another worker.
+    """
+    if not tune_ids:
+        return []
+
+    try:
+        held = [
+            row.id for row in
+            db.query(Tune.id).filter(Tune.id.in_(tune_ids), Tune.lease_owner == owner).all()
+        ]
+        if held:
+            (
+                db.query(Tune)
+                .filter(Tune.id.in_(held), Tune.lease_owner == owner)
+                .update({Tune.lease_expires_at: expires_at}, synchronize_session=False)
+            )
+        db.commit()
+        return held
+    except Exception:
+        db.rollback()
+        raise
+
+
+@in_executor(EXECUTOR_DB)
+def release_tune_leases(tune_ids: List[int], owner: str, db: Session):
+    if not tune_ids:
+        return
+
+    try:
+        (
+            db.query(Tune)
+            .filter(Tune.id.in_(tune_ids), Tune.lease_owner == owner)
+            .update({Tune.lease_owner: None, Tune.lease_expires_at: None}, synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,166 @@
+"""
+Service Layer: Tune Leases
+==========================
+Durable claims on tunes, shared by every worker process through the database.
+
+Before processing, a worker leases the tunes it was handed; tunes leased by a live
+worker are skipped. While it holds leases, a heartbeat renews them every
+`TUNE_LEASE_HEARTBEAT_SECONDS`. If a worker dies, its leases expire after
+`TUNE_LEASE_SECONDS` and the tunes are reclaimed by the next claim.
+
+A lease can still be lost while its worker lives (e.g. its heartbeat could not reach
+the database in time). The pipeline confirms the lease before every stage and is
+notified when the heartbeat finds it lost, so the job stops and leaves the tune to its
+new owner.
+
+Metrics:
+--------
+- lease.claimed / lease.reclaimed: leases taken, and those taken over after expiry.
+- lease.lost: leases another worker took over while this one still held them.
+- lease.held: leases this process currently holds.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional, Set
+from app.components.upload.tune_lease.tune_lease_repository import claim_tune_leases, release_tune_leases, renew_tune_leases
+from app.components.upload.tune_lease.tune_lease_utils import generate_worker_id
+from app.db.db import get_db_session_context
+from app.logger.logging_setup import logger
+from app.settings.env_settings import TUNE_LEASE_HEARTBEAT_SECONDS, TUNE_LEASE_SECONDS
+from app.utils.metrics_util import increment_counter, set_gauge
+
+WORKER_ID = generate_worker_id()
+
+_held_leases: Set[int] = set()
+_heartbeat_task: Optional[asyncio.Task] = None
+_lost_lease_listeners: Dict[int, Callable[[], None]] = {}
+
+
+async def acquire_tune_leases(tune_ids: Iterable[int]) -> Set[int]:
+    """
+    Leases the given tunes for this worker and returns the IDs it now owns.
+    """
+    tune_ids = list(tune_ids)
+    if not tune_ids:
+        return set()
+
+    now = datetime.now(timezone.utc)
+    with get_db_session_context() as db:
+        claimed, reclaimed = await claim_tune_leases(tune_ids, WORKER_ID, now + timedelta(seconds=TUNE_LEASE_SECONDS), now, db)
+
+    _held_leases.update(claimed)
+    _ensure_heartbeat()
+    increment_counter("lease.claimed", len(claimed))
+    if reclaimed:
+        increment_counter("lease.reclaimed", len(reclaimed))
+        logger.warning(f"Reclaimed {len(reclaimed)} tunes whose lease had expired: {reclaimed}")
+    if len(claimed) < len(tune_ids):
+        logger.debug(f"Skipped {len(tune_ids) - len(claimed)} tunes leased by another worker or already uploaded.")
+    set_gauge("lease.held", len(_held_leases))
+    return set(claimed)
+
+
+async def release_leases(tune_ids: Iterable[int]):
+    """
+    Gives up this worker's leases on the given tunes. Tunes it does not hold are ignored.
+    """
+    held = [tune_id for tune_id in tune_ids if tune_id in _held_leases]
+    if not held:
+        return
+
+    _held_leases.difference_update(held)
+    set_gauge("lease.held", len(_held_leases))
+    try:
+        with get_db_session_context() as db:
+            await release_tune_leases(held, WORKER_ID, db)
+    except Exception as e:
+        # The leases simply expire; the tunes are reclaimed after TUNE_LEASE_SECONDS.
+        logger.error(f"Failed to release leases {held}: {e}")
+
+
+def holds_lease(tune_id: int) -> bool:
+    return tune_id in _held_leases
+
+
+async def confirm_tune_lease(tune_id: int) -> bool:
+    """
+    Re-checks in the database that this worker still owns the lease of a tune, and
+    extends it. A lease found lost is dropped as the heartbeat would drop it.
+    """
+    if not holds_lease(tune_id):
+        return False
+    try:
+        with get_db_session_context() as db:
+            renewed = await renew_tune_leases([tune_id], WORKER_ID, datetime.now(timezone.utc) + timedelta(seconds=TUNE_LEASE_SECONDS), db)
+    except Exception as e:
+        # Undecided; the heartbeat keeps checking and reports a loss.
+        logger.error(f"Failed to confirm the lease on tune {tune_id}: {e}")
+        return True
+
+    if not renewed:
+        _drop_lost_leases({tune_id})
+        return False
+    return True
+
+
+def watch_tune_lease(tune_id: int, on_lost: Callable[[], None]):
+    """
+    Calls `on_lost` once if the lease of the tune is found lost, until `unwatch_tune_lease`.
+    """
+    _lost_lease_listeners[tune_id] = on_lost
+
+
+def unwatch_tune_lease(tune_id: int):
+    _lost_lease_listeners.pop(tune_id, None)
+
+
+async def stop_lease_heartbeat():
+    global _heartbeat_task
+    if _heartbeat_task is None:
+        return
+    _heartbeat_task.cancel()
+    try:
+        await _heartbeat_task
+    except asyncio.CancelledError:
+        pass
+    _heartbeat_task = None
+
+
+def _ensure_heartbeat():
+    global _heartbeat_task
+    if _heartbeat_task is None or _heartbeat_task.done():
+        _heartbeat_task = asyncio.create_task(_run_heartbeat())
+
+
+async def _run_heartbeat():
+    while True:
+        await asyncio.sleep(TUNE_LEASE_HEARTBEAT_SECONDS)
+        if _held_leases:
+            await _renew_held_leases()
+
+
+async def _renew_held_leases():
+    held = list(_held_leases)
+    try:
+        with get_db_session_context() as db:
+            renewed = await renew_tune_leases(held, WORKER_ID, datetime.now(timezone.utc) + timedelta(seconds=TUNE_LEASE_SECONDS), db)
+    except Exception as e:
+        logger.error(f"Lease heartbeat failed: {e}")
+        return
+
+    lost = set(held) - set(renewed)
+    if lost:
+        _drop_lost_leases(lost)
+    set_gauge("lease.held", len(_held_leases))
+
+
+def _drop_lost_leases(lost: Set[int]):
+    # Another worker reclaimed them after an expiry; it now owns the uploads.
+    _held_leases.difference_update(lost)
+    increment_counter("lease.lost", len(lost))
+    set_gauge("lease.held", len(_held_leases))
+    logger.warning(f"Lost the lease on tunes {sorted(lost)}.")
+    for tune_id in lost:
+        on_lost = _lost_lease_listeners.pop(tune_id, None)
+        if on_lost:
+            on_lost()
@@ -0,0 +1,25 @@
+import os
+import socket
+import uuid
+from sqlalchemy.orm import Session
+
+# Dialects that support `SELECT ... FOR UPDATE SKIP LOCKED`.
+SKIP_LOCKED_DIALECTS = ("postgresql", "mysql", "mariadb")
+
+
+class TuneLeaseLostError(Exception):
+    """
+    Raised when this worker no longer owns the lease of the tune it is processing.
+    """
+
+
+def supports_skip_locked(db: Session) -> bool:
+    return db.get_bind().dialect.name in SKIP_LOCKED_DIALECTS
+
+
+def generate_worker_id() -> str:
+    """
+    Identifies this process as a lease owner: host, PID and a random suffix, so a
+    restarted process never mistakes an old lease for its own.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
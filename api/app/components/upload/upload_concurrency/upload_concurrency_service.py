@@ -0,0 +1,191 @@
+"""
+Service Layer: Upload Concurrency
+=================================
+Adapts how many uploads run at once to what YouTube and the uplink sustain, in place
+of a fixed limit.
+
+Responsibilities:
+-----------------
+- Observe the upload traffic: the throughput of every completed chunk, per stream,
+  and the 429/5xx responses to upload requests.
+- Every `UPLOAD_CONCURRENCY_INTERVAL_SECONDS`, resize the upload stage of the pipeline
+  by additive increase, multiplicative decrease (AIMD): one more upload while every
+  slot is busy, tunes are waiting and per-stream throughput holds; a cut by
+  `UPLOAD_CONCURRENCY_DECREASE_FACTOR` after throttling or once per-stream throughput
+  collapses against its recent peak, i.e. when more streams only split the same uplink.
+- Stay between `UPLOAD_CONCURRENCY_MIN` and the upload workers, which the runtime
+  configuration turns into this controller's ceiling.
+
+As with any resize, running uploads are never interrupted by a cut.
+
+Metrics:
+--------
+- upload_concurrency.limit: uploads the stage currently runs at once.
+- upload_concurrency.increases: additive increases.
+- upload_concurrency.decreases (reason): multiplicative cuts, by what caused them.
+- upload_concurrency.throttled (operation): 429/5xx responses to upload requests.
+- upload_concurrency.stream_throughput_bps: per-stream throughput of the last interval.
+- upload_concurrency.peak_throughput_bps: the decaying peak it is compared with.
+"""
+import asyncio
+import traceback
+from typing import Callable, Optional, Tuple
+from app.components.upload.upload_concurrency.upload_concurrency_utils import (
+    THROUGHPUT_PEAK_DECAY,
+    UploadTrafficWindow,
+    get_next_concurrency_limit
+)
+from app.components.upload.upload_pipeline.upload_pipeline_service import upload_pipeline
+from app.components.upload.upload_pipeline.upload_pipeline_utils import STAGE_UPLOAD
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    PIPELINE_UPLOAD_WORKERS,
+    UPLOAD_CONCURRENCY_ADAPTIVE,
+    UPLOAD_CONCURRENCY_INITIAL,
+    UPLOAD_CONCURRENCY_INTERVAL_SECONDS,
+    UPLOAD_CONCURRENCY_MIN
+)
+from app.utils.metrics_util import increment_counter, set_gauge
+
+
+class UploadConcurrencyController:
+    """
+    AIMD controller of one limit. `apply` sets the limit, `get_load` returns the
+    running and waiting uploads it governs.
+    """
+    def __init__(
+        self,
+        apply: Callable[[int], None],
+        get_load: Callable[[], Tuple[int, int]],
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self._apply = apply
+        self._get_load = get_load
+        self._window = UploadTrafficWindow()
+        self._peak_throughput: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record_transfer(self, nbytes: int, seconds: float):
+        """
+        Records a chunk one stream sent in `seconds`.
+        """
+        if not self.enabled:
+            return
+        self._window.bytes += nbytes
+        self._window.stream_seconds += seconds
+
+    def record_throttle(self, operation: str, status_code: int):
+        """
+        Records a 429/5xx response to an upload request; the next adjustment cuts the limit.
+        """
+        increment_counter("upload_concurrency.throttled", operation=operation)
+        if not self.enabled:
+            return
+        self._window.throttled += 1
+        logger.debug(f"Upload concurrency: YouTube answered {operation} with {status_code}.")
+
+    def set_max_limit(self, max_limit: int):
+        """
+        Changes the ceiling of the limit, lowering the limit right away if it is above it.
+        """
+        self.max_limit = max(self.min_limit, max_limit)
+        if self.limit > self.max_limit:
+            self._set_limit(self.max_limit)
+        logger.info(f"Upload concurrency: adapts between {self.min_limit} and {self.max_limit} upload(s).")
+
+    def adjust(self):
+        """
+        Closes the current observation window and applies the limit it calls for.
+        """
+        window, self._window = self._window, UploadTrafficWindow()
+        running, waiting = self._get_load()
+        saturated = running >= self.limit and waiting > 0
+        limit, reason = get_next_concurrency_limit(
+            self.limit, window, self._peak_throughput, saturated, self.min_limit, self.max_limit
+        )
+
+        throughput = window.stream_throughput()
+        if throughput is not None:
+            set_gauge("upload_concurrency.stream_throughput_bps", round(throughput))
+        if self._peak_throughput is not None:
+            self._peak_throughput *= THROUGHPUT_PEAK_DECAY
+        if throughput is not None and (self._peak_throughput is None or throughput > self._peak_throughput):
+            self._peak_throughput = throughput
+        if self._peak_throughput is not None:
+            set_gauge("upload_concurrency.peak_throughput_bps", round(self._peak_throughput))
+
+        if limit == self.limit:
+            return
+        if reason is not None:
+            increment_counter("upload_concurrency.decreases", reason=reason)
+            logger.info(
+                f"Upload concurrency: cutting to {limit} upload(s) ({reason}; {window.throttled} throttled response(s), "
+                f"{_format_throughput(throughput)} per stream against a peak of {_format_throughput(self._peak_throughput)})."
+            )
+        elif limit > self.limit:
+            increment_counter("upload_concurrency.increases")
+            logger.debug(f"Upload concurrency: raising to {limit} upload(s) ({_format_throughput(throughput)} per stream).")
+        self._set_limit(limit)
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._set_limit(self.limit)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(UPLOAD_CONCURRENCY_INTERVAL_SECONDS)
+            try:
+                self.adjust()
+            except Exception as e:
+                # The limit in force stays until the next adjustment.
+                logger.error(f"Upload concurrency: adjustment failed: {e}")
+                logger.debug(traceback.format_exc())
+
+    def _set_limit(self, limit: int):
+        self.limit = limit
+        self._apply(limit)
+        set_gauge("upload_concurrency.limit", limit)
+
+
+def _format_throughput(bytes_per_second: Optional[float]) -> str:
+    return "n/a" if bytes_per_second is None else f"{bytes_per_second / 1024:.0f} KiB/s"
+
+
+def _create_upload_concurrency_controller() -> UploadConcurrencyController:
+    if UPLOAD_CONCURRENCY_ADAPTIVE:
+        logger.debug(
+            f"Upload concurrency: adaptive, starting at {UPLOAD_CONCURRENCY_INITIAL} between "
+            f"{UPLOAD_CONCURRENCY_MIN} and {PIPELINE_UPLOAD_WORKERS} upload(s)."
+        )
+    return UploadConcurrencyController(
+        lambda limit: upload_pipeline.resize_stage(STAGE_UPLOAD, limit),
+        lambda: upload_pipeline.get_stage_load(STAGE_UPLOAD),
+        UPLOAD_CONCURRENCY_INITIAL,
+        UPLOAD_CONCURRENCY_MIN,
+        PIPELINE_UPLOAD_WORKERS,
+        enabled=UPLOAD_CONCURRENCY_ADAPTIVE
+    )
+
+
+# Governs the upload stage of this process's pipeline.
+upload_concurrency_controller = _create_upload_concurrency_controller()
@@ -0,0 +1,70 @@
+import math
+from typing import Optional, Tuple
+from app.settings.env_settings import UPLOAD_CONCURRENCY_COLLAPSE_RATIO, UPLOAD_CONCURRENCY_DECREASE_FACTOR
+
+# Why the upload concurrency was cut.
+DECREASE_THROTTLED = "throttled"
+DECREASE_THROUGHPUT_COLLAPSE = "throughput_collapse"
+
+# Per-stream throughput still counts as holding at this share of its recent peak.
+THROUGHPUT_HOLD_RATIO = 0.8
+# Share of the peak per-stream throughput kept each interval, so a peak measured on
+# a faster uplink or an idle network stops being the reference after a few minutes.
+THROUGHPUT_PEAK_DECAY = 0.9
+
+
+class UploadTrafficWindow:
+    """
+    Upload traffic observed during one adjustment interval: bytes of completed
+    chunks, the time their streams spent sending them, and throttling responses.
+    """
+    def __init__(self):
+        self.bytes = 0
+        self.stream_seconds = 0.0
+        self.throttled = 0
+
+    def stream_throughput(self) -> Optional[float]:
+        """
+        Bytes per second a single stream moved, or None if no chunk completed.
+        """
+        if self.stream_seconds <= 0:
+            return None
+        return self.bytes / self.stream_seconds
+
+
+def is_throttling_status(status_code: int) -> bool:
+    """
+    Whether YouTube answered that it is overloaded or rate limiting: 429 or any 5xx.
+    """
+    return status_code == 429 or status_code >= 500
+
+
+def get_next_concurrency_limit(
+    limit: int,
+    window: UploadTrafficWindow,
+    peak_throughput: Optional[float],
+    saturated: bool,
+    min_limit: int,
+    max_limit: int
+) -> Tuple[int, Optional[str]]:
+    """
+    Additive increase, multiplicative decrease. The limit is cut after throttling or
+    when per-stream throughput collapsed against its recent peak; it grows by one when
+    every slot is in use, tunes are waiting and per-stream throughput holds.
+
+    Returns:
+    --------
+    Tuple[int, Optional[str]]
+        The new limit and, if it was cut, the reason.
+    """
+    throughput = window.stream_throughput()
+    decreased = max(min_limit, math.floor(limit * UPLOAD_CONCURRENCY_DECREASE_FACTOR))
+    if window.throttled:
+        return decreased, DECREASE_THROTTLED
+    if throughput is not None and peak_throughput and throughput < peak_throughput * UPLOAD_CONCURRENCY_COLLAPSE_RATIO:
+        return decreased, DECREASE_THROUGHPUT_COLLAPSE
+
+    holds = throughput is not None and (not peak_throughput or throughput >= peak_throughput * THROUGHPUT_HOLD_RATIO)
+    if saturated and holds:
+        return min(max_limit, limit + 1), None
+    return min(max(limit, min_limit), max_limit), None
@@ -0,0 +1,294 @@
+"""
+Service Layer: Upload Dispatcher
+================================
+Fair-share dispatcher guarding one stage of the upload pipeline. Every tune waits
+here for a slot before running the stage, whether it comes from the scheduler or
+from an instant upload.
+
+Responsibilities:
+-----------------
+- Bound the number of tunes in the stage across all users (global limit).
+- Bound the number in the stage for any single user (per-user cap).
+- Keep interactive work ahead of bulk work with priority lanes (instant, scheduled,
+  pre-render, preview), picked by weight or by strict priority.
+- Share each lane fairly between users with waiting tunes, so one user's large
+  backlog does not hold back everyone else's uploads.
+
+Both levels are deficit round robin: each lane, and within it each user with waiting
+tunes, is visited in turn and earns credit equal to its weight; every dispatched tune
+costs one credit. With a user weight of 1 this is plain round robin, one tune per
+user per turn; a user weighted 2 gets two tunes per turn, one weighted 0.5 one tune
+every other turn. In strict mode the highest lane with a dispatchable tune always wins.
+
+A running tune is never preempted. Since every stage has its own dispatcher, a tune
+queues again at each stage boundary, where higher lanes go first. Both limits can be
+resized at runtime: a larger limit dispatches waiting tunes at once, a smaller one lets
+running tunes finish and holds new ones back until the stage is under it.
+
+Metrics (labelled with the stage):
+----------------------------------
+- dispatcher.running: tunes in the stage.
+- dispatcher.global_limit: tunes the stage runs at once, once resized.
+- dispatcher.waiting (lane): tunes waiting for a slot.
+- dispatcher.users_waiting: users with at least one waiting tune.
+- dispatcher.dispatched (lane): tunes let into the stage.
+- dispatcher.wait_seconds (lane): total time tunes waited for a slot.
+"""
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, TypeVar
+from app.components.upload.upload_dispatcher.upload_dispatcher_utils import (
+    DEFAULT_LANE_WEIGHTS,
+    DISPATCH_LANES,
+    LANE_MODE_STRICT,
+    LANE_MODE_WEIGHTED,
+    LANE_SCHEDULED,
+    validate_lane_mode
+)
+from app.utils.metrics_util import increment_counter, set_gauge
+
+T = TypeVar("T")
+
+# Credit a tune costs; weights are expressed in tunes per turn.
+JOB_COST = 1.0
+
+
+class _Lane:
+    """
+    Tunes waiting in one lane, served deficit round robin across users.
+    """
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        # Lane-level credit, only used in weighted mode.
+        self.deficit = 0.0
+        self._waiting: Dict[str, Deque[Tuple[asyncio.Future, float]]] = defaultdict(deque)
+        self._turns: Deque[str] = deque()
+        self._deficits: Dict[str, float] = defaultdict(float)
+
+    def add(self, user_id: str, slot: asyncio.Future):
+        if not self._waiting[user_id]:
+            self._turns.append(user_id)
+        self._waiting[user_id].append((slot, time.monotonic()))
+
+    def remove(self, user_id: str, slot: asyncio.Future):
+        waiting = self._waiting.get(user_id)
+        if waiting is None:
+            return
+        for entry in waiting:
+            if entry[0] is slot:
+                waiting.remove(entry)
+                break
+        if not waiting:
+            self._forget(user_id)
+
+    def has_waiting(self) -> bool:
+        return bool(self._turns)
+
+    def has_dispatchable(self, is_capped: Callable[[str], bool]) -> bool:
+        return any(not is_capped(user_id) for user_id in self._turns)
+
+    def waiting_count(self) -> int:
+        return sum(len(waiting) for waiting in self._waiting.values())
+
+    def waiting_users(self) -> Set[str]:
+        return set(self._turns)
+
+    def pick(self, is_capped: Callable[[str], bool], user_weights: Dict[str, float]) -> Optional[Tuple[str, asyncio.Future, float]]:
+        """
+        Takes the next waiting tune, or returns None if every waiting user is at its cap.
+        """
+        # Users visited in a row that could not take a slot because of their cap.
+        capped_visits = 0
+        while self._turns and capped_visits < len(self._turns):
+            user_id = self._turns[0]
+            waiting = self._waiting[user_id]
+            # Callers cancelled while waiting leave their slot behind until they withdraw it.
+            while waiting and waiting[0][0].done():
+                waiting.popleft()
+            if not waiting:
+                self._forget(user_id)
+                continue
+
+            if is_capped(user_id):
+                self._turns.rotate(-1)
+                capped_visits += 1
+                continue
+
+            if self._deficits[user_id] < JOB_COST:
+                capped_visits = 0
+                self._deficits[user_id] += user_weights.get(user_id, 1.0)
+                if self._deficits[user_id] < JOB_COST:
+                    self._turns.rotate(-1)
+                    continue
+
+            slot, queued_at = waiting.popleft()
+            self._deficits[user_id] -= JOB_COST
+            if not waiting:
+                self._forget(user_id)
+            elif self._deficits[user_id] < JOB_COST:
+                self._turns.rotate(-1)
+            return user_id, slot, queued_at
+        return None
+
+    def _forget(self, user_id: str):
+        # Credit is not banked while a user has nothing waiting.
+        if user_id in self._turns:
+            self._turns.remove(user_id)
+        self._waiting.pop(user_id, None)
+        self._deficits.pop(user_id, None)
+
+
+class _Grant:
+    """
+    A caller's claim on the dispatcher; `held` while it occupies a slot.
+    """
+    def __init__(self, user_id: str, lane: _Lane):
+        self.user_id = user_id
+        self.lane = lane
+        self.held = False
+
+
+class UploadDispatcher:
+    def __init__(
+        self,
+        name: str,
+        global_limit: int,
+        user_limit: int,
+        weights: Optional[Dict[str, float]] = None,
+        lane_weights: Optional[Dict[str, float]] = None,
+        lane_mode: str = LANE_MODE_WEIGHTED
+    ):
+        self.name = name
+        self.global_limit = max(1, global_limit)
+        self.user_limit = max(1, user_limit)
+        self.weights = weights or {}
+        self.lane_mode = validate_lane_mode(lane_mode)
+        lane_weights = lane_weights or DEFAULT_LANE_WEIGHTS
+        # Highest priority first.
+        self._lanes: List[_Lane] = [_Lane(lane_name, lane_weights.get(lane_name, 1.0)) for lane_name in DISPATCH_LANES]
+        self._lanes_by_name = {lane.name: lane for lane in self._lanes}
+        self._lane_turns: Deque[_Lane] = deque(self._lanes)
+        self._running: Dict[str, int] = defaultdict(int)
+        self._running_total = 0
+
+    def resize(self, global_limit: Optional[int] = None, user_limit: Optional[int] = None):
+        """
+        Changes the global and/or per-user limit without touching running tunes.
+        """
+        if global_limit is not None:
+            self.global_limit = max(1, global_limit)
+        if user_limit is not None:
+            self.user_limit = max(1, user_limit)
+        set_gauge("dispatcher.global_limit", self.global_limit, stage=self.name)
+        self._dispatch()
+
+    def get_load(self) -> Tuple[int, int]:
+        """
+        Returns the number of tunes in the stage and the number waiting for a slot.
+        """
+        return self._running_total, sum(lane.waiting_count() for lane in self._lanes)
+
+    async def run(self, user_id: str, func: Callable[[], Awaitable[T]], lane: str = LANE_SCHEDULED) -> T:
+        """
+        Waits for a slot granted to `user_id` in `lane`, then awaits `func()` in it.
+
+        Raises:
+        -------
+        ValueError
+            If `lane` is not one of `DISPATCH_LANES`.
+        """
+        if lane not in self._lanes_by_name:
+            raise ValueError(f"Unknown dispatch lane '{lane}'.")
+        grant = _Grant(user_id, self._lanes_by_name[lane])
+        await self._acquire(grant)
+
+        try:
+            return await func()
+        finally:
+            if grant.held:
+                self._release(grant)
+
+    async def _acquire(self, grant: _Grant):
+        slot = asyncio.get_running_loop().create_future()
+        grant.lane.add(grant.user_id, slot)
+        self._dispatch()
+
+        try:
+            await slot
+        except asyncio.CancelledError:
+            self._withdraw(grant, slot)
+            raise
+        grant.held = True
+
+    def _release(self, grant: _Grant):
+        grant.held = False
+        self._running[grant.user_id] -= 1
+        self._running_total -= 1
+        self._dispatch()
+
+    def _withdraw(self, grant: _Grant, slot: asyncio.Future):
+        grant.lane.remove(grant.user_id, slot)
+        if slot.done() and not slot.cancelled():
+            # Granted just before the cancellation arrived; hand the slot back.
+            self._running[grant.user_id] -= 1
+            self._running_total -= 1
+        self._dispatch()
+
+    def _is_capped(self, user_id: str) -> bool:
+        return self._running[user_id] >= self.user_limit
+
+    def _dispatch(self):
+        # Lanes whose waiting users are all at their cap for now.
+        blocked: Set[str] = set()
+        while self._running_total < self.global_limit:
+            lane = self._next_lane(blocked)
+            if lane is None:
+                break
+
+            picked = lane.pick(self._is_capped, self.weights)
+            if picked is None:
+                blocked.add(lane.name)
+                continue
+
+            user_id, slot, queued_at = picked
+            self._running[user_id] += 1
+            self._running_total += 1
+            increment_counter("dispatcher.dispatched", stage=self.name, lane=lane.name)
+            increment_counter("dispatcher.wait_seconds", time.monotonic() - queued_at, stage=self.name, lane=lane.name)
+            slot.set_result(None)
+
+            if self.lane_mode == LANE_MODE_WEIGHTED:
+                lane.deficit -= JOB_COST
+                if lane.deficit < JOB_COST:
+                    self._lane_turns.rotate(-1)
+        self._report()
+
+    def _next_lane(self, blocked: Set[str]) -> Optional[_Lane]:
+        candidates = [lane for lane in self._lanes if lane.has_waiting() and lane.name not in blocked]
+        if not candidates:
+            return None
+        if self.lane_mode == LANE_MODE_STRICT:
+            return candidates[0]
+
+        while True:
+            lane = self._lane_turns[0]
+            if lane not in candidates:
+                if not lane.has_waiting():
+                    # Like users, lanes do not bank credit while idle.
+                    lane.deficit = 0.0
+                self._lane_turns.rotate(-1)
+                continue
+            if lane.deficit < JOB_COST:
+                lane.deficit += lane.weight
+                if lane.deficit < JOB_COST:
+                    self._lane_turns.rotate(-1)
+                    continue
+            return lane
+
+    def _report(self):
+        set_gauge("dispatcher.running", self._running_total, stage=self.name)
+        for lane in self._lanes:
+            set_gauge("dispatcher.waiting", lane.waiting_count(), stage=self.name, lane=lane.name)
+        set_gauge("dispatcher.users_waiting", len(set().union(*(lane.waiting_users() for lane in self._lanes))), stage=self.name)
@@ -0,0 +1,85 @@
+import math
+from typing import Dict
+from app.logger.logging_setup import logger
+
+# Weights below this would take too many rounds to earn a single dispatch.
+MIN_USER_WEIGHT = 0.01
+MIN_LANE_WEIGHT = 0.01
+
+# Dispatch lanes, highest priority first.
+LANE_INSTANT = "instant"
+LANE_SCHEDULED = "scheduled"
+LANE_PRE_RENDER = "pre_render"
+LANE_PREVIEW = "preview"
+DISPATCH_LANES = (LANE_INSTANT, LANE_SCHEDULED, LANE_PRE_RENDER, LANE_PREVIEW)
+
+DEFAULT_LANE_WEIGHTS = {LANE_INSTANT: 8.0, LANE_SCHEDULED: 4.0, LANE_PRE_RENDER: 2.0, LANE_PREVIEW: 1.0}
+
+# How the next lane is picked: by weight, or always the highest lane with work.
+LANE_MODE_WEIGHTED = "weighted"
+LANE_MODE_STRICT = "strict"
+LANE_MODES = (LANE_MODE_WEIGHTED, LANE_MODE_STRICT)
+
+
+def parse_user_weights(weights: str) -> Dict[str, float]:
+    """
+    Parses per-user dispatch weights.
+
+    Format: comma separated `<user id>=<weight>` entries, e.g. `3f2a...=2,9c1b...=0.5`.
+    Users without an entry weigh 1.
+
+    Raises:
+    -------
+    ValueError
+        If an entry is malformed or its weight is not a finite positive number.
+    """
+    return _parse_weights(weights, "user id", MIN_USER_WEIGHT)
+
+
+def parse_lane_weights(weights: str) -> Dict[str, float]:
+    """
+    Parses dispatch lane weights on top of `DEFAULT_LANE_WEIGHTS`.
+
+    Format: comma separated `<lane>=<weight>` entries, e.g. `instant=10,preview=0.5`.
+
+    Raises:
+    -------
+    ValueError
+        If an entry is malformed, names an unknown lane or its weight is too small.
+    """
+    parsed = dict(DEFAULT_LANE_WEIGHTS)
+    for lane, weight in _parse_weights(weights, "lane", MIN_LANE_WEIGHT).items():
+        if lane not in DISPATCH_LANES:
+            raise ValueError(f"Unknown dispatch lane '{lane}'. Expected one of: {', '.join(DISPATCH_LANES)}.")
+        parsed[lane] = weight
+    return parsed
+
+
+def validate_lane_mode(mode: str) -> str:
+    """
+    Raises:
+    -------
+    ValueError
+        If `mode` is not one of `LANE_MODES`.
+    """
+    if mode not in LANE_MODES:
+        raise ValueError(f"Unknown dispatch lane mode '{mode}'. Expected one of: {', '.join(LANE_MODES)}.")
+    return mode
+
+
+def _parse_weights(weights: str, key_name: str, min_weight: float) -> Dict[str, float]:
+    parsed = {}
+    for entry in (part.strip() for part in (weights or "").split(",")):
+        if not entry:
+            continue
+        try:
+            key, weight = entry.rsplit("=", 1)
+            key = key.strip()
+            parsed[key] = float(weight)
+        except ValueError as e:
+            logger.error(f"Invalid dispatch weight entry '{entry}': {e}")
+            raise ValueError(f"Invalid dispatch weight entry '{entry}'. Expected <{key_name}>=<weight>.")
+        # NaN passes the minimum check and infinity never runs out, so either one would starve the rest.
+        if not math.isfinite(parsed[key]) or parsed[key] < min_weight:
+            raise ValueError(f"Dispatch weight of '{key}' must be a finite number of at least {min_weight}.")
+    return parsed
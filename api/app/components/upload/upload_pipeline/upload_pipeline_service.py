@@ -0,0 +1,263 @@
+"""
+Service Layer: Upload Pipeline
+==============================
+Staged pipeline every tune goes through: probe → render → upload → finalize.
+
+Responsibilities:
+-----------------
+- Give each stage its own pool of workers, so renders (CPU) and uploads (uplink) run
+  side by side: tune N+1 encodes while tune N uploads, and throughput approaches the
+  rate of the slower stage instead of the sum of both.
+- Bound the tunes waiting between two stages (`PIPELINE_QUEUE_SIZE`). A tune that
+  finished a stage keeps its worker until the next stage's queue has room, so a
+  slow stage throttles the ones before it (backpressure) instead of piling up
+  rendered videos.
+- Queue tunes for each stage through that stage's upload dispatcher, so lanes and
+  per-user fair share apply at every stage boundary.
+
+A job decides which stages it needs (a resumed upload skips rendering) and may stop
+at any stage, e.g. when its quota does not fit today.
+
+On shutdown, `drain` stops intake and interrupts jobs waiting between stages right
+away. Jobs in a stage get a deadline to finish it; the rest are cancelled. Every
+interrupted job is handed back through `PipelineJob.interrupt`, so it can undo what it
+holds and later pick up from its furthest durable stage.
+
+Stage worker counts and the per-user cap can be changed while jobs run (see the
+runtime configuration); running jobs are never interrupted by a resize.
+
+Metrics:
+--------
+- pipeline.queued (stage): tunes that finished the previous stage and wait for this one.
+- pipeline.backpressure_seconds (stage): time workers were held waiting for room in
+  this stage's queue.
+- pipeline.interrupted (stage): jobs a drain interrupted, by the stage they were in or
+  waiting for.
+- The dispatcher metrics of each stage, labelled with the stage.
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Protocol, Tuple
+from app.components.upload.upload_dispatcher.upload_dispatcher_service import UploadDispatcher
+from app.components.upload.upload_dispatcher.upload_dispatcher_utils import LANE_SCHEDULED, parse_lane_weights, parse_user_weights
+from app.components.upload.upload_pipeline.upload_pipeline_utils import (
+    PIPELINE_STAGES,
+    STAGE_FINALIZE,
+    STAGE_PROBE,
+    STAGE_RENDER,
+    STAGE_UPLOAD
+)
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    DISPATCH_LANE_MODE,
+    DISPATCH_LANE_WEIGHTS,
+    DISPATCH_USER_CONCURRENCY,
+    DISPATCH_USER_WEIGHTS,
+    PIPELINE_FINALIZE_WORKERS,
+    PIPELINE_PROBE_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_RENDER_WORKERS,
+    PIPELINE_UPLOAD_WORKERS
+)
+from app.utils.metrics_util import increment_counter, set_gauge
+
+
+class PipelineJob(Protocol):
+    def needs_stage(self, stage: str) -> bool:
+        """
+        Whether the job goes through `stage` at all; asked right before entering it.
+        """
+        ...
+
+    async def run_stage(self, stage: str) -> bool:
+        """
+        Runs the job's work for `stage`. Returns False to leave the pipeline early.
+        """
+        ...
+
+    async def interrupt(self):
+        """
+        Called once a drain stopped the job, in or between stages. Any stage it was
+        running has been cancelled.
+        """
+        ...
+
+
+class _Passage:
+    """
+    A job's way through the pipeline: the stage it is headed for, and the place it
+    holds in that stage's queue.
+    """
+    def __init__(self, stage: Optional[str]):
+        self.stage = stage
+        self.queue_place: Optional[str] = None
+        # Running the stage, rather than waiting for it.
+        self.running = False
+        self.interrupted = False
+
+
+class UploadPipeline:
+    def __init__(self, stages: Dict[str, UploadDispatcher], queue_size: int):
+        # In pipeline order.
+        self._stages = stages
+        self._queue_room = {stage: asyncio.Semaphore(max(1, queue_size)) for stage in stages}
+        self._queued = {stage: 0 for stage in stages}
+        self._passages: Dict[asyncio.Task, _Passage] = {}
+        self._draining = False
+
+    async def process(self, user_id: str, job: PipelineJob, lane: str = LANE_SCHEDULED) -> bool:
+        """
+        Runs `job` through every stage it needs, in order, each in a worker of that stage.
+
+        Returns:
+        --------
+        bool
+            True if the job went through all its stages, False if one or a drain stopped it.
+        """
+        if self._draining:
+            return False
+
+        task = asyncio.current_task()
+        passage = _Passage(self._next_stage(job, None))
+        self._passages[task] = passage
+        try:
+            completed = await self._pass_stages(user_id, job, passage, lane)
+        except asyncio.CancelledError:
+            if not self._draining:
+                raise
+            # Cancelled by the drain, which waits for the interruption below.
+            passage.interrupted = True
+            completed = False
+        finally:
+            self._passages.pop(task, None)
+            self._leave_queue(passage)
+
+        if passage.interrupted:
+            increment_counter("pipeline.interrupted", stage=passage.stage)
+            await job.interrupt()
+        return completed
+
+    def get_limits(self) -> Dict[str, int]:
+        """
+        Returns the worker count of every stage.
+        """
+        return {name: stage.global_limit for name, stage in self._stages.items()}
+
+    def get_stage_load(self, stage: str) -> Tuple[int, int]:
+        """
+        Returns the number of jobs running `stage` and the number waiting for one of its workers.
+        """
+        return self._stages[stage].get_load()
+
+    def resize_stage(self, stage: str, workers: int):
+        """
+        Changes the number of workers of `stage`. Running jobs keep their worker; with
+        fewer workers, no new job enters the stage until enough of them have left.
+        """
+        self._stages[stage].resize(global_limit=workers)
+        logger.info(f"Upload pipeline: {stage} stage now runs {self._stages[stage].global_limit} worker(s).")
+
+    def set_user_limit(self, user_limit: int):
+        """
+        Changes how many of a single user's tunes each stage runs at once.
+        """
+        for stage in self._stages.values():
+            stage.resize(user_limit=user_limit)
+        logger.info(f"Upload pipeline: each stage now runs up to {max(1, user_limit)} tune(s) per user.")
+
+    async def drain(self, timeout: float):
+        """
+        Stops the pipeline for a shutdown. No new job is taken, jobs waiting for a stage
+        are interrupted at once, and jobs in a stage get `timeout` seconds to finish it
+        before they are cancelled. Returns once every job has been handed back.
+        """
+        self._draining = True
+        if not self._passages:
+            return
+
+        waiting = [task for task, passage in self._passages.items() if not passage.running]
+        running = [task for task, passage in self._passages.items() if passage.running]
+        logger.info(f"Upload pipeline: draining; {len(running)} running job(s) get {timeout:.0f}s, {len(waiting)} waiting job(s) stop now.")
+        for task in waiting:
+            task.cancel()
+
+        _, pending = await asyncio.wait(waiting + running, timeout=timeout)
+        if pending:
+            logger.warning(f"Upload pipeline: interrupting {len(pending)} job(s) still running after {timeout:.0f}s.")
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+        logger.info("Upload pipeline: drained.")
+
+    async def _pass_stages(self, user_id: str, job: PipelineJob, passage: _Passage, lane: str) -> bool:
+        while passage.stage is not None:
+            stage = self._stages[passage.stage]
+            if not await stage.run(user_id, lambda: self._run_stage(job, passage), lane):
+                return False
+        return True
+
+    async def _run_stage(self, job: PipelineJob, passage: _Passage) -> bool:
+        stage = passage.stage
+        # A worker picked the job up, so its place in the queue is free for the next one.
+        self._leave_queue(passage)
+        passage.running = True
+        try:
+            if not await job.run_stage(stage):
+                return False
+        finally:
+            passage.running = False
+
+        passage.stage = self._next_stage(job, stage)
+        if passage.stage is not None:
+            if self._draining:
+                # Nothing new starts during a drain; the job continues here after the restart.
+                passage.interrupted = True
+                return False
+            # Keeps this stage's worker until the next queue has room.
+            await self._enter_queue(passage)
+        return True
+
+    def _next_stage(self, job: PipelineJob, after: Optional[str]) -> Optional[str]:
+        stages = list(self._stages)
+        remaining = stages if after is None else stages[stages.index(after) + 1:]
+        return next((stage for stage in remaining if job.needs_stage(stage)), None)
+
+    async def _enter_queue(self, passage: _Passage):
+        started_at = time.monotonic()
+        await self._queue_room[passage.stage].acquire()
+        passage.queue_place = passage.stage
+        self._queued[passage.stage] += 1
+        set_gauge("pipeline.queued", self._queued[passage.stage], stage=passage.stage)
+        increment_counter("pipeline.backpressure_seconds", time.monotonic() - started_at, stage=passage.stage)
+
+    def _leave_queue(self, passage: _Passage):
+        if passage.queue_place is None:
+            return
+        self._queue_room[passage.queue_place].release()
+        self._queued[passage.queue_place] -= 1
+        set_gauge("pipeline.queued", self._queued[passage.queue_place], stage=passage.queue_place)
+        passage.queue_place = None
+
+
+def _create_upload_pipeline() -> UploadPipeline:
+    weights = parse_user_weights(DISPATCH_USER_WEIGHTS)
+    lane_weights = parse_lane_weights(DISPATCH_LANE_WEIGHTS)
+    workers = {
+        STAGE_PROBE: PIPELINE_PROBE_WORKERS,
+        STAGE_RENDER: PIPELINE_RENDER_WORKERS,
+        STAGE_UPLOAD: PIPELINE_UPLOAD_WORKERS,
+        STAGE_FINALIZE: PIPELINE_FINALIZE_WORKERS,
+    }
+    logger.debug(
+        f"Upload pipeline: workers {workers}, {PIPELINE_QUEUE_SIZE} queued between stages, "
+        f"{DISPATCH_USER_CONCURRENCY} per user, {len(weights)} weighted user(s), {DISPATCH_LANE_MODE} lanes {lane_weights}."
+    )
+    stages = {
+        stage: UploadDispatcher(stage, workers[stage], DISPATCH_USER_CONCURRENCY, weights, lane_weights, DISPATCH_LANE_MODE)
+        for stage in PIPELINE_STAGES
+    }
+    return UploadPipeline(stages, PIPELINE_QUEUE_SIZE)
+
+
+# Shared by the scheduler and instant uploads in this process.
+upload_pipeline = _create_upload_pipeline()
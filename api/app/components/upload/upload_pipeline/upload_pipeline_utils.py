@@ -0,0 +1,6 @@
+# Pipeline stages, in the order a tune goes through them.
+STAGE_PROBE = "probe"
+STAGE_RENDER = "render"
+STAGE_UPLOAD = "upload"
+STAGE_FINALIZE = "finalize"
+PIPELINE_STAGES = (STAGE_PROBE, STAGE_RENDER, STAGE_UPLOAD, STAGE_FINALIZE)
@@ -1,58 +1,521 @@
 import asyncio
 import os
+import time
+from datetime import datetime
 from app.db.db import Tune, User
 from app.logger.logging_setup import logger
-from app.components.file_processing.file_processing_service import get_audio_path, get_image_path
-from app.components.ffmpeg.generate_mp4.generate_mp4_service import generate_video
-from app.components.tune_ops.tune_ops_service import mark_tune_as_executed_service
-from app.components.upload.tune2tube.tune2tube_service import upload_video
-from typing import List
-from app.settings.env_settings import YOUTUBE_ACCESS_CONCURRENCY_LIMIT
-from app.db.db import get_db_session
+from app.components.file_processing.file_processing_service import get_audio_path, get_image_path, get_mp4_path
+from app.components.ffmpeg.generate_mp4.generate_mp4_service import generate_video, kill_render, probe_audio_duration
+from app.components.quota.quota_service import mark_quota_exhausted, record_quota_usage, release_quota, try_reserve_quota
+from app.components.quota.quota_utils import QuotaDeferredError, get_next_quota_reset, is_quota_deferral, is_quota_exceeded_error
+from app.components.retry_policy.retry_policy_service import RetryBudget
+from app.components.tune_ops.tune_ops_service import (
+    complete_tune_upload_service,
+    defer_tune_service,
+    finish_upload_attempt_service,
+    has_in_doubt_upload_attempt_service,
+    record_tune_failure_service,
+    refund_tune_attempt_service,
+    resolve_in_doubt_upload_attempts_service,
+    save_tune_media_stats_service,
+    save_upload_checkpoint_service,
+    set_tune_status_service,
+    start_tune_processing_service,
+    start_upload_attempt_service
+)
+from app.components.tune_ops.tune_ops_utils import (
+    TUNE_STATUS_RENDERED,
+    TUNE_STATUS_RENDERING,
+    TUNE_STATUS_UPLOADING,
+    UPLOAD_ATTEMPT_FAILED,
+    UPLOAD_ATTEMPT_NOT_FOUND,
+    parse_tags_from_db
+)
+from app.components.upload.due_tune_queue.due_tune_queue_service import due_tune_queue
+from app.components.upload.tune_lease.tune_lease_service import (
+    WORKER_ID,
+    acquire_tune_leases,
+    confirm_tune_lease,
+    release_leases,
+    unwatch_tune_lease,
+    watch_tune_lease
+)
+from app.components.upload.tune_lease.tune_lease_utils import TuneLeaseLostError
+from app.components.upload.upload_dispatcher.upload_dispatcher_utils import LANE_SCHEDULED
+from app.components.upload.upload_pipeline.upload_pipeline_service import upload_pipeline
+from app.components.upload.upload_pipeline.upload_pipeline_utils import STAGE_FINALIZE, STAGE_PROBE, STAGE_RENDER, STAGE_UPLOAD
+from app.components.upload.upload_recovery.upload_recovery_utils import has_rendered_video
+from app.components.upload.tune2tube.tune2tube_service import (
+    RECONCILE_OPERATIONS,
+    build_idempotency_tag,
+    find_uploaded_video_by_token,
+    upload_video
+)
+from app.jobs.processing_status_job import wake_processing_status_poller
+from typing import Dict, List, Optional, Tuple
+from app.db.db import get_db_session_context
+from app.utils.executor_util import EXECUTOR_DB, EXECUTOR_FS, EXECUTOR_SUBPROCESS_WAIT, in_executor, run_blocking
 
-async def process_and_upload_tunes(tunes: List[Tune], user: User):
-    sem = asyncio.Semaphore(YOUTUBE_ACCESS_CONCURRENCY_LIMIT)
+async def process_and_upload_tunes(tunes: List[Tune], user: User, lane: str = LANE_SCHEDULED) -> Dict[int, bool]:
+    """
+    Runs the tunes through the upload pipeline and returns, per tune ID, whether the
+    tune was uploaded. A tune deferred to the quota reset, retried later or skipped
+    because it is claimed or leased elsewhere maps to False.
+    """
+    # Instant uploads and the scheduler may reach the same tune; only one of them processes it.
+    claimed = due_tune_queue.claim(tune.id for tune in tunes)
+    if len(claimed) < len(tunes):
+        logger.debug(f"Skipping {len(tunes) - len(claimed)} tunes that are already being processed.")
 
-    async def sem_task(tune):
-        async with sem:
-            await _process_and_upload_tune(tune, user)
+    claimed_tunes = [tune for tune in tunes if tune.id in claimed]
+    try:
+        # Every tune runs to the end even if another one fails; their claims are held until then.
+        results = await asyncio.gather(
+            *(_process_tune(tune, user, lane) for tune in claimed_tunes),
+            return_exceptions=True
+        )
+    finally:
+        due_tune_queue.release(claimed)
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        raise errors[0]
+
+    outcomes = {tune.id: False for tune in tunes}
+    outcomes.update((tune.id, uploaded) for tune, uploaded in zip(claimed_tunes, results))
+    return outcomes
+
+async def _process_tune(tune: Tune, user: User, lane: str) -> bool:
+    job = _TuneJob(tune, user)
+    try:
+        await upload_pipeline.process(user.id, job, lane)
+    finally:
+        if job.leased:
+            await release_leases([tune.id])
+    return job.uploaded
+
+class _TuneJob:
+    """
+    One tune on its way through the upload pipeline, and what a failure has to undo.
+    """
+    def __init__(self, tune: Tune, user: User):
+        self.tune = tune
+        self.user = user
+        self.leased = False
+        # Once processing started, failures are recorded on the tune.
+        self.started = False
+        # The video of an earlier attempt is complete, so rendering is skipped.
+        self.rendered = False
+        self.render_started = False
+        self.resume_session_uri: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.mp4_path: Optional[str] = None
+        # Tracks whether a resumable session must survive a failure.
+        self.session_uri: Optional[str] = None
+        self.quota_reserved = False
+        self.upload_started = False
+        self.attempt_id: Optional[int] = None
+        self.video_id: Optional[str] = None
+        self.lease_lost = False
+        # The tune is recorded as uploaded, by this attempt or by a reconciled earlier one.
+        self.uploaded = False
+
+    def needs_stage(self, stage: str) -> bool:
+        return not (stage == STAGE_RENDER and self.rendered)
+
+    async def run_stage(self, stage: str) -> bool:
+        # The probe takes the lease; every later stage first makes sure it still holds it.
+        if stage != STAGE_PROBE and not await confirm_tune_lease(self.tune.id):
+            return await _handle_lost_lease(self)
+
+        task = asyncio.current_task()
+        watch_tune_lease(self.tune.id, lambda: self._stop_for_lost_lease(task))
+        try:
+            return await _STAGE_HANDLERS[stage](self)
+        except asyncio.CancelledError:
+            if not self.lease_lost:
+                raise
+            task.uncancel()
+            return await _handle_lost_lease(self)
+        except TuneLeaseLostError:
+            return await _handle_lost_lease(self)
+        except Exception as e:
+            if self.started:
+                await _handle_tune_failure(self, e)
+            raise
+        finally:
+            unwatch_tune_lease(self.tune.id)
 
-    await asyncio.gather(*(sem_task(tune) for tune in tunes))
+    def _stop_for_lost_lease(self, task: asyncio.Task):
+        self.lease_lost = True
+        task.cancel()
+
+    async def interrupt(self):
+        if self.started:
+            await _handle_tune_interruption(self)
+
+async def _probe_tune(job: _TuneJob) -> bool:
+    tune, user = job.tune, job.user
+    # Leased only once a probe worker picks it up, so tunes waiting here stay free for other worker processes.
+    if not await acquire_tune_leases([tune.id]):
+        return False
+    job.leased = True
 
-async def _process_and_upload_tune(tune: Tune, user: User):
     logger.debug(f"Processing tune '{tune.video_title}' for user '{user.id}'")
-    mp4_path = None
+    # Picks up from the furthest durable stage of an interrupted attempt: its upload
+    # session, or else its rendered video. A session is only resumed with the video.
+    job.rendered = await run_blocking(EXECUTOR_FS, has_rendered_video, tune)
+    job.resume_session_uri = await _get_resumable_session_uri(tune) if job.rendered else None
+
+    # A stored session reports a completed upload itself; otherwise an in-doubt
+    # earlier attempt is looked up on YouTube before uploading the tune again.
+    if not job.resume_session_uri and await _reconcile_in_doubt_upload(tune, user):
+        job.uploaded = True
+        return False
+
+    # Resuming a session does not issue a new videos.insert, so it is already paid for.
+    if not job.resume_session_uri:
+        if not await _reserve_upload_quota(user):
+            # Stored, so the sweeps do not lease and probe it again before the reset.
+            await _defer_tune(tune, get_next_quota_reset(), "it does not fit today's YouTube quota.")
+            return False
+        job.quota_reserved = True
+
+    # A tune that moved on meanwhile (uploaded, dead-lettered) is left alone.
+    if not await _start_tune_processing(tune, TUNE_STATUS_UPLOADING if job.rendered else TUNE_STATUS_RENDERING):
+        if job.quota_reserved:
+            await _release_upload_quota(user)
+            job.quota_reserved = False
+        return False
+    job.started = True
+
+    if not job.rendered:
+        # A broken audio file fails here, before it takes a render worker.
+        job.duration_seconds = await run_blocking(EXECUTOR_SUBPROCESS_WAIT, probe_audio_duration, get_audio_path(tune))
+    return True
+
+async def _render_tune(job: _TuneJob) -> bool:
+    tune = job.tune
+    logger.debug("Generating video...")
+    job.render_started = True
+    render_started_at = time.monotonic()
     try:
-        audio_path = get_audio_path(tune)
-        img_path = get_image_path(tune)
+        job.mp4_path = await run_blocking(
+            EXECUTOR_SUBPROCESS_WAIT,
+            generate_video, get_audio_path(tune), get_image_path(tune), tune.base_dest_path, tune.video_title, job.duration_seconds
+        )
+    except asyncio.CancelledError:
+        # Cancelling leaves ffmpeg running in its thread; stop it too.
+        kill_render(get_mp4_path(tune.base_dest_path, tune.video_title))
+        raise
+    logger.info(f"Generated video: {job.mp4_path}")
+    render_seconds = time.monotonic() - render_started_at
+    video_size = await run_blocking(EXECUTOR_FS, os.path.getsize, job.mp4_path)
+    await _persist_media_stats(tune.id, job.duration_seconds, video_size, render_seconds)
+    await _set_tune_status(tune, TUNE_STATUS_RENDERED)
+    return True
 
-        logger.debug("Generating video...")
-        mp4_path = await asyncio.to_thread(generate_video, audio_path, img_path, tune.base_dest_path, tune.video_title)
-        logger.info(f"Generated video: {mp4_path}")
+async def _upload_tune(job: _TuneJob) -> bool:
+    tune, user = job.tune, job.user
+    if job.rendered:
+        job.mp4_path = get_mp4_path(tune.base_dest_path, tune.video_title)
+    else:
+        await _set_tune_status(tune, TUNE_STATUS_UPLOADING)
+    if job.resume_session_uri:
+        job.session_uri = job.resume_session_uri
+        logger.info(f"Resuming upload of '{tune.video_title}' from byte {tune.upload_bytes_committed or 0}")
 
-        logger.debug("Uploading to YouTube...")
-        await asyncio.to_thread(
-            upload_video,
+    async def on_checkpoint(session_uri: str, bytes_committed: int):
+        job.session_uri = session_uri
+        await _persist_upload_checkpoint(tune.id, session_uri, bytes_committed)
+
+    async def on_session_expired():
+        # The probe skipped the reservation for the resume; a new session is a new videos.insert.
+        if not await _reserve_upload_quota(user):
+            raise QuotaDeferredError(f"Tune '{tune.video_title}' needs a new upload session, which does not fit today's YouTube quota.")
+        job.quota_reserved = True
+
+    logger.debug("Uploading to YouTube...")
+    job.upload_started = True
+    job.attempt_id, idempotency_token = await _start_upload_attempt(tune)
+
+    job.video_id = await upload_video(
+        user.youtube_access_token,
+        user.youtube_refresh_token,
+        job.mp4_path,
+        tune.video_title,
+        tune.video_description,
+        tune.category,
+        tune.license,
+        tune.embeddable,
+        tune.privacy_status,
+        _get_upload_tags(tune, idempotency_token),
+        job.resume_session_uri,
+        on_checkpoint,
+        RetryBudget(),
+        on_session_expired
+    )
+
+    logger.info(f"Upload complete: '{tune.video_title}'")
+    return True
+
+async def _finalize_tune(job: _TuneJob) -> bool:
+    if not await _complete_tune_upload(job.tune, job.video_id, job.attempt_id):
+        raise TuneLeaseLostError(f"Tune {job.tune.id} is no longer leased by this worker.")
+    job.uploaded = True
+    wake_processing_status_poller()
+    return True
+
+_STAGE_HANDLERS = {
+    STAGE_PROBE: _probe_tune,
+    STAGE_RENDER: _render_tune,
+    STAGE_UPLOAD: _upload_tune,
+    STAGE_FINALIZE: _finalize_tune,
+}
+
+async def _handle_tune_failure(job: _TuneJob, error: Exception):
+    tune, user = job.tune, job.user
+    logger.error(f"Error processing tune '{tune.video_title}': {error}")
+    recorded = await _record_tune_failure(tune, error)
+    if job.attempt_id is not None:
+        await _record_failed_upload_attempt(job.attempt_id, error)
+    if job.quota_reserved and not job.upload_started:
+        await _release_upload_quota(user)
+    if is_quota_exceeded_error(error):
+        await _mark_upload_quota_exhausted(user)
+    if job.session_uri:
+        logger.debug(f"Keeping '{job.mp4_path}' so the upload can resume from its stored session.")
+    elif job.mp4_path and is_quota_deferral(error):
+        logger.debug(f"Keeping '{job.mp4_path}' so the upload can start after the quota reset without rendering again.")
+    elif job.mp4_path and recorded:
+        # Otherwise another worker may own the tune, and its video, by now.
+        await _remove_video(job.mp4_path)
+
+async def _handle_lost_lease(job: _TuneJob) -> bool:
+    """
+    Stops a tune whose lease another worker took over. The new owner carries on from
+    the tune's durable progress (its rendered video, upload session and in-progress
+    attempt), so nothing is recorded on the tune and its files are left alone; only
+    an unused quota reservation of this worker is handed back.
+    """
+    tune, user = job.tune, job.user
+    job.lease_lost = True
+    job.leased = False
+    logger.warning(f"Stopped processing tune '{tune.video_title}': its lease was lost to another worker.")
+    if job.quota_reserved and not job.upload_started:
+        await _release_upload_quota(user)
+        job.quota_reserved = False
+    return False
+
+async def _handle_tune_interruption(job: _TuneJob):
+    """
+    Hands back a tune a shutdown drain stopped, without counting it as a failure. Its
+    durable progress is kept for the next worker: the rendered video and, once the
+    upload started, the stored session and the attempt, which the resumed upload or
+    a reconciliation settles.
+    """
+    tune, user = job.tune, job.user
+    if job.video_id:
+        # Already on YouTube; only finalizing was left.
+        try:
+            await _finalize_tune(job)
+        except TuneLeaseLostError:
+            await _handle_lost_lease(job)
+        return
+
+    logger.info(f"Tune '{tune.video_title}' interrupted by shutdown; it resumes from its last completed stage.")
+    await _refund_tune_attempt(tune)
+    if job.quota_reserved and not job.upload_started:
+        await _release_upload_quota(user)
+    if job.render_started and not job.mp4_path:
+        await _remove_partial_video(get_mp4_path(tune.base_dest_path, tune.video_title))
+
+async def _reconcile_in_doubt_upload(tune: Tune, user: User) -> bool:
+    """
+    Looks for the video of an earlier attempt that may have reached YouTube without
+    its outcome being recorded, and completes the tune with it if found.
+
+    Returns True when the tune was completed and must not be uploaded again.
+    """
+    if not await _has_in_doubt_upload_attempt(tune):
+        return False
+
+    if not tune.upload_idempotency_token:
+        return False
+
+    logger.info(f"Reconciling in-doubt upload of '{tune.video_title}' before uploading it again.")
+    try:
+        video_id = await find_uploaded_video_by_token(
             user.youtube_access_token,
             user.youtube_refresh_token,
-            mp4_path,
-            tune.video_title,
-            tune.video_description,
-            tune.category,
-            tune.license,
-            tune.embeddable,
-            tune.privacy_status,
-            tune.tags
+            tune.upload_idempotency_token
         )
+    finally:
+        await _record_reconcile_quota_usage(user)
+
+    if video_id:
+        logger.info(f"Tune '{tune.video_title}' was already uploaded as {video_id}; skipping the upload.")
+        if not await _complete_tune_upload(tune, video_id):
+            raise TuneLeaseLostError(f"Tune {tune.id} is no longer leased by this worker.")
+        return True
+    await _resolve_in_doubt_upload_attempts(tune, UPLOAD_ATTEMPT_NOT_FOUND)
+    return False
+
+def _get_upload_tags(tune: Tune, idempotency_token: str) -> List[str]:
+    return parse_tags_from_db(tune.tags) + [build_idempotency_tag(idempotency_token)]
+
+@in_executor(EXECUTOR_DB)
+def _start_upload_attempt(tune: Tune) -> Tuple[int, str]:
+    with get_db_session_context() as db:
+        return start_upload_attempt_service(tune, db)
+
+@in_executor(EXECUTOR_DB)
+def _complete_tune_upload(tune: Tune, video_id: str, attempt_id: Optional[int] = None) -> bool:
+    with get_db_session_context() as db:
+        return complete_tune_upload_service(tune, video_id, db, attempt_id, WORKER_ID)
 
-        logger.info(f"Upload complete: '{tune.video_title}'")
-        
-        db = next(get_db_session())
+@in_executor(EXECUTOR_DB)
+def _has_in_doubt_upload_attempt(tune: Tune) -> bool:
+    with get_db_session_context() as db:
+        return has_in_doubt_upload_attempt_service(tune, db)
 
-        await mark_tune_as_executed_service(tune, db)
+@in_executor(EXECUTOR_DB)
+def _resolve_in_doubt_upload_attempts(tune: Tune, outcome: str):
+    with get_db_session_context() as db:
+        resolve_in_doubt_upload_attempts_service(tune, outcome, db)
+
+@in_executor(EXECUTOR_DB)
+def _record_failed_upload_attempt(attempt_id: int, error: Exception):
+    try:
+        with get_db_session_context() as db:
+            finish_upload_attempt_service(attempt_id, UPLOAD_ATTEMPT_FAILED, str(error), db)
+    except Exception as e:
+        # The attempt stays 'in_progress', which is still reconciled before the next upload.
+        logger.error(f"Failed to record the outcome of upload attempt {attempt_id}: {e}")
+
+@in_executor(EXECUTOR_DB)
+def _record_reconcile_quota_usage(user: User):
+    try:
+        with get_db_session_context() as db:
+            for operation in RECONCILE_OPERATIONS:
+                record_quota_usage(user.id, operation, db)
+    except Exception as e:
+        logger.error(f"Failed to record reconciliation quota usage for user {user.id}: {e}")
+
+@in_executor(EXECUTOR_FS)
+def _get_resumable_session_uri(tune: Tune) -> Optional[str]:
+    """
+    Returns the stored session URI if the upload can be resumed, i.e. the rendered
+    video from the interrupted attempt is still on the share.
+    """
+    if not tune.upload_session_uri:
+        return None
+
+    mp4_path = get_mp4_path(tune.base_dest_path, tune.video_title)
+    if not os.path.exists(mp4_path):
+        logger.warning(f"Upload session stored for '{tune.video_title}' but '{mp4_path}' is missing. Re-rendering.")
+        return None
+    return tune.upload_session_uri
+
+@in_executor(EXECUTOR_DB)
+def _persist_upload_checkpoint(tune_id: int, session_uri: str, bytes_committed: int):
+    try:
+        with get_db_session_context() as db:
+            save_upload_checkpoint_service(tune_id, session_uri, bytes_committed, db)
+    except Exception as e:
+        # A lost checkpoint only costs a restart from an older offset; never fail the upload for it.
+        logger.error(f"Failed to persist upload checkpoint for tune {tune_id}: {e}")
+
+@in_executor(EXECUTOR_DB)
+def _persist_media_stats(tune_id: int, duration_seconds: Optional[float], video_size: int, render_seconds: float):
+    try:
+        with get_db_session_context() as db:
+            save_tune_media_stats_service(tune_id, duration_seconds, video_size, render_seconds, db)
+    except Exception as e:
+        # Only the capacity planner misses them; never fail the tune for it.
+        logger.error(f"Failed to store media measurements for tune {tune_id}: {e}")
+
+@in_executor(EXECUTOR_DB)
+def _set_tune_status(tune: Tune, status: str) -> bool:
+    try:
+        with get_db_session_context() as db:
+            return set_tune_status_service(tune, status, db)
+    except Exception as e:
+        logger.error(f"Failed to move tune {tune.id} to '{status}': {e}")
+        return False
+
+@in_executor(EXECUTOR_DB)
+def _start_tune_processing(tune: Tune, status: str) -> bool:
+    try:
+        with get_db_session_context() as db:
+            return start_tune_processing_service(tune, status, db)
     except Exception as e:
-        logger.error(f"Error processing tune '{tune.video_title}': {e}")
-        if mp4_path and os.path.exists(mp4_path):
+        logger.error(f"Failed to start processing tune {tune.id}: {e}")
+        return False
+
+@in_executor(EXECUTOR_DB)
+def _refund_tune_attempt(tune: Tune):
+    try:
+        with get_db_session_context() as db:
+            refund_tune_attempt_service(tune, db)
+    except Exception as e:
+        logger.error(f"Failed to uncount the interrupted attempt of tune {tune.id}: {e}")
+
+@in_executor(EXECUTOR_FS)
+def _remove_video(mp4_path: str):
+    if os.path.exists(mp4_path):
+        os.remove(mp4_path)
+
+@in_executor(EXECUTOR_FS)
+def _remove_partial_video(mp4_path: str):
+    try:
+        if os.path.exists(mp4_path):
             os.remove(mp4_path)
-        raise
+    except OSError as e:
+        # Removed by the startup recovery pass otherwise.
+        logger.warning(f"Failed to remove partial video '{mp4_path}': {e}")
+
+@in_executor(EXECUTOR_DB)
+def _record_tune_failure(tune: Tune, error: Exception) -> bool:
+    # Running out of quota is not the tune's fault; it simply waits for the reset, and
+    # the attempt does not count toward its limit.
+    deferred = is_quota_deferral(error)
+    retry_at = get_next_quota_reset() if deferred else None
+    try:
+        with get_db_session_context() as db:
+            status = record_tune_failure_service(tune, str(error) or type(error).__name__, db, retry_at, WORKER_ID, count_attempt=not deferred)
+            return status is not None
+    except Exception as e:
+        # The tune stays in progress until its lease expires, then it is picked up again.
+        logger.error(f"Failed to record the failure of tune {tune.id}: {e}")
+        return False
 
+@in_executor(EXECUTOR_DB)
+def _defer_tune(tune: Tune, retry_at: datetime, reason: str):
+    try:
+        with get_db_session_context() as db:
+            defer_tune_service(tune, retry_at, reason, db, WORKER_ID)
+    except Exception as e:
+        # The tune is probed again by the next sweep, and deferred again if the quota is still short.
+        logger.error(f"Failed to defer tune {tune.id}: {e}")
+
+@in_executor(EXECUTOR_DB)
+def _reserve_upload_quota(user: User) -> bool:
+    with get_db_session_context() as db:
+        return try_reserve_quota(user.id, "videos.insert", db)
+
+@in_executor(EXECUTOR_DB)
+def _release_upload_quota(user: User):
+    try:
+        with get_db_session_context() as db:
+            release_quota(user.id, "videos.insert", db)
+    except Exception as e:
+        logger.error(f"Failed to release quota reservation for user {user.id}: {e}")
+
+@in_executor(EXECUTOR_DB)
+def _mark_upload_quota_exhausted(user: User):
+    try:
+        with get_db_session_context() as db:
+            mark_quota_exhausted(user.id, db)
+    except Exception as e:
+        logger.error(f"Failed to record exhausted quota for user {user.id}: {e}")
@@ -0,0 +1,34 @@
+"""
+Repository Layer: Upload Recovery
+=================================
+Finds the tunes a stopped worker left in the middle of the upload pipeline.
+
+Functions:
+----------
+- get_interrupted_tunes_page: The next page of mid-pipeline tunes no live worker holds.
+"""
+from datetime import datetime
+from typing import List
+from sqlalchemy.orm import Session
+from app.db.db import Tune
+from app.components.upload.upload_recovery.upload_recovery_utils import MID_PIPELINE_TUNE_STATUSES
+from app.utils.executor_util import EXECUTOR_DB, in_executor
+
+
+@in_executor(EXECUTOR_DB)
+def get_interrupted_tunes_page(after_id: int, limit: int, now: datetime, db: Session) -> List[Tune]:
+    """
+    Returns up to `limit` tunes with an ID above `after_id`, in ID order, that are
+    rendering, rendered or uploading while their lease is free or expired.
+    """
+    return (
+        db.query(Tune)
+        .filter(
+            Tune.id > after_id,
+            Tune.status.in_(MID_PIPELINE_TUNE_STATUSES),
+            Tune.lease_expires_at.is_(None) | (Tune.lease_expires_at < now)
+        )
+        .order_by(Tune.id)
+        .limit(limit)
+        .all()
+    )
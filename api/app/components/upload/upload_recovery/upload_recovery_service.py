@@ -0,0 +1,95 @@
+"""
+Service Layer: Upload Recovery
+==============================
+Startup pass over the tunes a stopped worker left in the middle of the upload
+pipeline, whether it was drained or crashed.
+
+Responsibilities:
+-----------------
+- Find the tunes that are rendering, rendered or uploading while no live worker
+  holds their lease.
+- Work out the furthest durable stage of each: a stored upload session or a fully
+  rendered video resumes at the upload, anything else goes back to rendering.
+- Remove the partial videos of interrupted renders from the share.
+
+The pass leases each page of tunes while it inspects them, so it never touches a
+tune another worker has just picked up. Picking the tunes up is left to the
+scheduler's sweep, and the pipeline skips the stages they already completed.
+
+Metrics:
+--------
+- recovery.tunes (stage): interrupted tunes found, by the stage they resume at.
+- recovery.partial_videos_removed: partial renders deleted from the share.
+"""
+import os
+import traceback
+from datetime import datetime, timezone
+from app.db.db import Tune, get_db_session_context
+from app.components.file_processing.file_processing_service import get_mp4_path
+from app.components.upload.tune_lease.tune_lease_service import acquire_tune_leases, release_leases
+from app.components.upload.upload_pipeline.upload_pipeline_utils import STAGE_RENDER
+from app.components.upload.upload_recovery.upload_recovery_repository import get_interrupted_tunes_page
+from app.components.upload.upload_recovery.upload_recovery_utils import get_resume_stage
+from app.logger.logging_setup import logger
+from app.settings.env_settings import SCHEDULER_FETCH_PAGE_SIZE
+from app.utils.executor_util import EXECUTOR_FS, run_blocking
+from app.utils.metrics_util import increment_counter
+
+
+async def recover_interrupted_tunes() -> int:
+    """
+    Prepares every interrupted tune to resume from its furthest durable stage.
+
+    Returns:
+    --------
+    int
+        The number of interrupted tunes found.
+    """
+    recovered = 0
+    after_id = 0
+    try:
+        while True:
+            with get_db_session_context() as db:
+                page = await get_interrupted_tunes_page(after_id, SCHEDULER_FETCH_PAGE_SIZE, datetime.now(timezone.utc), db)
+            if not page:
+                break
+            after_id = page[-1].id
+
+            leased = await acquire_tune_leases(tune.id for tune in page)
+            try:
+                for tune in page:
+                    if tune.id in leased:
+                        # Checks and removes the tune's video on the share.
+                        await run_blocking(EXECUTOR_FS, _recover_tune, tune)
+                        recovered += 1
+            finally:
+                await release_leases(leased)
+
+            if len(page) < SCHEDULER_FETCH_PAGE_SIZE:
+                break
+    except Exception as e:
+        # Whatever was missed is still picked up by the sweep, only with a full restart.
+        logger.error(f"Upload recovery failed: {e}")
+        logger.debug(traceback.format_exc())
+
+    if recovered:
+        logger.info(f"Upload recovery: {recovered} interrupted tune(s) will resume.")
+    return recovered
+
+
+def _recover_tune(tune: Tune):
+    stage = get_resume_stage(tune)
+    increment_counter("recovery.tunes", stage=stage)
+    logger.info(f"Tune '{tune.video_title}' was interrupted while '{tune.status}'; resuming at the {stage} stage.")
+    if stage != STAGE_RENDER:
+        return
+
+    mp4_path = get_mp4_path(tune.base_dest_path, tune.video_title)
+    if not os.path.exists(mp4_path):
+        return
+    try:
+        os.remove(mp4_path)
+        increment_counter("recovery.partial_videos_removed")
+        logger.debug(f"Removed partial video '{mp4_path}'.")
+    except OSError as e:
+        logger.warning(f"Failed to remove partial video '{mp4_path}': {e}")
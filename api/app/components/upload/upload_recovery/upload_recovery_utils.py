@@ -0,0 +1,37 @@
+import os
+from app.db.db import Tune
+from app.components.file_processing.file_processing_service import get_mp4_path
+from app.components.tune_ops.tune_ops_utils import (
+    IN_PROGRESS_TUNE_STATUSES,
+    TUNE_STATUS_RENDERED,
+    TUNE_STATUS_RENDERING,
+    TUNE_STATUS_UPLOADING
+)
+from app.components.upload.upload_pipeline.upload_pipeline_utils import STAGE_RENDER, STAGE_UPLOAD
+
+# A tune only reaches these statuses once its video is fully rendered.
+RENDERED_TUNE_STATUSES = (TUNE_STATUS_RENDERED, TUNE_STATUS_UPLOADING)
+
+# Statuses of a tune that entered the pipeline but has not left it.
+MID_PIPELINE_TUNE_STATUSES = IN_PROGRESS_TUNE_STATUSES + (TUNE_STATUS_RENDERED,)
+
+
+def has_rendered_video(tune: Tune) -> bool:
+    """
+    Whether the complete video of an earlier attempt is still on the share, so the
+    tune can skip rendering. A file left by an unfinished render is partial, even
+    when a session from an older attempt is still stored.
+    """
+    if tune.status == TUNE_STATUS_RENDERING:
+        return False
+    if tune.status not in RENDERED_TUNE_STATUSES and not tune.upload_session_uri:
+        return False
+    return os.path.exists(get_mp4_path(tune.base_dest_path, tune.video_title))
+
+
+def get_resume_stage(tune: Tune) -> str:
+    """
+    Furthest durable stage of a tune left mid-pipeline: the upload if its rendered
+    video survived, otherwise the render.
+    """
+    return STAGE_UPLOAD if has_rendered_video(tune) else STAGE_RENDER
@@ -2,10 +2,12 @@ from contextlib import contextmanager
 from typing import Generator
 import uuid
 import subprocess
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, text
+from sqlalchemy import create_engine, Column, Integer, BigInteger, Float, String, Boolean, Date, ForeignKey, Index, UniqueConstraint, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.pool import NullPool
 from app.db.custom_types import UtcDateTime
+from app.db.db_pool_monitor import instrument_pool
 from app.logger.logging_setup import logger
 from app.settings.env_settings import DB_CONN_STR
 
@@ -17,6 +19,13 @@ engine = create_engine(
     max_overflow=10      # Maximum overflow connections beyond pool size
 )
 
+# Count checkouts and hold times; report long-held connections.
+instrument_pool(engine)
+
+# Engine for connections a process holds on to indefinitely (e.g. the leader's advisory
+# lock). They never take a slot of the pool above, and closing one really closes it.
+unpooled_engine = create_engine(DB_CONN_STR, poolclass=NullPool)
+
 # Create a configured session factory for the database
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -28,11 +37,15 @@ class Tune(Base):
     Represents the 'tunes' table in the database.
     """
     __tablename__ = 'tunes'
+    __table_args__ = (
+        # Worker scans filter on status first, then on the due date.
+        Index('ix_tunes_status_upload_date', 'status', 'upload_date'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     date_created = Column(UtcDateTime)
     upload_date = Column(UtcDateTime, nullable=True)
-    executed = Column(Boolean)
+    executed = Column(Boolean)  # Mirrors status == 'uploaded'
     video_title = Column(String(255))
     base_dest_path = Column(String(512))
     img_name = Column(String(255))
@@ -47,8 +60,69 @@ class Tune(Base):
     video_description = Column(String(1024))
     user_id = Column(String(36), ForeignKey('users.id'))
 
+    # Resumable upload checkpoint (cleared once the upload completes)
+    upload_session_uri = Column(String(2048), nullable=True)
+    upload_bytes_committed = Column(BigInteger, nullable=True)
+
+    # Upload outcome and the token that identifies this tune's video on YouTube
+    youtube_video_id = Column(String(32), nullable=True, index=True)
+    upload_idempotency_token = Column(String(36), nullable=True)
+
+    # YouTube's processing of the uploaded video, tracked by the processing status poller
+    processing_status = Column(String(32), nullable=True, index=True)
+    processing_failure_reason = Column(String(255), nullable=True)
+    processing_checked_at = Column(UtcDateTime, nullable=True)
+
+    # Lifecycle status (see TUNE_STATUS_* in tune_ops_utils) and transition timestamps
+    status = Column(String(32), nullable=False, default="queued", server_default="queued")
+    status_changed_at = Column(UtcDateTime, nullable=True)
+    render_started_at = Column(UtcDateTime, nullable=True)
+    rendered_at = Column(UtcDateTime, nullable=True)
+    upload_started_at = Column(UtcDateTime, nullable=True)
+    uploaded_at = Column(UtcDateTime, nullable=True)
+
+    # Measured while the tune is processed; the capacity planner learns its rates from them
+    audio_duration_seconds = Column(Float, nullable=True)
+    video_size_bytes = Column(BigInteger, nullable=True)
+    render_seconds = Column(Float, nullable=True)
+
+    # Dispatch lane the tune is processed in (e.g. 'instant'); None means the scheduled lane
+    dispatch_lane = Column(String(16), nullable=True)
+
+    # Failure tracking: a failed tune is retried at next_attempt_at
+    last_error = Column(String(1024), nullable=True)
+    next_attempt_at = Column(UtcDateTime, nullable=True, index=True)
+
+    # Processing lease: the worker holding it owns the tune until the lease expires
+    lease_owner = Column(String(128), nullable=True)
+    lease_expires_at = Column(UtcDateTime, nullable=True, index=True)
+    attempt_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Backward relationship to User
     user = relationship("User", back_populates="tunes")
+    upload_attempts = relationship("TuneUploadAttempt", back_populates="tune", cascade="all, delete-orphan")
+
+
+class TuneUploadAttempt(Base):
+    """
+    Represents the 'tune_upload_attempts' table in the database.
+
+    One row per attempt to upload a tune to YouTube. An attempt left 'in_progress'
+    (or 'failed' after the upload started) means YouTube may have received the
+    video, so the tune is reconciled before it is uploaded again.
+    """
+    __tablename__ = 'tune_upload_attempts'
+
+    id = Column(Integer, primary_key=True, index=True)
+    tune_id = Column(Integer, ForeignKey('tunes.id'), nullable=False, index=True)
+    idempotency_token = Column(String(36), nullable=False)
+    started_at = Column(UtcDateTime, nullable=False)
+    finished_at = Column(UtcDateTime, nullable=True)
+    outcome = Column(String(32), nullable=False)
+    youtube_video_id = Column(String(32), nullable=True)
+    error = Column(String(1024), nullable=True)
+
+    tune = relationship("Tune", back_populates="upload_attempts")
 
 
 class User(Base):
@@ -68,6 +142,72 @@ class User(Base):
     # Backward relationship to Tune
     tunes = relationship("Tune", back_populates="user")
 
+
+class QuotaUsage(Base):
+    """
+    Represents the 'youtube_quota_usage' table in the database.
+
+    One row per Google project, user and quota day (Pacific time) holding the
+    YouTube Data API units consumed on behalf of that user.
+    """
+    __tablename__ = 'youtube_quota_usage'
+    __table_args__ = (
+        UniqueConstraint('project_id', 'user_id', 'quota_day', name='uq_quota_usage_project_user_day'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(String(255), nullable=False)
+    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    quota_day = Column(Date, nullable=False, index=True)
+    units_used = Column(Integer, nullable=False, default=0)
+    date_updated = Column(UtcDateTime, nullable=False)
+
+class QuotaLedger(Base):
+    """
+    Represents the 'youtube_quota_ledger' table in the database.
+
+    One row per Google project and quota day holding the units consumed by all users
+    together. Reservations increment it with a conditional update, so the project's
+    daily limit holds across processes.
+    """
+    __tablename__ = 'youtube_quota_ledger'
+    __table_args__ = (
+        UniqueConstraint('project_id', 'quota_day', name='uq_quota_ledger_project_day'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(String(255), nullable=False)
+    quota_day = Column(Date, nullable=False)
+    units_used = Column(Integer, nullable=False, default=0)
+    date_updated = Column(UtcDateTime, nullable=False)
+
+class LeaderLease(Base):
+    """
+    Represents the 'leader_leases' table in the database.
+
+    One row per elected role (e.g. the upload scheduler) naming the process that
+    currently leads it, on databases without advisory locks.
+    """
+    __tablename__ = 'leader_leases'
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(128), nullable=True)
+    acquired_at = Column(UtcDateTime, nullable=True)
+    expires_at = Column(UtcDateTime, nullable=True)
+
+class RuntimeSetting(Base):
+    """
+    Represents the 'runtime_settings' table in the database.
+
+    Operational settings changed at runtime through the admin API, overriding their
+    environment default in every process until they are reset.
+    """
+    __tablename__ = 'runtime_settings'
+
+    name = Column(String(64), primary_key=True)
+    value = Column(String(255), nullable=False)
+    date_updated = Column(UtcDateTime, nullable=False)
+
 # Initialize database schema using Alembic for migrations
 def init_db():
     """
@@ -130,6 +270,14 @@ def get_db_session() -> Generator[Session, None, None]:
 
 @contextmanager
 def get_db_session_context() -> Generator[Session, None, None]:
+    """
+    Unit of work for background tasks: a session scoped to one step, rolled back on
+    error and always closed, so its connection returns to the pool at once.
+
+    Open one per step rather than one per task, and never keep it open across slow
+    work (rendering, uploads, YouTube calls). Rows loaded in it stay readable after it
+    closes.
+    """
     db = SessionLocal()
     try:
         yield db
@@ -138,3 +286,15 @@ def get_db_session_context() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+
+def detach_from_session(db: Session, *instances):
+    """
+    Hands rows loaded in a request session over to background work: reloads any
+    expired attributes, then closes the session, which returns its connection to the
+    pool. The rows stay readable; later steps open their own `get_db_session_context`.
+    """
+    for instance in instances:
+        if inspect(instance).expired_attributes:
+            db.refresh(instance)
+    db.close()
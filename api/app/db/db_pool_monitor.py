@@ -0,0 +1,143 @@
+"""
+Connection Pool Monitor
+=======================
+Instruments the SQLAlchemy connection pool: every checkout and checkin is counted,
+and the time each connection is held is measured. Connections returned after being
+held longer than `DB_POOL_HOLD_WARNING_SECONDS` are logged with their holder.
+
+With `DB_POOL_LEAK_DEBUG` on, each checkout also records the acquiring stack, and a
+watchdog thread reports connections still checked out past the threshold, so a
+session that is never closed is reported with the code that opened it. Capturing
+stacks slows down every checkout; leave it off in production.
+
+Metrics:
+--------
+- db.pool.checkouts / db.pool.checkins: connections handed out and returned.
+- db.pool.checked_out: connections currently checked out.
+- db.pool.hold_seconds: total time connections were held.
+- db.pool.long_holds: connections held longer than the threshold.
+"""
+import asyncio
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.logger.logging_setup import logger
+from app.settings.env_settings import DB_POOL_HOLD_WARNING_SECONDS, DB_POOL_LEAK_DEBUG
+from app.utils.metrics_util import increment_counter, set_gauge
+
+# Innermost application frames kept per checkout; SQLAlchemy's own frames are dropped.
+STACK_DEPTH = 15
+
+
+class PoolCheckout:
+    """
+    One checked out connection: when, by whom and, in debug mode, from where.
+    """
+    def __init__(self, holder: str, stack: Optional[str]):
+        self.started_at = time.monotonic()
+        self.holder = holder
+        self.stack = stack
+        self.reported = False
+
+    def held_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+_lock = threading.Lock()
+# Keyed by the pool's connection record, which is stable across checkouts.
+_checkouts: Dict[int, PoolCheckout] = {}
+_watchdog: Optional[threading.Thread] = None
+
+
+def instrument_pool(engine: Engine):
+    """
+    Registers the checkout and checkin listeners on `engine`'s pool, and starts the
+    leak watchdog when `DB_POOL_LEAK_DEBUG` is on.
+    """
+    event.listen(engine, "checkout", _on_checkout)
+    event.listen(engine, "checkin", _on_checkin)
+    if DB_POOL_LEAK_DEBUG:
+        logger.warning(
+            f"Connection leak detection is on: connections held over {DB_POOL_HOLD_WARNING_SECONDS}s "
+            "are reported with their acquiring stack."
+        )
+        _start_watchdog()
+
+
+def get_long_held_checkouts(threshold_seconds: float) -> List[PoolCheckout]:
+    """
+    Returns the connections currently checked out for longer than `threshold_seconds`.
+    """
+    with _lock:
+        return [checkout for checkout in _checkouts.values() if checkout.held_seconds() > threshold_seconds]
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    checkout = PoolCheckout(_get_holder(), _capture_stack() if DB_POOL_LEAK_DEBUG else None)
+    with _lock:
+        _checkouts[id(connection_record)] = checkout
+        checked_out = len(_checkouts)
+    increment_counter("db.pool.checkouts")
+    set_gauge("db.pool.checked_out", checked_out)
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    with _lock:
+        checkout = _checkouts.pop(id(connection_record), None)
+        checked_out = len(_checkouts)
+    if checkout is None:
+        return
+
+    held = checkout.held_seconds()
+    increment_counter("db.pool.checkins")
+    increment_counter("db.pool.hold_seconds", held)
+    set_gauge("db.pool.checked_out", checked_out)
+    if held > DB_POOL_HOLD_WARNING_SECONDS:
+        increment_counter("db.pool.long_holds")
+        if not checkout.reported:
+            logger.warning(f"DB connection held for {held:.1f}s by {checkout.holder}.{_format_stack(checkout)}")
+
+
+def _start_watchdog():
+    global _watchdog
+    if _watchdog is not None:
+        return
+    # A thread rather than a task, so connections held by a blocked event loop are still reported.
+    _watchdog = threading.Thread(target=_watch_checkouts, name="db-pool-watchdog", daemon=True)
+    _watchdog.start()
+
+
+def _watch_checkouts():
+    interval = max(1.0, DB_POOL_HOLD_WARNING_SECONDS / 2)
+    while True:
+        time.sleep(interval)
+        for checkout in get_long_held_checkouts(DB_POOL_HOLD_WARNING_SECONDS):
+            if checkout.reported:
+                continue
+            checkout.reported = True
+            logger.warning(
+                f"DB connection still held after {checkout.held_seconds():.1f}s by {checkout.holder}; "
+                f"possible leak.{_format_stack(checkout)}"
+            )
+
+
+def _get_holder() -> str:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    thread = threading.current_thread().name
+    return f"task '{task.get_name()}' on {thread}" if task is not None else thread
+
+
+def _capture_stack() -> str:
+    # Drop this module's own frames, then the pool's, which say nothing about the holder.
+    frames = [frame for frame in traceback.extract_stack()[:-2] if "sqlalchemy" not in frame.filename]
+    return "".join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+def _format_stack(checkout: PoolCheckout) -> str:
+    return f" Acquired at:\n{checkout.stack}" if checkout.stack else ""
@@ -45,6 +45,15 @@ class TuneDto(BaseModel):
     embeddable: bool = Field(default=False)
     license: str = Field(default="youtube")
     video_description: Optional[str] = None
+    youtube_video_id: Optional[str] = None
+    processing_status: Optional[str] = None
+    processing_failure_reason: Optional[str] = None
+    status: Optional[str] = None
+    status_changed_at: Optional[datetime] = None
+    upload_bytes_committed: Optional[int] = None
+    attempt_count: Optional[int] = None
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         from_attributes=True,
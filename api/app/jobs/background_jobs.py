@@ -0,0 +1,39 @@
+from app.components.runtime_config.runtime_config_service import start_runtime_config_watcher, stop_runtime_config_watcher
+from app.components.upload.tune2tube.tune2tube_client import close_youtube_http_client
+from app.components.upload.tune_lease.tune_lease_service import stop_lease_heartbeat
+from app.components.upload.upload_concurrency.upload_concurrency_service import upload_concurrency_controller
+from app.components.upload.upload_pipeline.upload_pipeline_service import upload_pipeline
+from app.jobs.processing_status_job import start_processing_status_poller, stop_processing_status_poller
+from app.jobs.tune_upload_job import start_scheduler, stop_scheduler
+from app.logger.logging_setup import logger
+from app.settings.env_settings import PIPELINE_DRAIN_SECONDS
+
+def start_background_jobs():
+    """
+    Starts the jobs that render, upload and track tunes: the upload scheduler, the
+    upload concurrency controller and the YouTube processing status poller.
+    """
+    logger.debug("Background Jobs: Starting.")
+    # Applies overrides from the runtime configuration as soon as it has read them.
+    start_runtime_config_watcher()
+    upload_concurrency_controller.start()
+    start_scheduler()
+    start_processing_status_poller()
+
+async def stop_background_jobs():
+    """
+    Stops the background jobs and releases what the upload pipeline holds: tune
+    leases and the shared YouTube HTTP client. Safe to call when the jobs never started.
+
+    Once the scheduler stops taking tunes, the pipeline is drained: running stages get
+    `PIPELINE_DRAIN_SECONDS` to finish, then renders are killed and uploads checkpoint
+    their session, so the next worker resumes them.
+    """
+    logger.debug("Background Jobs: Stopping.")
+    await stop_scheduler()
+    await upload_pipeline.drain(PIPELINE_DRAIN_SECONDS)
+    await stop_runtime_config_watcher()
+    await upload_concurrency_controller.stop()
+    await stop_processing_status_poller()
+    await stop_lease_heartbeat()
+    await close_youtube_http_client()
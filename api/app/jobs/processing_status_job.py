@@ -0,0 +1,72 @@
+import asyncio
+import traceback
+from typing import Optional
+from app.components.leader_election.leader_election_service import run_as_leader
+from app.components.leader_election.leader_election_utils import PROCESSING_STATUS_LEADER_NAME
+from app.components.upload.processing_status.processing_status_service import poll_processing_status
+from app.components.upload.processing_status.processing_status_utils import ProcessingPollResult, get_next_poll_interval
+from app.logger.logging_setup import logger
+from app.settings.env_settings import LEADER_ELECTION_ENABLED, PROCESSING_POLL_MIN_SECONDS
+from app.utils.metrics_util import set_gauge
+
+_wake_event: Optional[asyncio.Event] = None
+_poller_task: Optional[asyncio.Task] = None
+
+def start_processing_status_poller():
+    global _wake_event, _poller_task
+    logger.debug("Processing Status Job: Starting the poller.")
+    _wake_event = asyncio.Event()
+    if LEADER_ELECTION_ENABLED:
+        # Every process watches the same videos; only the elected one spends videos.list quota on them.
+        _poller_task = asyncio.create_task(run_as_leader(PROCESSING_STATUS_LEADER_NAME, _run_poller))
+    else:
+        _poller_task = asyncio.create_task(_run_poller())
+
+async def stop_processing_status_poller():
+    global _poller_task
+    if _poller_task is None:
+        return
+    _poller_task.cancel()
+    try:
+        await _poller_task
+    except asyncio.CancelledError:
+        pass
+    _poller_task = None
+
+def wake_processing_status_poller():
+    """
+    Tells the poller a video was just uploaded, so it returns to its shortest interval.
+    Only reaches the poller of this process; the elected one elsewhere finds the video
+    on its next poll.
+    """
+    if _wake_event is not None:
+        _wake_event.set()
+
+async def _run_poller():
+    interval = PROCESSING_POLL_MIN_SECONDS
+    while True:
+        if await _wait_for_wake(interval):
+            # Give YouTube the shortest interval to start processing before the first check.
+            interval = PROCESSING_POLL_MIN_SECONDS
+            await asyncio.sleep(interval)
+
+        result = await _poll_once()
+        interval = get_next_poll_interval(interval, result)
+        set_gauge("processing_poll.interval_seconds", interval)
+        logger.debug(f"Processing Status Job: next poll in {interval:.0f}s.")
+
+async def _wait_for_wake(timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(_wake_event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False
+    _wake_event.clear()
+    return True
+
+async def _poll_once() -> Optional[ProcessingPollResult]:
+    try:
+        return await poll_processing_status()
+    except Exception as e:
+        logger.error(f"Processing Status Job: Failed during execution: {e}")
+        logger.debug(traceback.format_exc())
+        return None
@@ -1,64 +1,180 @@
 import asyncio
 import traceback
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import datetime, timezone
-from collections import defaultdict
-from app.db.db import get_db_session_context, User
-from app.components.tune_ops.tune_ops_repository import get_tunes
+from typing import AsyncIterator, List, Optional, Tuple
+from app.db.db import get_db_session_context, Tune, User
+from app.components.leader_election.leader_election_service import run_as_leader
+from app.components.leader_election.leader_election_utils import SCHEDULER_LEADER_NAME
+from app.components.upload.due_tune_queue.due_tune_queue_listener import get_listener_dsn, listen_for_schedule_changes
+from app.components.upload.due_tune_queue.due_tune_queue_repository import get_due_tunes_with_users, get_pending_tune_schedule_page
+from app.components.upload.due_tune_queue.due_tune_queue_service import due_tune_queue
+from app.components.upload.upload_dispatcher.upload_dispatcher_utils import LANE_SCHEDULED
 from app.components.upload.upload_processing.upload_processing_service import process_and_upload_tunes
+from app.components.upload.upload_recovery.upload_recovery_service import recover_interrupted_tunes
 from app.logger.logging_setup import logger
-from app.settings.env_settings import SCHEDULER_INTERVAL_MINUTES
+from app.settings.env_settings import (
+    LEADER_ELECTION_ENABLED,
+    SCHEDULER_FETCH_PAGE_SIZE,
+    SCHEDULER_INTERVAL_MINUTES,
+    SCHEDULER_MAX_TUNES_IN_FLIGHT
+)
 
-scheduler = AsyncIOScheduler()
+_scheduler_task: Optional[asyncio.Task] = None
+_listener_task: Optional[asyncio.Task] = None
+_sweep_requested = False
+# Changed at runtime through the runtime configuration.
+_sweep_interval_seconds = SCHEDULER_INTERVAL_MINUTES * 60
 
-async def scan_and_process_tunes():
-    logger.debug("Scheduler Job: Starting scheduled job to scan and process tunes.")
-    now = datetime.now(timezone.utc)
+# Strong references to running batches, which the event loop only holds weakly.
+_batch_tasks = set()
+
+async def process_due_tunes(tune_ids: List[int]):
+    """
+    Loads the due tunes page by page and hands each one to the upload pipeline as its own
+    task, in its dispatch lane, so a slow tune never holds back the ones behind it; the
+    pipeline's stage and per-user limits decide which of them run. The fetch waits while
+    `SCHEDULER_MAX_TUNES_IN_FLIGHT` tunes are in flight, so a large backlog is drained at
+    the pipeline's pace with flat memory.
+    """
+    logger.debug(f"Scheduler Job: Processing {len(tune_ids)} due tunes.")
+    in_flight = asyncio.Semaphore(SCHEDULER_MAX_TUNES_IN_FLIGHT)
+    tasks = set()
 
     try:
-        with get_db_session_context() as db:
-            # 1. Fetch all unexecuted tunes across users
-            tunes, _ = await get_tunes(
-                db,
-                user_id=None,
-                page=1,
-                limit=1000,
-                upload_date_before=now,
-                executed=False
-            )
-
-            if not tunes:
-                logger.debug("Scheduler Job: No tunes found to process.")
-                return
-
-            logger.debug(f"Scheduler Job: Found {len(tunes)} tunes to process.")
-
-            # 2. Group by user_id
-            grouped_tunes = defaultdict(list)
-            for tune in tunes:
-                grouped_tunes[tune.user_id].append(tune)
-
-            # 3. Define async tasks per user
-            async def process_user_group(user_id: str, user_tunes):
-                try:
-                    user: User = db.query(User).filter(User.id == user_id).first()
-                    if not user:
-                        logger.warning(f"User not found for user_id={user_id}, skipping {len(user_tunes)} tunes.")
-                        return
-                    logger.debug(f"Processing {len(user_tunes)} tunes for user {user_id}")
-                    await process_and_upload_tunes(user_tunes, user)
-                except Exception as e:
-                    logger.error(f"Error processing tunes for user_id={user_id}: {e}")
-                    logger.debug(traceback.format_exc())
-
-            # 4. Launch all user-grouped tasks concurrently
-            await asyncio.gather(*(process_user_group(uid, tunes) for uid, tunes in grouped_tunes.items()))
+        dispatched = 0
+        async for page in _stream_due_tunes(tune_ids):
+            for tune, user in page:
+                if user is None:
+                    logger.warning(f"User not found for user_id={tune.user_id}, skipping tune {tune.id}.")
+                    continue
+                await in_flight.acquire()
+                task = asyncio.create_task(_dispatch_tune(tune, user, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                dispatched += 1
 
+        if not dispatched:
+            logger.debug("Scheduler Job: No tunes found to process.")
+        await asyncio.gather(*tasks)
     except Exception as e:
         logger.error(f"Scheduler Job: Failed during execution: {e}")
         logger.debug(traceback.format_exc())
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _stream_due_tunes(tune_ids: List[int]) -> AsyncIterator[List[Tuple[Tune, Optional[User]]]]:
+    # Each page is read in its own short session; the loaded rows outlive it.
+    tune_ids = sorted(tune_ids)
+    for start in range(0, len(tune_ids), SCHEDULER_FETCH_PAGE_SIZE):
+        with get_db_session_context() as db:
+            page = await get_due_tunes_with_users(tune_ids[start:start + SCHEDULER_FETCH_PAGE_SIZE], datetime.now(timezone.utc), db)
+        if page:
+            yield page
+
+async def _dispatch_tune(tune: Tune, user: User, in_flight: asyncio.Semaphore):
+    lane = tune.dispatch_lane or LANE_SCHEDULED
+    try:
+        logger.debug(f"Processing tune {tune.id} for user {user.id} in the {lane} lane")
+        await process_and_upload_tunes([tune], user, lane)
+    except Exception as e:
+        logger.error(f"Error processing tune {tune.id} for user_id={user.id}: {e}")
+        logger.debug(traceback.format_exc())
+    finally:
+        in_flight.release()
+
+async def sweep_tune_schedule():
+    """
+    Rebuilds the due tune queue from the database. Catches changes the queue missed
+    and requeues tunes whose upload was deferred or whose retry is due.
+    """
+    try:
+        schedule = []
+        now = datetime.now(timezone.utc)
+        after_id = 0
+        while True:
+            with get_db_session_context() as db:
+                page = await get_pending_tune_schedule_page(after_id, SCHEDULER_FETCH_PAGE_SIZE, now, db)
+            schedule.extend(page)
+            if len(page) < SCHEDULER_FETCH_PAGE_SIZE:
+                break
+            after_id = page[-1][0]
+        due_tune_queue.replace_all(schedule)
+        logger.debug(f"Scheduler Job: Consistency sweep queued {len(schedule)} pending tunes.")
+    except Exception as e:
+        logger.error(f"Scheduler Job: Consistency sweep failed: {e}")
+        logger.debug(traceback.format_exc())
+
+def request_schedule_sweep():
+    global _sweep_requested
+    _sweep_requested = True
+    due_tune_queue.wake()
+
+def set_scheduler_interval(minutes: int):
+    """
+    Changes the interval of the consistency sweep. A running scheduler reschedules its
+    next sweep right away, counting from the last one.
+    """
+    global _sweep_interval_seconds
+    _sweep_interval_seconds = max(1, minutes) * 60
+    logger.info(f"Scheduler Job: Consistency sweep now runs every {max(1, minutes)} minute(s).")
+    due_tune_queue.wake()
+
+def get_scheduler_interval_minutes() -> int:
+    return _sweep_interval_seconds // 60
+
+async def _run_scheduler():
+    global _sweep_requested
+    loop = asyncio.get_running_loop()
+    last_sweep_at: Optional[float] = None
+
+    # Tunes a stopped worker left mid-pipeline are prepared for the first sweep to resume.
+    await recover_interrupted_tunes()
+
+    while True:
+        if _sweep_requested or last_sweep_at is None or loop.time() >= last_sweep_at + _sweep_interval_seconds:
+            _sweep_requested = False
+            await sweep_tune_schedule()
+            last_sweep_at = loop.time()
+
+        due = due_tune_queue.pop_due(datetime.now(timezone.utc))
+        if due:
+            # Batches run in the background so the scheduler keeps reacting to new due times.
+            task = asyncio.create_task(process_due_tunes(due))
+            _batch_tasks.add(task)
+            task.add_done_callback(_batch_tasks.discard)
+
+        timeout = last_sweep_at + _sweep_interval_seconds - loop.time()
+        next_due_at = due_tune_queue.next_due_at()
+        if next_due_at is not None:
+            timeout = min(timeout, next_due_at - datetime.now(timezone.utc).timestamp())
+        await due_tune_queue.wait(max(timeout, 0))
 
 def start_scheduler():
+    global _scheduler_task, _listener_task
     logger.debug("Scheduler Job: Starting the scheduler.")
-    scheduler.add_job(scan_and_process_tunes, 'interval', minutes=SCHEDULER_INTERVAL_MINUTES)
-    scheduler.start()
+    if LEADER_ELECTION_ENABLED:
+        # Only the elected process scans; the others stand by to take over.
+        _scheduler_task = asyncio.create_task(run_as_leader(SCHEDULER_LEADER_NAME, _run_scheduler))
+    else:
+        _scheduler_task = asyncio.create_task(_run_scheduler())
+
+    dsn = get_listener_dsn()
+    if dsn:
+        _listener_task = asyncio.create_task(listen_for_schedule_changes(dsn, on_reconnect=request_schedule_sweep))
+    else:
+        logger.debug("Scheduler Job: Database has no LISTEN/NOTIFY; relying on the consistency sweep.")
+
+async def stop_scheduler():
+    global _scheduler_task, _listener_task
+    for task in (_listener_task, _scheduler_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _scheduler_task = None
+    _listener_task = None
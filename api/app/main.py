@@ -8,10 +8,14 @@ from app.components.tune_ops.tune_ops_endpoint import tune_ops_router
 from app.components.auth.google_oauth.google_oauth_endpoint import google_oauth_router
 from app.components.user_mgmt.user_mgmt_endpoint import user_mgmt_router
 from app.components.system_health.system_health_endpoint import system_health_router
+from app.components.quota.quota_endpoint import quota_router
+from app.components.dead_letter.dead_letter_endpoint import dead_letter_router
+from app.components.runtime_config.runtime_config_endpoint import runtime_config_router
+from app.components.capacity_planner.capacity_planner_endpoint import capacity_planner_router
 from app.auth_dependencies import custom_openapi
-from app.jobs.tune_upload_job import start_scheduler
+from app.jobs.background_jobs import start_background_jobs, stop_background_jobs
 from app.logger.logging_setup import logger
-from app.settings.env_settings import KILL_SWITCH_ENABLED, MAINTENANCE_MODE_ENABLED, CORS_ORIGINS, GOOGLE_OAUTH_REDIRECT_URI_PATHS
+from app.settings.env_settings import KILL_SWITCH_ENABLED, MAINTENANCE_MODE_ENABLED, SCHEDULER_ENABLED, CORS_ORIGINS, GOOGLE_OAUTH_REDIRECT_URI_PATHS
 from app.utils.http_response_util import (
     not_found_handler,
     forbidden_handler,
@@ -37,9 +41,13 @@ if KILL_SWITCH_ENABLED:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.debug("Application has started.")
-    start_scheduler()
+    if SCHEDULER_ENABLED:
+        start_background_jobs()
+    else:
+        logger.info("In-process scheduler disabled; tunes are processed by `python -m app.worker`.")
     yield
     logger.debug("Application is stopping.")
+    await stop_background_jobs()
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -103,6 +111,10 @@ api_router.include_router(tune_ops_router, prefix="/tune-ops", tags=["Tune Opera
 api_router.include_router(google_oauth_router, prefix="/google-oauth", tags=["Google OAuth 2.0"])
 api_router.include_router(user_mgmt_router, prefix="/user-mgmt", tags=["User Management"])
 api_router.include_router(system_health_router, prefix="/system-health", tags=["System Health"])
+api_router.include_router(quota_router, prefix="/quota", tags=["YouTube Quota"])
+api_router.include_router(dead_letter_router, prefix="/dead-letter", tags=["Dead Letter"])
+api_router.include_router(runtime_config_router, prefix="/runtime-config", tags=["Runtime Configuration"])
+api_router.include_router(capacity_planner_router, prefix="/capacity-planner", tags=["Capacity Planner"])
 
 # Mount the API router
 app.include_router(api_router)
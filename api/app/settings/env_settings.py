@@ -5,6 +5,10 @@ load_dotenv()
 
 # Database
 DB_CONN_STR = os.getenv("POPEBEATS2TUBE_DB_CONN_STR")
+# Connections held longer than this are logged; with leak debugging on, together with
+# the stack that acquired them, even while they are still held.
+DB_POOL_HOLD_WARNING_SECONDS = float(os.getenv("POPEBEATS2TUBE_DB_POOL_HOLD_WARNING_SECONDS", 30))
+DB_POOL_LEAK_DEBUG = os.getenv("POPEBEATS2TUBE_DB_POOL_LEAK_DEBUG", "false").lower() == "true"
 
 # File Share
 FILE_SHARE_IP_ADDR = os.getenv("POPEBEATS2TUBE_FILE_SHARE_IP_ADDR")
@@ -46,12 +50,142 @@ FFMPEG_PROBE_PATH = os.getenv("POPEBEATS2TUBE_FFMPEG_PROBE_PATH")
 # YouTube Access
 YOUTUBE_ACCESS_SERVICE_NAME = os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_SERVICE_NAME")
 YOUTUBE_ACCESS_SERVICE_VERSION = os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_SERVICE_VERSION")
-YOUTUBE_ACCESS_CONCURRENCY_LIMIT = int(os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_CONCURRENCY_LIMIT", 3))
+YOUTUBE_ACCESS_API_ROOT_URL = os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_API_ROOT_URL")
+YOUTUBE_ACCESS_UPLOAD_CHUNK_SIZE = int(os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+YOUTUBE_ACCESS_HTTP_MAX_CONNECTIONS = int(os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_HTTP_MAX_CONNECTIONS", 100))
+YOUTUBE_ACCESS_HTTP_TIMEOUT_SECONDS = float(os.getenv("POPEBEATS2TUBE_YOUTUBE_ACCESS_HTTP_TIMEOUT_SECONDS", 60))
+
+# Upload Dispatcher
+# Each pipeline stage serves waiting tunes round robin across users, running at most
+# DISPATCH_USER_CONCURRENCY per user; weights (`<user id>=<weight>,...`) give a user
+# more or fewer tunes per turn. DISPATCH_GLOBAL_CONCURRENCY is the default ceiling of
+# concurrent uploads.
+DISPATCH_GLOBAL_CONCURRENCY = int(os.getenv("POPEBEATS2TUBE_DISPATCH_GLOBAL_CONCURRENCY", 8))
+DISPATCH_USER_CONCURRENCY = int(os.getenv("POPEBEATS2TUBE_DISPATCH_USER_CONCURRENCY", 3))
+DISPATCH_USER_WEIGHTS = os.getenv("POPEBEATS2TUBE_DISPATCH_USER_WEIGHTS", "")
+# Lanes (instant, scheduled, pre_render, preview) are picked by weight (`<lane>=<weight>,...`
+# over the defaults 8/4/2/1) or, with mode "strict", always the highest lane with work.
+DISPATCH_LANE_WEIGHTS = os.getenv("POPEBEATS2TUBE_DISPATCH_LANE_WEIGHTS", "")
+DISPATCH_LANE_MODE = os.getenv("POPEBEATS2TUBE_DISPATCH_LANE_MODE", "weighted").lower()
+
+# Upload Pipeline
+# Tunes go through probe -> render -> upload -> finalize, each stage with its own number
+# of workers. At most PIPELINE_QUEUE_SIZE tunes wait between two stages; a stage whose
+# next queue is full pauses until there is room.
+PIPELINE_PROBE_WORKERS = int(os.getenv("POPEBEATS2TUBE_PIPELINE_PROBE_WORKERS", 4))
+PIPELINE_RENDER_WORKERS = int(os.getenv("POPEBEATS2TUBE_PIPELINE_RENDER_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PIPELINE_UPLOAD_WORKERS = int(os.getenv("POPEBEATS2TUBE_PIPELINE_UPLOAD_WORKERS", DISPATCH_GLOBAL_CONCURRENCY))
+PIPELINE_FINALIZE_WORKERS = int(os.getenv("POPEBEATS2TUBE_PIPELINE_FINALIZE_WORKERS", 4))
+PIPELINE_QUEUE_SIZE = int(os.getenv("POPEBEATS2TUBE_PIPELINE_QUEUE_SIZE", 16))
+# On shutdown, running stages get PIPELINE_DRAIN_SECONDS to finish before they are
+# interrupted; keep it below the container stop timeout.
+PIPELINE_DRAIN_SECONDS = float(os.getenv("POPEBEATS2TUBE_PIPELINE_DRAIN_SECONDS", 25))
+
+# Upload Concurrency
+# The number of concurrent uploads adapts between UPLOAD_CONCURRENCY_MIN and the upload
+# workers (AIMD). Every UPLOAD_CONCURRENCY_INTERVAL_SECONDS it grows by one while the
+# throughput per stream holds, and is multiplied by UPLOAD_CONCURRENCY_DECREASE_FACTOR
+# after a 429/5xx from YouTube or once per-stream throughput falls below
+# UPLOAD_CONCURRENCY_COLLAPSE_RATIO of its recent peak. Off, the upload workers are a fixed limit.
+UPLOAD_CONCURRENCY_ADAPTIVE = os.getenv("POPEBEATS2TUBE_UPLOAD_CONCURRENCY_ADAPTIVE", "true").lower() == "true"
+UPLOAD_CONCURRENCY_MIN = int(os.getenv("POPEBEATS2TUBE_UPLOAD_CONCURRENCY_MIN", 1))
+UPLOAD_CONCURRENCY_INITIAL = int(os.getenv("POPEBEATS2TUBE_UPLOAD_CONCURRENCY_INITIAL", 3))
+UPLOAD_CONCURRENCY_INTERVAL_SECONDS = float(os.getenv("POPEBEATS2TUBE_UPLOAD_CONCURRENCY_INTERVAL_SECONDS", 30))
+UPLOAD_CONCURRENCY_DECREASE_FACTOR = float(os.getenv("POPEBEATS2TUBE_UPLOAD_CONCURRENCY_DECREASE_FACTOR", 0.5))
+UPLOAD_CONCURRENCY_COLLAPSE_RATIO = float(os.getenv("POPEBEATS2TUBE_UPLOAD_CONCURRENCY_COLLAPSE_RATIO", 0.5))
+
+# Thread Pools
+# Blocking work runs on a pool per kind, so one kind cannot starve another: database
+# calls (db), file operations (fs), reads of videos being uploaded (upload-io) and
+# threads waiting on ffmpeg/ffprobe (subprocess-wait, keep it at least render + probe
+# workers). IO_EXECUTOR_WORKERS sizes the event loop's default pool (asyncio.to_thread,
+# DNS lookups), left with asyncio's own sizing. A call waiting longer than
+# EXECUTOR_WAIT_WARNING_SECONDS for a thread is reported as saturation.
+EXECUTOR_DB_WORKERS = int(os.getenv("POPEBEATS2TUBE_EXECUTOR_DB_WORKERS", 16))
+EXECUTOR_FS_WORKERS = int(os.getenv("POPEBEATS2TUBE_EXECUTOR_FS_WORKERS", 4))
+EXECUTOR_UPLOAD_IO_WORKERS = int(os.getenv("POPEBEATS2TUBE_EXECUTOR_UPLOAD_IO_WORKERS", PIPELINE_UPLOAD_WORKERS))
+EXECUTOR_SUBPROCESS_WAIT_WORKERS = int(os.getenv(
+    "POPEBEATS2TUBE_EXECUTOR_SUBPROCESS_WAIT_WORKERS", PIPELINE_RENDER_WORKERS + PIPELINE_PROBE_WORKERS
+))
+EXECUTOR_WAIT_WARNING_SECONDS = float(os.getenv("POPEBEATS2TUBE_EXECUTOR_WAIT_WARNING_SECONDS", 1.0))
+IO_EXECUTOR_WORKERS = int(os.getenv("POPEBEATS2TUBE_IO_EXECUTOR_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+
+# Upload Bandwidth
+UPLOAD_BANDWIDTH_LIMIT = int(os.getenv("POPEBEATS2TUBE_UPLOAD_BANDWIDTH_LIMIT", 0))
+UPLOAD_BANDWIDTH_PROFILES = os.getenv("POPEBEATS2TUBE_UPLOAD_BANDWIDTH_PROFILES", "")
+UPLOAD_BANDWIDTH_TIMEZONE = os.getenv("POPEBEATS2TUBE_UPLOAD_BANDWIDTH_TIMEZONE", "UTC")
+UPLOAD_BANDWIDTH_BURST = int(os.getenv("POPEBEATS2TUBE_UPLOAD_BANDWIDTH_BURST", 1024 * 1024))
+
+# YouTube Quota
+YOUTUBE_QUOTA_PROJECT_ID = os.getenv("POPEBEATS2TUBE_YOUTUBE_QUOTA_PROJECT_ID", GOOGLE_OAUTH_CLIENT_ID or "default")
+YOUTUBE_QUOTA_DAILY_LIMIT = int(os.getenv("POPEBEATS2TUBE_YOUTUBE_QUOTA_DAILY_LIMIT", 10000))
+YOUTUBE_QUOTA_USER_DAILY_LIMIT = int(os.getenv("POPEBEATS2TUBE_YOUTUBE_QUOTA_USER_DAILY_LIMIT", 0))
+YOUTUBE_QUOTA_VIDEO_INSERT_COST = int(os.getenv("POPEBEATS2TUBE_YOUTUBE_QUOTA_VIDEO_INSERT_COST", 1600))
+
+# Retry Policy
+RETRY_MAX_ATTEMPTS = int(os.getenv("POPEBEATS2TUBE_RETRY_MAX_ATTEMPTS", 5))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("POPEBEATS2TUBE_RETRY_BASE_DELAY_SECONDS", 1.0))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("POPEBEATS2TUBE_RETRY_MAX_DELAY_SECONDS", 60.0))
+RETRY_TUNE_BUDGET = int(os.getenv("POPEBEATS2TUBE_RETRY_TUNE_BUDGET", 20))
+
+# Tune Retries
+# A failed tune is retried after an exponential delay (base * 2^(attempts - 1), capped);
+# after TUNE_MAX_ATTEMPTS processing attempts it is dead-lettered until an admin requeues it.
+TUNE_MAX_ATTEMPTS = int(os.getenv("POPEBEATS2TUBE_TUNE_MAX_ATTEMPTS", 5))
+TUNE_RETRY_BASE_DELAY_SECONDS = float(os.getenv("POPEBEATS2TUBE_TUNE_RETRY_BASE_DELAY_SECONDS", 300))
+TUNE_RETRY_MAX_DELAY_SECONDS = float(os.getenv("POPEBEATS2TUBE_TUNE_RETRY_MAX_DELAY_SECONDS", 6 * 3600))
+
+# Tune Leases
+# A worker owns a tune for this long after claiming it and renews the lease every heartbeat.
+TUNE_LEASE_SECONDS = int(os.getenv("POPEBEATS2TUBE_TUNE_LEASE_SECONDS", 300))
+TUNE_LEASE_HEARTBEAT_SECONDS = int(os.getenv("POPEBEATS2TUBE_TUNE_LEASE_HEARTBEAT_SECONDS", 60))
+
+# Processing Status Poller
+# Interval bounds (seconds) of the adaptive videos.list poll of uploaded videos.
+PROCESSING_POLL_MIN_SECONDS = float(os.getenv("POPEBEATS2TUBE_PROCESSING_POLL_MIN_SECONDS", 30))
+PROCESSING_POLL_MAX_SECONDS = float(os.getenv("POPEBEATS2TUBE_PROCESSING_POLL_MAX_SECONDS", 900))
+# Upper bound on videos checked per polling round.
+PROCESSING_POLL_MAX_VIDEOS = int(os.getenv("POPEBEATS2TUBE_PROCESSING_POLL_MAX_VIDEOS", 500))
 
 # Scheduler
+# The scheduler wakes at each tune's upload_date; this is the interval of its consistency
+# sweep, which also picks up deferred tunes and failed ones whose retry is due.
 SCHEDULER_INTERVAL_MINUTES = int(os.getenv("POPEBEATS2TUBE_SCHEDULER_INTERVAL_MINUTES", 5))
+# Tunes read per query by the sweep and by the dispatch of due tunes.
+SCHEDULER_FETCH_PAGE_SIZE = int(os.getenv("POPEBEATS2TUBE_SCHEDULER_FETCH_PAGE_SIZE", 200))
+# Due tunes handed to the upload pipeline at once, each as its own task; the fetch pauses
+# while this many are in flight. The pipeline's stage and per-user limits decide how many run.
+SCHEDULER_MAX_TUNES_IN_FLIGHT = int(os.getenv("POPEBEATS2TUBE_SCHEDULER_MAX_TUNES_IN_FLIGHT", 64))
+
+# Runtime Configuration
+# Stage workers, the per-user cap, the thread pools and the sweep interval can be changed
+# through the admin API without a restart. Processes running the upload pipeline pick up
+# changes made elsewhere within RUNTIME_CONFIG_REFRESH_SECONDS.
+RUNTIME_CONFIG_REFRESH_SECONDS = float(os.getenv("POPEBEATS2TUBE_RUNTIME_CONFIG_REFRESH_SECONDS", 30))
+
+# Capacity Planner
+# The forecast learns render and upload rates from the last CAPACITY_PLANNER_HISTORY_SIZE
+# uploaded tunes, and flags a tune whose upload is predicted to finish more than
+# CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES after its upload_date.
+CAPACITY_PLANNER_HISTORY_SIZE = int(os.getenv("POPEBEATS2TUBE_CAPACITY_PLANNER_HISTORY_SIZE", 200))
+CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES = int(os.getenv("POPEBEATS2TUBE_CAPACITY_PLANNER_LATE_TOLERANCE_MINUTES", 30))
+# Scheduling with slot allocation places tunes on a grid of SLOT_ALLOCATION_STEP_MINUTES,
+# inside a window of at most SLOT_ALLOCATION_MAX_WINDOW_DAYS.
+SLOT_ALLOCATION_STEP_MINUTES = int(os.getenv("POPEBEATS2TUBE_SLOT_ALLOCATION_STEP_MINUTES", 5))
+SLOT_ALLOCATION_MAX_WINDOW_DAYS = int(os.getenv("POPEBEATS2TUBE_SLOT_ALLOCATION_MAX_WINDOW_DAYS", 31))
+
+# Leader Election
+# When several processes run the scheduler, only the elected leader scans and the
+# others stand by. Postgres uses an advisory lock; other databases a lease row that
+# expires after LEADER_LEASE_SECONDS without renewal.
+LEADER_ELECTION_ENABLED = os.getenv("POPEBEATS2TUBE_LEADER_ELECTION_ENABLED", "false").lower() == "true"
+LEADER_LEASE_SECONDS = int(os.getenv("POPEBEATS2TUBE_LEADER_LEASE_SECONDS", 30))
+LEADER_RENEW_SECONDS = int(os.getenv("POPEBEATS2TUBE_LEADER_RENEW_SECONDS", 10))
+LEADER_RETRY_SECONDS = int(os.getenv("POPEBEATS2TUBE_LEADER_RETRY_SECONDS", 10))
 
 # Switches
 KILL_SWITCH_ENABLED = os.getenv("POPEBEATS2TUBE_KILL_SWITCH", "false").lower() == "true"
 MAINTENANCE_MODE_ENABLED = os.getenv("POPEBEATS2TUBE_MAINTENANCE_MODE", "false").lower() == "true"
+# Off for API processes when the pipeline runs in `python -m app.worker`.
+SCHEDULER_ENABLED = os.getenv("POPEBEATS2TUBE_SCHEDULER_ENABLED", "true").lower() == "true"
 
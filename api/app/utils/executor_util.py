@@ -0,0 +1,227 @@
+"""
+Thread pools for blocking work.
+
+Blocking calls run on named pools, one per kind of work, so slow work of one kind
+cannot starve another: long renders or uploads never hold the threads quick database
+calls need.
+
+- db: SQLAlchemy calls of the repository layer and the upload pipeline.
+- fs: file moves, copies and deletes on the share.
+- upload-io: reads of the video files being uploaded.
+- subprocess-wait: threads waiting on ffmpeg and ffprobe.
+
+Each pool exports its size, running and queued calls, and the time calls waited for a
+thread. A call that waited longer than `EXECUTOR_WAIT_WARNING_SECONDS` means the pool is
+saturated, which is logged at most once a minute per pool.
+
+Every pool can be resized while it is busy: a new pool takes all new work, and the
+old one shuts down once the calls already handed to it have finished. The same goes
+for the event loop's default executor (`asyncio.to_thread`, DNS lookups), sized by
+`IO_EXECUTOR_WORKERS`.
+
+Metrics (labelled with the executor):
+-------------------------------------
+- executor.max_workers: threads in the pool.
+- executor.active: calls running.
+- executor.queued: calls waiting for a thread.
+- executor.calls: calls submitted.
+- executor.wait_seconds: total time calls waited for a thread.
+- executor.busy_seconds: total time calls ran.
+- executor.saturated: calls that waited longer than the warning threshold.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from app.logger.logging_setup import logger
+from app.settings.env_settings import (
+    EXECUTOR_DB_WORKERS,
+    EXECUTOR_FS_WORKERS,
+    EXECUTOR_SUBPROCESS_WAIT_WORKERS,
+    EXECUTOR_UPLOAD_IO_WORKERS,
+    EXECUTOR_WAIT_WARNING_SECONDS,
+    IO_EXECUTOR_WORKERS
+)
+from app.utils.metrics_util import increment_counter, set_gauge
+
+T = TypeVar("T")
+
+EXECUTOR_DB = "db"
+EXECUTOR_FS = "fs"
+EXECUTOR_UPLOAD_IO = "upload-io"
+EXECUTOR_SUBPROCESS_WAIT = "subprocess-wait"
+
+# Saturation of a pool is logged at most this often.
+SATURATION_WARNING_INTERVAL_SECONDS = 60
+
+
+class NamedExecutor:
+    """
+    A thread pool for one kind of blocking work.
+
+    With `finish_on_cancel`, a caller cancelled while its call runs waits for the call
+    to return before the cancellation propagates, so what it passed in (a database
+    session) is not closed under the running call.
+    """
+    def __init__(self, name: str, max_workers: int, finish_on_cancel: bool = False):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.finish_on_cancel = finish_on_cancel
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._last_warning_at: Optional[float] = None
+        set_gauge("executor.max_workers", self.max_workers, executor=name)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs `func(*args, **kwargs)` on a thread of this pool, in the caller's context
+        (like `asyncio.to_thread`), and returns its result.
+        """
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        with self._lock:
+            self._queued += 1
+        increment_counter("executor.calls", executor=self.name)
+        submitted = self._pool.submit(self._call, call, time.monotonic())
+        submitted.add_done_callback(self._on_done)
+        self._report()
+
+        future = asyncio.wrap_future(submitted)
+        if not self.finish_on_cancel:
+            return await future
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            while not future.done():
+                try:
+                    await asyncio.wait([future])
+                except asyncio.CancelledError:
+                    pass
+            raise
+
+    def resize(self, max_workers: int):
+        """
+        Moves new work to a pool of `max_workers` threads. Calls running or queued on
+        the previous pool complete there.
+        """
+        max_workers = max(1, max_workers)
+        if max_workers == self.max_workers:
+            return
+        previous = self._pool
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self.name)
+        self.max_workers = max_workers
+        previous.shutdown(wait=False)
+        set_gauge("executor.max_workers", max_workers, executor=self.name)
+        logger.info(f"Executor '{self.name}' resized to {max_workers} worker(s).")
+
+    def _call(self, call: Callable[[], T], submitted_at: float) -> T:
+        waited = time.monotonic() - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        increment_counter("executor.wait_seconds", waited, executor=self.name)
+        if waited > EXECUTOR_WAIT_WARNING_SECONDS:
+            self._report_saturation(waited)
+        self._report()
+
+        started_at = time.monotonic()
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self._active -= 1
+            increment_counter("executor.busy_seconds", time.monotonic() - started_at, executor=self.name)
+            self._report()
+
+    def _on_done(self, submitted: Future):
+        # Cancelled before a thread picked it up, so `_call` never ran.
+        if submitted.cancelled():
+            with self._lock:
+                self._queued -= 1
+            self._report()
+
+    def _report_saturation(self, waited: float):
+        increment_counter("executor.saturated", executor=self.name)
+        now = time.monotonic()
+        with self._lock:
+            if self._last_warning_at is not None and now - self._last_warning_at < SATURATION_WARNING_INTERVAL_SECONDS:
+                return
+            self._last_warning_at = now
+            active, queued = self._active, self._queued
+        logger.warning(
+            f"Executor '{self.name}' is saturated: a call waited {waited:.1f}s for a thread "
+            f"({active}/{self.max_workers} busy, {queued} queued)."
+        )
+
+    def _report(self):
+        with self._lock:
+            active, queued = self._active, self._queued
+        set_gauge("executor.active", active, executor=self.name)
+        set_gauge("executor.queued", queued, executor=self.name)
+
+
+_executors: Dict[str, NamedExecutor] = {
+    EXECUTOR_DB: NamedExecutor(EXECUTOR_DB, EXECUTOR_DB_WORKERS, finish_on_cancel=True),
+    EXECUTOR_FS: NamedExecutor(EXECUTOR_FS, EXECUTOR_FS_WORKERS),
+    EXECUTOR_UPLOAD_IO: NamedExecutor(EXECUTOR_UPLOAD_IO, EXECUTOR_UPLOAD_IO_WORKERS),
+    EXECUTOR_SUBPROCESS_WAIT: NamedExecutor(EXECUTOR_SUBPROCESS_WAIT, EXECUTOR_SUBPROCESS_WAIT_WORKERS),
+}
+
+
+async def run_blocking(executor: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs `func(*args, **kwargs)` on the named executor and returns its result.
+    """
+    return await _executors[executor].run(func, *args, **kwargs)
+
+
+def in_executor(executor: str) -> Callable[[Callable[..., T]], Callable[..., Awaitable[T]]]:
+    """
+    Turns a blocking function into a coroutine function that runs it on the named executor.
+    """
+    def decorate(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def run(*args, **kwargs) -> Any:
+            return await _executors[executor].run(func, *args, **kwargs)
+        return run
+    return decorate
+
+
+def resize_executor(executor: str, max_workers: int):
+    _executors[executor].resize(max_workers)
+
+
+def get_executor_sizes() -> Dict[str, int]:
+    return {name: executor.max_workers for name, executor in _executors.items()}
+
+
+_default_executor: Optional[ThreadPoolExecutor] = None
+_default_executor_size = IO_EXECUTOR_WORKERS
+
+
+def resize_default_executor(max_workers: int = IO_EXECUTOR_WORKERS):
+    """
+    Makes a pool of `max_workers` threads the running loop's default executor.
+    Calls still running or queued on the previous pool complete there.
+    """
+    global _default_executor, _default_executor_size
+    max_workers = max(1, max_workers)
+    if _default_executor is not None and _default_executor_size == max_workers:
+        return
+
+    previous = _default_executor
+    _default_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="io")
+    _default_executor_size = max_workers
+    asyncio.get_running_loop().set_default_executor(_default_executor)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    set_gauge("executor.max_workers", max_workers, executor="default")
+    logger.info(f"Default thread pool resized to {max_workers} worker(s).")
+
+
+def get_default_executor_size() -> int:
+    return _default_executor_size
@@ -92,18 +92,19 @@ def response_201(title: str, message: str, data: Any = None) -> JSONResponse:
     """
     return create_response(201, title, message, data)
 
-def response_202(message: str, data: Any = None) -> JSONResponse:
+def response_202(title: str, message: str, data: Any = None) -> JSONResponse:
     """
     Creates a response for 202 Accepted status code.
     
     Args:
+    - title (str): The title of the response.
     - message (str): A descriptive message for the response.
     - data (Any): Optional response data.
 
     Returns:
     - JSONResponse: A standardized 202 Accepted response.
     """
-    return create_response(202, message, data)
+    return create_response(202, title, message, data)
 
 def response_204() -> JSONResponse:
     """
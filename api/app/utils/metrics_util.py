@@ -0,0 +1,58 @@
+"""
+In-process metrics registry.
+
+This module keeps thread-safe counters and gauges that background components
+(retry engine, upload pipeline, schedulers) update, and that the system health
+endpoint exposes for monitoring.
+
+Metric names are dotted strings; optional labels are folded into the key, e.g.
+`retry.attempts{operation=youtube_upload_chunk}`.
+"""
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+
+def _metric_key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+def increment_counter(name: str, value: float = 1, **labels) -> None:
+    """
+    Increment a monotonically increasing counter.
+
+    Args:
+    - name (str): The metric name.
+    - value (float): The amount to add.
+    - labels: Optional labels distinguishing series of the same metric.
+    """
+    key = _metric_key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """
+    Set a gauge to the given value.
+
+    Args:
+    - name (str): The metric name.
+    - value (float): The current value.
+    - labels: Optional labels distinguishing series of the same metric.
+    """
+    key = _metric_key(name, labels)
+    with _lock:
+        _gauges[key] = value
+
+def get_metrics_snapshot() -> dict:
+    """
+    Returns a point-in-time copy of all counters and gauges.
+    """
+    with _lock:
+        return {
+            "counters": dict(sorted(_counters.items())),
+            "gauges": dict(sorted(_gauges.items())),
+        }
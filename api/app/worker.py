@@ -0,0 +1,45 @@
+"""
+Worker Process
+==============
+Runs the upload pipeline (scheduler, rendering, uploads and processing status polls)
+outside the API server, so ffmpeg load never competes with API traffic and workers
+scale independently of the API.
+
+Start any number of workers with `python -m app.worker`; tune leases keep them from
+processing the same tune. Run the API with `POPEBEATS2TUBE_SCHEDULER_ENABLED=false`
+so it only stores and enqueues tunes.
+"""
+import asyncio
+import signal
+import sys
+from app.jobs.background_jobs import start_background_jobs, stop_background_jobs
+from app.logger.logging_setup import logger
+from app.settings.env_settings import KILL_SWITCH_ENABLED
+
+async def run_worker():
+    stop_requested = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_requested.set)
+        except NotImplementedError:
+            # Windows has no loop signal handlers; Ctrl+C still interrupts asyncio.run.
+            pass
+
+    start_background_jobs()
+    logger.info("Worker: Started.")
+    try:
+        await stop_requested.wait()
+        logger.info("Worker: Stop requested.")
+    finally:
+        await stop_background_jobs()
+        logger.info("Worker: Stopped.")
+
+def main():
+    if KILL_SWITCH_ENABLED:
+        logger.critical("KILL SWITCH ENABLED. WORKER WILL NOT START.")
+        sys.exit(1)
+    asyncio.run(run_worker())
+
+if __name__ == "__main__":
+    main()
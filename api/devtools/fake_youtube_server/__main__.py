@@ -0,0 +1,8 @@
+"""
+Runs the fake YouTube server: `python -m devtools.fake_youtube_server` from the `api` directory.
+"""
+import uvicorn
+from devtools.fake_youtube_server import fake_youtube_settings as settings
+
+if __name__ == "__main__":
+    uvicorn.run("devtools.fake_youtube_server.fake_youtube_app:app", host=settings.HOST, port=settings.PORT)
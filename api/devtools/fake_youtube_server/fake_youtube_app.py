@@ -0,0 +1,294 @@
+"""
+Fake YouTube Data API and Google OAuth token server for offline load testing.
+
+Implements the subset of the real APIs the application uses:
+
+- `POST /token`: OAuth token endpoint (refresh_token and authorization_code grants).
+- `POST /upload/youtube/v3/videos?uploadType=resumable`: resumable `videos.insert` initiation.
+- `PUT  /upload/youtube/v3/videos?upload_id=...`: chunk uploads and `bytes */N` status queries.
+- `GET  /youtube/v3/videos`: `videos.list` with status, processingDetails and snippet parts.
+- `GET  /youtube/v3/channels`: `channels.list(mine=true)` with the uploads playlist.
+- `GET  /youtube/v3/playlistItems`: `playlistItems.list` of a channel's uploads playlist, newest first.
+
+Latency, ingest bandwidth, error injection and the daily quota are configured in
+`fake_youtube_settings`. `GET /_fake/state` and `POST /_fake/reset` inspect and
+reset the server between runs.
+"""
+import asyncio
+import random
+import re
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.responses import JSONResponse, Response
+from devtools.fake_youtube_server import fake_youtube_settings as settings
+from devtools.fake_youtube_server.fake_youtube_state import owner_of_uploads_playlist, state, uploads_playlist_id
+
+UPLOAD_PATH = "/upload/youtube/v3/videos"
+CHUNK_GRANULARITY = 256 * 1024
+MAX_LIST_IDS = 50
+
+app = FastAPI(title="Fake YouTube Data API", docs_url="/_fake/docs", openapi_url="/_fake/openapi.json")
+
+
+class IngestLimiter:
+    """
+    Paces how fast upload bodies are read, emulating a constrained link.
+    """
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._next_free = time.monotonic()
+
+    async def consume(self, nbytes: int):
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self._next_free = max(self._next_free, now) + nbytes / self.rate
+        await asyncio.sleep(self._next_free - now)
+
+
+ingest_limiter = IngestLimiter(settings.BANDWIDTH)
+
+
+@app.middleware("http")
+async def fault_injection_middleware(request: Request, call_next):
+    if request.url.path.startswith("/_fake"):
+        return await call_next(request)
+
+    state.stats[f"{request.method} {request.url.path}"] += 1
+
+    delay_ms = settings.LATENCY_MS + random.uniform(0, settings.LATENCY_JITTER_MS)
+    if delay_ms > 0:
+        await asyncio.sleep(delay_ms / 1000)
+
+    if settings.ERROR_RATE > 0 and random.random() < settings.ERROR_RATE:
+        status = random.choice(settings.ERROR_STATUSES or [503])
+        state.stats[f"injected_{status}"] += 1
+        headers = {}
+        if status in (429, 503) and settings.ERROR_RETRY_AFTER:
+            headers["Retry-After"] = settings.ERROR_RETRY_AFTER
+        reason = "rateLimitExceeded" if status == 429 else "backendError"
+        return _google_error(status, reason, "Injected failure.", headers)
+
+    return await call_next(request)
+
+
+@app.post("/token")
+async def token(request: Request):
+    # Parsed by hand: FastAPI's Form() would pull in python-multipart just for this.
+    form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+    grant_type = form.get("grant_type")
+    refresh_token = form.get("refresh_token")
+    code = form.get("code")
+
+    if grant_type == "refresh_token":
+        if not refresh_token:
+            return JSONResponse(status_code=400, content={"error": "invalid_request", "error_description": "Missing refresh_token."})
+        if refresh_token.startswith("revoked"):
+            return JSONResponse(status_code=400, content={"error": "invalid_grant", "error_description": "Token has been expired or revoked."})
+        owner = refresh_token
+        issued_refresh_token = None
+    elif grant_type == "authorization_code":
+        if not code:
+            return JSONResponse(status_code=400, content={"error": "invalid_request", "error_description": "Missing code."})
+        owner = f"refresh-{code}"
+        issued_refresh_token = owner
+    else:
+        return JSONResponse(status_code=400, content={"error": "unsupported_grant_type"})
+
+    content = {
+        "access_token": state.issue_access_token(owner),
+        "expires_in": settings.TOKEN_EXPIRES_IN,
+        "token_type": "Bearer",
+        "scope": "https://www.googleapis.com/auth/youtube.upload",
+    }
+    if issued_refresh_token:
+        content["refresh_token"] = issued_refresh_token
+    return JSONResponse(status_code=200, content=content)
+
+
+@app.post(UPLOAD_PATH)
+async def initiate_upload(
+    request: Request,
+    upload_type: str = Query(..., alias="uploadType"),
+    authorization: Optional[str] = Header(None),
+    x_upload_content_length: Optional[int] = Header(None)
+):
+    owner = _authenticate(authorization)
+    if owner is None:
+        return _google_error(401, "authError", "Invalid Credentials")
+    if upload_type != "resumable":
+        return _google_error(400, "invalidUploadType", "Only resumable uploads are supported.")
+    if not state.try_charge_quota(settings.INSERT_COST):
+        return _quota_exceeded()
+
+    metadata = await request.json() if int(request.headers.get("content-length", 0)) else {}
+    session = state.create_session(owner, x_upload_content_length, metadata)
+    location = f"{settings.PUBLIC_BASE_URL}{UPLOAD_PATH}?uploadType=resumable&upload_id={session.session_id}"
+    return Response(status_code=200, headers={"Location": location})
+
+
+@app.put(UPLOAD_PATH)
+async def upload_chunk(
+    request: Request,
+    upload_id: str = Query(...),
+    content_range: Optional[str] = Header(None)
+):
+    session = state.sessions.get(upload_id)
+    if session is None:
+        return _google_error(404, "notFound", "Upload session not found or expired.")
+
+    if session.video_id:
+        return JSONResponse(status_code=200, content=state.videos[session.video_id].to_resource({"snippet", "status"}))
+
+    status_query = re.fullmatch(r"bytes \*/(\d+|\*)", content_range or "")
+    if status_query:
+        return _resume_incomplete(session)
+
+    chunk = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+|\*)", content_range or "")
+    if not chunk:
+        return _google_error(400, "badContent", "Missing or invalid Content-Range header.")
+
+    start, end, total = chunk.groups()
+    start, end = int(start), int(end)
+    if total != "*":
+        session.total_size = int(total)
+    if start > session.committed:
+        return _google_error(400, "badContent", f"Chunk starts at {start}, expected {session.committed}.")
+
+    fail_partially = settings.PARTIAL_CHUNK_RATE > 0 and random.random() < settings.PARTIAL_CHUNK_RATE
+    expected = end - start + 1
+    received = 0
+    async for data in request.stream():
+        await ingest_limiter.consume(len(data))
+        received += len(data)
+        if fail_partially and received >= expected // 2:
+            break
+
+    if fail_partially:
+        # Commit only whole 256 KiB blocks of what arrived, like YouTube does.
+        accepted = (received // CHUNK_GRANULARITY) * CHUNK_GRANULARITY
+        session.committed = max(session.committed, start + accepted)
+        state.stats["injected_partial_chunk"] += 1
+        return _google_error(503, "backendError", "Injected partial chunk failure.")
+
+    session.committed = max(session.committed, start + received)
+    if session.total_size is not None and session.committed >= session.total_size:
+        video = state.complete_session(session)
+        return JSONResponse(status_code=201, content=video.to_resource({"snippet", "status"}))
+    return _resume_incomplete(session)
+
+
+@app.get("/youtube/v3/videos")
+async def list_videos(
+    part: str = Query(...),
+    id: str = Query(...),
+    authorization: Optional[str] = Header(None)
+):
+    if _authenticate(authorization) is None:
+        return _google_error(401, "authError", "Invalid Credentials")
+    if not state.try_charge_quota(1):
+        return _quota_exceeded()
+
+    ids = [video_id for video_id in id.split(",") if video_id]
+    if len(ids) > MAX_LIST_IDS:
+        return _google_error(400, "invalidFilters", f"At most {MAX_LIST_IDS} ids may be requested.")
+
+    parts = {p.strip() for p in part.split(",")}
+    items = [state.videos[video_id].to_resource(parts) for video_id in ids if video_id in state.videos]
+    return JSONResponse(status_code=200, content={
+        "kind": "youtube#videoListResponse",
+        "items": items,
+        "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)},
+    })
+
+
+@app.get("/youtube/v3/channels")
+async def list_channels(
+    part: str = Query(...),
+    mine: bool = Query(False),
+    authorization: Optional[str] = Header(None)
+):
+    owner = _authenticate(authorization)
+    if owner is None:
+        return _google_error(401, "authError", "Invalid Credentials")
+    if not mine:
+        return _google_error(400, "missingRequiredParameter", "Only mine=true is supported.")
+    if not state.try_charge_quota(1):
+        return _quota_exceeded()
+
+    channel = {"kind": "youtube#channel", "id": "UC" + uploads_playlist_id(owner)[2:]}
+    if "contentDetails" in part:
+        channel["contentDetails"] = {"relatedPlaylists": {"uploads": uploads_playlist_id(owner)}}
+    return JSONResponse(status_code=200, content={"kind": "youtube#channelListResponse", "items": [channel]})
+
+
+@app.get("/youtube/v3/playlistItems")
+async def list_playlist_items(
+    part: str = Query(...),
+    playlist_id: str = Query(..., alias="playlistId"),
+    max_results: int = Query(5, alias="maxResults", ge=0, le=MAX_LIST_IDS),
+    authorization: Optional[str] = Header(None)
+):
+    if _authenticate(authorization) is None:
+        return _google_error(401, "authError", "Invalid Credentials")
+    if not state.try_charge_quota(1):
+        return _quota_exceeded()
+
+    owner = owner_of_uploads_playlist(playlist_id, {video.owner for video in state.videos.values()})
+    uploads = state.recent_uploads(owner, max_results) if owner else []
+    items = [
+        {
+            "kind": "youtube#playlistItem",
+            "contentDetails": {"videoId": video.video_id},
+        }
+        for video in uploads
+    ]
+    return JSONResponse(status_code=200, content={
+        "kind": "youtube#playlistItemListResponse",
+        "items": items,
+        "pageInfo": {"totalResults": len(items), "resultsPerPage": max_results},
+    })
+
+
+@app.get("/_fake/state")
+async def get_state():
+    return state.snapshot()
+
+
+@app.post("/_fake/reset")
+async def reset_state():
+    state.reset()
+    return Response(status_code=204)
+
+
+def _authenticate(authorization: Optional[str]) -> Optional[str]:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    return state.owner_of(authorization.split(" ", 1)[1].strip())
+
+
+def _resume_incomplete(session) -> Response:
+    headers = {}
+    if session.committed > 0:
+        headers["Range"] = f"bytes=0-{session.committed - 1}"
+    return Response(status_code=308, headers=headers)
+
+
+def _quota_exceeded() -> JSONResponse:
+    return _google_error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota.", domain="youtube.quota")
+
+
+def _google_error(status: int, reason: str, message: str, headers: Optional[dict] = None, domain: str = "global") -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        headers=headers,
+        content={
+            "error": {
+                "code": status,
+                "message": message,
+                "errors": [{"message": message, "domain": domain, "reason": reason}],
+            }
+        },
+    )
@@ -0,0 +1,42 @@
+"""
+Settings for the fake YouTube Data API / OAuth token server.
+
+All values are read from `FAKE_YOUTUBE_*` environment variables so the server can be
+tuned per load-test run without touching the application configuration.
+"""
+import os
+
+# Server
+HOST = os.getenv("FAKE_YOUTUBE_HOST", "127.0.0.1")
+PORT = int(os.getenv("FAKE_YOUTUBE_PORT", 9000))
+
+# Base URL handed out in resumable session `Location` headers.
+PUBLIC_BASE_URL = os.getenv("FAKE_YOUTUBE_PUBLIC_BASE_URL", f"http://{HOST}:{PORT}").rstrip("/")
+
+# Latency added to every request: a fixed part plus a uniformly random jitter.
+LATENCY_MS = float(os.getenv("FAKE_YOUTUBE_LATENCY_MS", 0))
+LATENCY_JITTER_MS = float(os.getenv("FAKE_YOUTUBE_LATENCY_JITTER_MS", 0))
+
+# Rate at which upload bodies are ingested, in bytes per second (0 = unlimited).
+BANDWIDTH = int(os.getenv("FAKE_YOUTUBE_BANDWIDTH", 0))
+
+# Fraction of requests (0..1) answered with an injected error instead of being served.
+ERROR_RATE = float(os.getenv("FAKE_YOUTUBE_ERROR_RATE", 0))
+# Status codes injected errors are drawn from.
+ERROR_STATUSES = [int(code) for code in os.getenv("FAKE_YOUTUBE_ERROR_STATUSES", "500,503").split(",") if code.strip()]
+# Retry-After value (seconds) sent with injected 429/503 responses; empty to omit it.
+ERROR_RETRY_AFTER = os.getenv("FAKE_YOUTUBE_ERROR_RETRY_AFTER", "")
+# Fraction of upload chunks that fail after only part of the body was committed.
+PARTIAL_CHUNK_RATE = float(os.getenv("FAKE_YOUTUBE_PARTIAL_CHUNK_RATE", 0))
+
+# Daily quota in units; videos.insert costs INSERT_COST units, list calls 1 unit.
+QUOTA_LIMIT = int(os.getenv("FAKE_YOUTUBE_QUOTA_LIMIT", 10000))
+INSERT_COST = int(os.getenv("FAKE_YOUTUBE_INSERT_COST", 1600))
+
+# Seconds an uploaded video stays in `processing` before it is reported as processed.
+PROCESSING_SECONDS = float(os.getenv("FAKE_YOUTUBE_PROCESSING_SECONDS", 30))
+# Fraction of uploaded videos that end up rejected instead of processed.
+REJECTION_RATE = float(os.getenv("FAKE_YOUTUBE_REJECTION_RATE", 0))
+
+# Lifetime of issued access tokens.
+TOKEN_EXPIRES_IN = int(os.getenv("FAKE_YOUTUBE_TOKEN_EXPIRES_IN", 3599))
@@ -0,0 +1,160 @@
+"""
+In-memory state of the fake YouTube server: resumable upload sessions, uploaded
+videos, issued tokens, quota consumption and request statistics.
+"""
+import random
+import string
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+from app.components.quota.quota_utils import get_quota_day
+from devtools.fake_youtube_server import fake_youtube_settings as settings
+
+
+class UploadSession:
+    def __init__(self, session_id: str, owner: str, total_size: Optional[int], metadata: dict):
+        self.session_id = session_id
+        self.owner = owner
+        self.total_size = total_size
+        self.metadata = metadata
+        self.committed = 0
+        self.video_id: Optional[str] = None
+        self.created_at = time.time()
+
+
+class FakeVideo:
+    def __init__(self, video_id: str, owner: str, metadata: dict, size: int):
+        self.video_id = video_id
+        self.owner = owner
+        self.metadata = metadata
+        self.size = size
+        self.uploaded_at = time.time()
+        self.rejected = random.random() < settings.REJECTION_RATE
+
+    def to_resource(self, parts: set) -> dict:
+        snippet = self.metadata.get("snippet", {})
+        resource = {"kind": "youtube#video", "id": self.video_id}
+        processed = time.time() - self.uploaded_at >= settings.PROCESSING_SECONDS
+
+        if "snippet" in parts:
+            resource["snippet"] = {
+                "title": snippet.get("title", ""),
+                "description": snippet.get("description", ""),
+                "tags": snippet.get("tags", []),
+                "categoryId": snippet.get("categoryId"),
+                "channelId": _channel_id(self.owner),
+            }
+        if "status" in parts:
+            if not processed:
+                upload_status = "uploaded"
+            else:
+                upload_status = "rejected" if self.rejected else "processed"
+            resource["status"] = {
+                "uploadStatus": upload_status,
+                "privacyStatus": self.metadata.get("status", {}).get("privacyStatus", "private"),
+            }
+            if upload_status == "rejected":
+                resource["status"]["rejectionReason"] = "duplicate"
+        if "processingDetails" in parts:
+            if not processed:
+                processing_status = "processing"
+            else:
+                processing_status = "failed" if self.rejected else "succeeded"
+            resource["processingDetails"] = {"processingStatus": processing_status}
+        return resource
+
+
+class FakeYouTubeState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.sessions: Dict[str, UploadSession] = {}
+            self.videos: Dict[str, FakeVideo] = {}
+            # access token -> owner (refresh token); the owner stands in for the channel.
+            self.access_tokens: Dict[str, str] = {}
+            self.quota_used = 0
+            # Resets at midnight Pacific time, like YouTube's quota.
+            self.quota_day = get_quota_day().isoformat()
+            self.stats = Counter()
+
+    def issue_access_token(self, owner: str) -> str:
+        token = f"fake-{uuid.uuid4().hex}"
+        with self.lock:
+            self.access_tokens[token] = owner
+        return token
+
+    def owner_of(self, access_token: str) -> str:
+        # Unknown tokens are accepted so the app can start with tokens stored before the
+        # switch to the fake server; they map to a channel of their own.
+        return self.access_tokens.get(access_token, access_token)
+
+    def try_charge_quota(self, units: int) -> bool:
+        with self.lock:
+            today = get_quota_day().isoformat()
+            if today != self.quota_day:
+                self.quota_day = today
+                self.quota_used = 0
+            if self.quota_used + units > settings.QUOTA_LIMIT:
+                self.stats["quota_exceeded"] += 1
+                return False
+            self.quota_used += units
+            return True
+
+    def create_session(self, owner: str, total_size: Optional[int], metadata: dict) -> UploadSession:
+        session = UploadSession(uuid.uuid4().hex, owner, total_size, metadata)
+        with self.lock:
+            self.sessions[session.session_id] = session
+        return session
+
+    def complete_session(self, session: UploadSession) -> FakeVideo:
+        with self.lock:
+            if session.video_id:
+                return self.videos[session.video_id]
+            video = FakeVideo(_video_id(), session.owner, session.metadata, session.committed)
+            self.videos[video.video_id] = video
+            session.video_id = video.video_id
+            self.stats["videos_uploaded"] += 1
+            return video
+
+    def recent_uploads(self, owner: str, limit: int) -> list:
+        with self.lock:
+            uploads = [video for video in self.videos.values() if video.owner == owner]
+        uploads.sort(key=lambda video: video.uploaded_at, reverse=True)
+        return uploads[:limit]
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "quota_day": self.quota_day,
+                "quota_used": self.quota_used,
+                "quota_limit": settings.QUOTA_LIMIT,
+                "open_sessions": sum(1 for s in self.sessions.values() if not s.video_id),
+                "videos": len(self.videos),
+                "stats": dict(self.stats),
+            }
+
+
+def _video_id() -> str:
+    alphabet = string.ascii_letters + string.digits + "-_"
+    return "".join(random.choice(alphabet) for _ in range(11))
+
+
+def _channel_id(owner: str) -> str:
+    return "UC" + uuid.uuid5(uuid.NAMESPACE_OID, owner).hex[:22]
+
+
+def uploads_playlist_id(owner: str) -> str:
+    # Like YouTube, the uploads playlist ID is the channel ID with a "UU" prefix.
+    return "UU" + _channel_id(owner)[2:]
+
+
+def owner_of_uploads_playlist(playlist_id: str, owners) -> Optional[str]:
+    return next((owner for owner in owners if uploads_playlist_id(owner) == playlist_id), None)
+
+
+state = FakeYouTubeState()
@@ -0,0 +1,28 @@
+"""add resumable upload checkpoint
+
+Revision ID: 224250bf8cf5
+Revises: 343aba6dc949
+Create Date: 2026-10-18 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '224250bf8cf5'
+down_revision: Union[str, None] = '343aba6dc949'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('upload_session_uri', sa.String(length=2048), nullable=True))
+    op.add_column('tunes', sa.Column('upload_bytes_committed', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tunes', 'upload_bytes_committed')
+    op.drop_column('tunes', 'upload_session_uri')
@@ -0,0 +1,32 @@
+"""add tune processing lease
+
+Revision ID: 3ef7ce8901f1
+Revises: e1bc8edf6729
+Create Date: 2026-10-18 17:05:12.734519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ef7ce8901f1'
+down_revision: Union[str, None] = 'e1bc8edf6729'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('lease_owner', sa.String(length=128), nullable=True))
+    op.add_column('tunes', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('tunes', sa.Column('attempt_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_tunes_lease_expires_at'), 'tunes', ['lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tunes_lease_expires_at'), table_name='tunes')
+    op.drop_column('tunes', 'attempt_count')
+    op.drop_column('tunes', 'lease_expires_at')
+    op.drop_column('tunes', 'lease_owner')
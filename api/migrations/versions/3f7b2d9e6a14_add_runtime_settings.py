@@ -0,0 +1,31 @@
+"""add runtime settings
+
+Revision ID: 3f7b2d9e6a14
+Revises: 8c2e4f7a1d90
+Create Date: 2026-10-19 09:12:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7b2d9e6a14'
+down_revision: Union[str, None] = '8c2e4f7a1d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('runtime_settings',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.String(length=255), nullable=False),
+    sa.Column('date_updated', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('runtime_settings')
@@ -0,0 +1,32 @@
+"""add video processing status
+
+Revision ID: 53585bd1fac0
+Revises: 6e1358d26ea1
+Create Date: 2026-10-18 15:12:44.903126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '53585bd1fac0'
+down_revision: Union[str, None] = '6e1358d26ea1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('processing_status', sa.String(length=32), nullable=True))
+    op.add_column('tunes', sa.Column('processing_failure_reason', sa.String(length=255), nullable=True))
+    op.add_column('tunes', sa.Column('processing_checked_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_tunes_processing_status'), 'tunes', ['processing_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tunes_processing_status'), table_name='tunes')
+    op.drop_column('tunes', 'processing_checked_at')
+    op.drop_column('tunes', 'processing_failure_reason')
+    op.drop_column('tunes', 'processing_status')
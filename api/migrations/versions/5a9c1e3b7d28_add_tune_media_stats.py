@@ -0,0 +1,30 @@
+"""add tune media stats
+
+Revision ID: 5a9c1e3b7d28
+Revises: 3f7b2d9e6a14
+Create Date: 2026-10-19 14:03:51.640217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9c1e3b7d28'
+down_revision: Union[str, None] = '3f7b2d9e6a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('audio_duration_seconds', sa.Float(), nullable=True))
+    op.add_column('tunes', sa.Column('video_size_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('tunes', sa.Column('render_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tunes', 'render_seconds')
+    op.drop_column('tunes', 'video_size_bytes')
+    op.drop_column('tunes', 'audio_duration_seconds')
@@ -0,0 +1,47 @@
+"""add tune failure tracking
+
+Revision ID: 5d9a61f3c2b8
+Revises: b74d20c9e5a3
+Create Date: 2026-10-18 23:20:07.581942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a61f3c2b8'
+down_revision: Union[str, None] = 'b74d20c9e5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('last_error', sa.String(length=1024), nullable=True))
+    op.add_column('tunes', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_tunes_next_attempt_at'), 'tunes', ['next_attempt_at'], unique=False)
+
+    # Requeues and retry times must reach the schedulers of other processes too.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS tunes_schedule_notify ON tunes;")
+        op.execute("""
+            CREATE TRIGGER tunes_schedule_notify
+            AFTER INSERT OR DELETE OR UPDATE OF upload_date, executed, status, next_attempt_at ON tunes
+            FOR EACH ROW EXECUTE PROCEDURE notify_tune_schedule_changed();
+        """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS tunes_schedule_notify ON tunes;")
+        op.execute("""
+            CREATE TRIGGER tunes_schedule_notify
+            AFTER INSERT OR DELETE OR UPDATE OF upload_date, executed ON tunes
+            FOR EACH ROW EXECUTE PROCEDURE notify_tune_schedule_changed();
+        """)
+
+    op.drop_index(op.f('ix_tunes_next_attempt_at'), table_name='tunes')
+    op.drop_column('tunes', 'next_attempt_at')
+    op.drop_column('tunes', 'last_error')
@@ -0,0 +1,47 @@
+"""add upload attempts and video id
+
+Revision ID: 6e1358d26ea1
+Revises: 97eb73364a9a
+Create Date: 2026-10-18 13:41:05.218347
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1358d26ea1'
+down_revision: Union[str, None] = '97eb73364a9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('youtube_video_id', sa.String(length=32), nullable=True))
+    op.add_column('tunes', sa.Column('upload_idempotency_token', sa.String(length=36), nullable=True))
+    op.create_index(op.f('ix_tunes_youtube_video_id'), 'tunes', ['youtube_video_id'], unique=False)
+    op.create_table('tune_upload_attempts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tune_id', sa.Integer(), nullable=False),
+    sa.Column('idempotency_token', sa.String(length=36), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('outcome', sa.String(length=32), nullable=False),
+    sa.Column('youtube_video_id', sa.String(length=32), nullable=True),
+    sa.Column('error', sa.String(length=1024), nullable=True),
+    sa.ForeignKeyConstraint(['tune_id'], ['tunes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tune_upload_attempts_id'), 'tune_upload_attempts', ['id'], unique=False)
+    op.create_index(op.f('ix_tune_upload_attempts_tune_id'), 'tune_upload_attempts', ['tune_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tune_upload_attempts_tune_id'), table_name='tune_upload_attempts')
+    op.drop_index(op.f('ix_tune_upload_attempts_id'), table_name='tune_upload_attempts')
+    op.drop_table('tune_upload_attempts')
+    op.drop_index(op.f('ix_tunes_youtube_video_id'), table_name='tunes')
+    op.drop_column('tunes', 'upload_idempotency_token')
+    op.drop_column('tunes', 'youtube_video_id')
@@ -0,0 +1,32 @@
+"""add leader leases
+
+Revision ID: 8c2e4f7a1d90
+Revises: 5d9a61f3c2b8
+Create Date: 2026-10-18 23:55:41.204718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e4f7a1d90'
+down_revision: Union[str, None] = '5d9a61f3c2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('leader_leases',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('holder', sa.String(length=128), nullable=True),
+    sa.Column('acquired_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('leader_leases')
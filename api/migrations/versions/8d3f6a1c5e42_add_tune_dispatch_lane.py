@@ -0,0 +1,26 @@
+"""add tune dispatch lane
+
+Revision ID: 8d3f6a1c5e42
+Revises: c4d81f6e2a57
+Create Date: 2026-10-20 11:17:05.402936
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a1c5e42'
+down_revision: Union[str, None] = 'c4d81f6e2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('dispatch_lane', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tunes', 'dispatch_lane')
@@ -0,0 +1,40 @@
+"""add youtube quota usage
+
+Revision ID: 97eb73364a9a
+Revises: 224250bf8cf5
+Create Date: 2026-10-18 11:02:17.530981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '97eb73364a9a'
+down_revision: Union[str, None] = '224250bf8cf5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('youtube_quota_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('quota_day', sa.Date(), nullable=False),
+    sa.Column('units_used', sa.Integer(), nullable=False),
+    sa.Column('date_updated', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'user_id', 'quota_day', name='uq_quota_usage_project_user_day')
+    )
+    op.create_index(op.f('ix_youtube_quota_usage_id'), 'youtube_quota_usage', ['id'], unique=False)
+    op.create_index(op.f('ix_youtube_quota_usage_quota_day'), 'youtube_quota_usage', ['quota_day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_youtube_quota_usage_quota_day'), table_name='youtube_quota_usage')
+    op.drop_index(op.f('ix_youtube_quota_usage_id'), table_name='youtube_quota_usage')
+    op.drop_table('youtube_quota_usage')
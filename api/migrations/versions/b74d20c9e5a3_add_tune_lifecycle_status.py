@@ -0,0 +1,71 @@
+"""add tune lifecycle status
+
+Revision ID: b74d20c9e5a3
+Revises: 3ef7ce8901f1
+Create Date: 2026-10-18 22:51:40.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b74d20c9e5a3'
+down_revision: Union[str, None] = '3ef7ce8901f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tunes', sa.Column('status', sa.String(length=32), server_default='queued', nullable=False))
+    op.add_column('tunes', sa.Column('status_changed_at', sa.DateTime(), nullable=True))
+    op.add_column('tunes', sa.Column('render_started_at', sa.DateTime(), nullable=True))
+    op.add_column('tunes', sa.Column('rendered_at', sa.DateTime(), nullable=True))
+    op.add_column('tunes', sa.Column('upload_started_at', sa.DateTime(), nullable=True))
+    op.add_column('tunes', sa.Column('uploaded_at', sa.DateTime(), nullable=True))
+
+    # Backfill from `executed`. Uploaded tunes take the time of their successful
+    # attempt, when one was recorded.
+    tunes = sa.table(
+        'tunes',
+        sa.column('id', sa.Integer),
+        sa.column('executed', sa.Boolean),
+        sa.column('status', sa.String),
+        sa.column('status_changed_at', sa.DateTime),
+        sa.column('uploaded_at', sa.DateTime),
+    )
+    attempts = sa.table(
+        'tune_upload_attempts',
+        sa.column('tune_id', sa.Integer),
+        sa.column('finished_at', sa.DateTime),
+        sa.column('outcome', sa.String),
+    )
+    uploaded_at = (
+        sa.select(sa.func.max(attempts.c.finished_at))
+        .where(attempts.c.tune_id == tunes.c.id, attempts.c.outcome.in_(('succeeded', 'reconciled')))
+        .scalar_subquery()
+    )
+    op.execute(
+        tunes.update()
+        .where(tunes.c.executed == sa.true())
+        .values(status='uploaded', uploaded_at=uploaded_at, status_changed_at=uploaded_at)
+    )
+    op.execute(
+        tunes.update()
+        .where(sa.or_(tunes.c.executed == sa.false(), tunes.c.executed.is_(None)))
+        .values(executed=False, status='queued')
+    )
+
+    op.create_index('ix_tunes_status_upload_date', 'tunes', ['status', 'upload_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tunes_status_upload_date', table_name='tunes')
+    op.drop_column('tunes', 'uploaded_at')
+    op.drop_column('tunes', 'upload_started_at')
+    op.drop_column('tunes', 'rendered_at')
+    op.drop_column('tunes', 'render_started_at')
+    op.drop_column('tunes', 'status_changed_at')
+    op.drop_column('tunes', 'status')
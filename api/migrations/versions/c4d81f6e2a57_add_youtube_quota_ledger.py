@@ -0,0 +1,42 @@
+"""add youtube quota ledger
+
+Revision ID: c4d81f6e2a57
+Revises: 5a9c1e3b7d28
+Create Date: 2026-10-20 09:41:26.118437
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d81f6e2a57'
+down_revision: Union[str, None] = '5a9c1e3b7d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('youtube_quota_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.String(length=255), nullable=False),
+    sa.Column('quota_day', sa.Date(), nullable=False),
+    sa.Column('units_used', sa.Integer(), nullable=False),
+    sa.Column('date_updated', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'quota_day', name='uq_quota_ledger_project_day')
+    )
+    op.create_index(op.f('ix_youtube_quota_ledger_id'), 'youtube_quota_ledger', ['id'], unique=False)
+    # Carry over the project totals of the days already recorded per user.
+    op.execute(
+        "INSERT INTO youtube_quota_ledger (project_id, quota_day, units_used, date_updated) "
+        "SELECT project_id, quota_day, SUM(units_used), MAX(date_updated) "
+        "FROM youtube_quota_usage GROUP BY project_id, quota_day"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_youtube_quota_ledger_id'), table_name='youtube_quota_ledger')
+    op.drop_table('youtube_quota_ledger')
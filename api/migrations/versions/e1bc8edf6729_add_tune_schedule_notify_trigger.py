@@ -0,0 +1,50 @@
+"""add tune schedule notify trigger
+
+Revision ID: e1bc8edf6729
+Revises: 53585bd1fac0
+Create Date: 2026-10-18 16:27:31.550418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1bc8edf6729'
+down_revision: Union[str, None] = '53585bd1fac0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # LISTEN/NOTIFY only exists on Postgres; other databases rely on the scheduler's sweep.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_tune_schedule_changed() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('tune_schedule', OLD.id::text);
+            ELSE
+                PERFORM pg_notify('tune_schedule', NEW.id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER tunes_schedule_notify
+        AFTER INSERT OR DELETE OR UPDATE OF upload_date, executed ON tunes
+        FOR EACH ROW EXECUTE PROCEDURE notify_tune_schedule_changed();
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS tunes_schedule_notify ON tunes;")
+    op.execute("DROP FUNCTION IF EXISTS notify_tune_schedule_changed();")
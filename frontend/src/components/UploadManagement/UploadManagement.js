@@ -44,7 +44,8 @@ function UploadManagement() {
 
       const filters = {
         upload_date_before: beforeDate ? dayjs(beforeDate).endOf('day').toISOString() : undefined,
-        executed: executedFilter !== 'all' ? executedFilter : undefined,
+        executed: ['true', 'false'].includes(executedFilter) ? executedFilter : undefined,
+        status: executedFilter === 'failed' ? 'failed' : undefined,
       };
 
       const response = await getSchedules(page, 10, filters);
@@ -146,6 +147,7 @@ function UploadManagement() {
               <FormControlLabel value="all" control={<Radio />} label="All" />
               <FormControlLabel value="false" control={<Radio />} label="Scheduled" />
               <FormControlLabel value="true" control={<Radio />} label="Archived" />
+              <FormControlLabel value="failed" control={<Radio />} label="Failed" />
             </RadioGroup>
           </FormControl>
         </Box>
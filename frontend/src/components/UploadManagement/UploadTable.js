@@ -10,6 +10,41 @@ import {
   Paper,
 } from '@mui/material';
 
+const STATUS_LABELS = {
+  queued: 'Scheduled',
+  rendering: 'Rendering video',
+  rendered: 'Rendered',
+  uploading: 'Uploading',
+  uploaded: 'Archived',
+  failed: 'Failed, will retry',
+  dead_lettered: 'Failed',
+};
+
+function formatStatus(upload) {
+  if (!upload.status) {
+    return upload.executed ? 'Archived' : 'Scheduled';
+  }
+  const label = STATUS_LABELS[upload.status] || upload.status;
+  if (upload.status === 'uploading' && upload.upload_bytes_committed) {
+    return `${label} (${(upload.upload_bytes_committed / (1024 * 1024)).toFixed(1)} MB sent)`;
+  }
+  if (upload.status === 'failed' && upload.next_attempt_at) {
+    return `${label} at ${new Date(upload.next_attempt_at).toLocaleString()}`;
+  }
+  return label;
+}
+
+function formatStatusDetails(upload) {
+  const details = [];
+  if (upload.status_changed_at) {
+    details.push(`Since ${new Date(upload.status_changed_at).toLocaleString()}`);
+  }
+  if (upload.last_error && ['failed', 'dead_lettered'].includes(upload.status)) {
+    details.push(`Attempt ${upload.attempt_count}: ${upload.last_error}`);
+  }
+  return details.join('\n');
+}
+
 function UploadTable({ uploads, onEdit, onDelete }) {
   return (
     <TableContainer
@@ -36,13 +71,33 @@ function UploadTable({ uploads, onEdit, onDelete }) {
                   {new Date(upload.upload_date).toLocaleString()}
                 </TableCell>
                 <TableCell data-label="Status">
-                  {upload.executed ? 'Archived' : 'Scheduled'}
+                  <span title={formatStatusDetails(upload)}>
+                    {formatStatus(upload)}
+                  </span>
+                  {upload.processing_status && (
+                    <div title={upload.processing_failure_reason || ''}>
+                      YouTube: {upload.processing_status}
+                    </div>
+                  )}
                 </TableCell>
                 <TableCell data-label="Image Name">{upload.img_name || 'N/A'}</TableCell>
                 <TableCell data-label="Audio Name">{upload.audio_name || 'N/A'}</TableCell>
                 <TableCell data-label="Actions">
                   {upload.executed ? (
-                    '—'
+                    upload.youtube_video_id ? (
+                      <Button
+                        variant="outlined"
+                        size="small"
+                        className="upload-management-button"
+                        href={`https://www.youtube.com/watch?v=${upload.youtube_video_id}`}
+                        target="_blank"
+                        rel="noopener noreferrer"
+                      >
+                        View
+                      </Button>
+                    ) : (
+                      '—'
+                    )
                   ) : (
                     <div className="upload-management-buttons">
                       <Button
@@ -3,6 +3,7 @@
     date_created: string; // ISO 8601 format
     upload_date: string | null; // ISO 8601 format or null
     executed: boolean;
+    status?: string; // queued, rendering, rendered, uploading, uploaded, failed, dead_lettered
     video_title: string;
     image: string | null; // Base64 binary string that represents a file
     audio: string | null; // Base64 binary string that represents a file